@@ -0,0 +1,61 @@
+'''Per-endpoint query count, latency and memory benchmarks.
+
+Not collected by the default test run; invoke explicitly:
+
+    pytest benchmarks/bench_endpoints.py
+
+Results go to benchmarks/results.json. Copy that file to
+benchmarks/baseline.json to make it the reference for later runs.
+'''
+import pytest
+from django.urls import reverse
+from .harness import measure
+
+pytestmark = pytest.mark.django_db
+
+ENDPOINTS = [
+    # name, actor, url name, url kwargs (resolved against the seeded objects)
+    ("courses.list.anonymous", None, "course:course-list", {}),
+    ("courses.list.student", "student", "course:course-list", {}),
+    ("courses.retrieve.student", "student", "course:course-detail", {"pk": "course"}),
+    ("courses.modules.enrolled", "student", "course:course-get-course-modules", {"pk": "course"}),
+    ("courses.modules.anonymous", None, "course:course-get-course-modules", {"pk": "course"}),
+    ("courses.progress.student", "student", "course:course-get-my-progress", {}),
+    ("courses.progress.teacher", "teacher", "course:course-get-course-progress", {"pk": "course"}),
+    ("enrollments.list.admin", "admin", "course:enrollstudent-list", {}),
+    ("enrollments.course.teacher", "teacher", "course:enrollstudent-get-enrolled-students",
+     {"course_id": "course"}),
+    ("transactions.list.admin", "admin", "transaction:transaction-list", {}),
+    ("users.list.admin", "admin", "user:user-list", {}),
+    ("quizzes.list.student", "student", "quiz:quiz-list", {}),
+    ("quizzes.list.admin", "admin", "quiz:quiz-list", {}),
+    ("quizzes.retrieve.student", "student", "quiz:quiz-detail", {"pk": "quiz"}),
+    ("certificates.list.student", "student", "certificates:certificate-list", {}),
+    ("certificates.list.admin", "admin", "certificates:certificate-list", {}),
+    ("certificates.verify.anonymous", None, "certificates:certificate-verify-certificate",
+     {"certificate_id": "certificate_id"}),
+]
+
+
+def resolve_kwargs(seeded, kwargs):
+    lookups = {
+        "course": lambda: seeded["course"].pk,
+        "module": lambda: seeded["module"].pk,
+        "quiz": lambda: seeded["module"].module_quiz.pk,
+        "certificate_id": lambda: seeded["certificate"].certificate_id,
+    }
+    return {key: lookups[value]() for key, value in kwargs.items()}
+
+
+@pytest.mark.parametrize(
+    "name,actor,url_name,url_kwargs", ENDPOINTS,
+    ids=[entry[0] for entry in ENDPOINTS])
+def test_endpoint(name, actor, url_name, url_kwargs, seeded, client_for, benchmark_recorder):
+    client = client_for(seeded[actor] if actor else None)
+    path = reverse(url_name, kwargs=resolve_kwargs(seeded, url_kwargs))
+
+    result = measure(name, "GET", path, lambda: client.get(path))
+
+    assert result.status_code == 200, f"{name} returned {result.status_code}"
+    regressions = benchmark_recorder(result)
+    assert not regressions, "\n".join(regressions)
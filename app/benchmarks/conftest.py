@@ -0,0 +1,49 @@
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+from course.models import Course
+from user.models import User
+from .harness import find_regressions, load_baseline, write_results
+from .seed import PASSWORD, SeedScale, seed
+
+
+@pytest.fixture(scope="session")
+def benchmark_scale():
+    return SeedScale.from_env()
+
+
+@pytest.fixture(scope="session")
+def seeded(django_db_setup, django_db_blocker, benchmark_scale):
+    '''Seeds once per session outside the per-test transaction, then cleans up'''
+    with django_db_blocker.unblock():
+        objects = seed(benchmark_scale)
+        yield objects
+        Course.objects.all().delete()
+        User.objects.all().delete()
+
+
+@pytest.fixture(scope="session")
+def benchmark_recorder(benchmark_scale):
+    '''Collects every endpoint result and writes them out at the end of the run'''
+    baseline = load_baseline()
+    results = []
+
+    def _record(result):
+        results.append(result)
+        return find_regressions(result, baseline.get(result.name))
+
+    yield _record
+    write_results(results, benchmark_scale.as_dict())
+
+
+@pytest.fixture
+def client_for():
+    '''Returns an API client logged in as `user` through the real login endpoint'''
+    def _client(user=None):
+        client = APIClient()
+        if user is not None:
+            response = client.post(
+                reverse("auth:login"), {"email": user.email, "password": PASSWORD})
+            client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.json()['access']}")
+        return client
+    return _client
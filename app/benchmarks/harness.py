@@ -0,0 +1,124 @@
+'''Measures API endpoints in-process and compares them with a stored baseline'''
+import gc
+import json
+import os
+import statistics
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from django.core.cache import cache
+from django.db import connection
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+BASELINE_PATH = Path(os.environ.get("BENCHMARK_BASELINE", BENCHMARK_DIR / "baseline.json"))
+OUTPUT_PATH = Path(os.environ.get("BENCHMARK_OUTPUT", BENCHMARK_DIR / "results.json"))
+ITERATIONS = int(os.environ.get("BENCHMARK_ITERATIONS", 30))
+WARMUP = int(os.environ.get("BENCHMARK_WARMUP", 3))
+# p95 may grow by this factor before it counts as a regression. Off by default:
+# millisecond timings are only comparable on the same quiet machine.
+LATENCY_TOLERANCE = float(os.environ.get("BENCHMARK_LATENCY_TOLERANCE", 0))
+
+
+@dataclass
+class EndpointResult:
+    name: str
+    method: str
+    path: str
+    status_code: int
+    cold_queries: int
+    warm_queries: int
+    p50_ms: float
+    p95_ms: float
+    peak_memory_kib: float
+
+
+class QueryCounter:
+    '''Counts statements through an execute wrapper, unaffected by DEBUG query logging'''
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def percentile(samples: List[float], pct: int) -> float:
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method="inclusive")[pct - 1]
+
+
+def measure(name: str, method: str, path: str, call: Callable,
+            iterations: int = ITERATIONS, warmup: int = WARMUP) -> EndpointResult:
+    '''Times `call` (a zero-argument request) against a cold then warm cache.
+
+    Queries are counted on the first request after a cache flush and again on
+    the last timed one; memory is the tracemalloc peak of one extra request so
+    the tracing overhead stays out of the latency samples.
+    '''
+    cache.clear()
+    cold = QueryCounter()
+    with connection.execute_wrapper(cold):
+        response = call()
+    for _ in range(warmup):
+        call()
+
+    samples = []
+    for _ in range(iterations):
+        warm = QueryCounter()
+        with connection.execute_wrapper(warm):
+            started = time.perf_counter()
+            call()
+            samples.append((time.perf_counter() - started) * 1000)
+
+    gc.collect()
+    tracemalloc.start()
+    call()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return EndpointResult(
+        name=name,
+        method=method,
+        path=path,
+        status_code=response.status_code,
+        cold_queries=cold.count,
+        warm_queries=warm.count,
+        p50_ms=round(percentile(samples, 50), 3),
+        p95_ms=round(percentile(samples, 95), 3),
+        peak_memory_kib=round(peak / 1024, 1),
+    )
+
+
+def load_baseline(path: Path = BASELINE_PATH) -> Dict[str, dict]:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())["endpoints"]
+
+
+def find_regressions(result: EndpointResult, baseline: Optional[dict],
+                     latency_tolerance: float = LATENCY_TOLERANCE) -> List[str]:
+    '''Query counts must never grow; latency may drift within the tolerance'''
+    if not baseline:
+        return []
+    regressions = []
+    for field in ("cold_queries", "warm_queries"):
+        if getattr(result, field) > baseline[field]:
+            regressions.append(
+                f"{result.name}: {field} {baseline[field]} -> {getattr(result, field)}")
+    if latency_tolerance and result.p95_ms > baseline["p95_ms"] * latency_tolerance:
+        regressions.append(
+            f"{result.name}: p95 {baseline['p95_ms']}ms -> {result.p95_ms}ms")
+    return regressions
+
+
+def write_results(results: List[EndpointResult], scale: dict, path: Path = OUTPUT_PATH) -> None:
+    payload = {
+        "scale": scale,
+        "endpoints": {result.name: asdict(result) for result in results},
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload, indent=2, sort_keys=True))
@@ -0,0 +1,105 @@
+'''Load test for the student journey: browse -> enrolled course -> modules -> quiz -> certificate.
+
+Courses are paid for outside the API, so the seed pre-enrolls every student;
+seed a dev database and dump the accounts first (see benchmarks/seed.py), then:
+
+    locust -f benchmarks/locustfile.py --host http://localhost:8000 Student
+
+`Login` measures login throughput under concurrency on its own:
+
+    locust -f benchmarks/locustfile.py --host http://localhost:8000 Login
+'''
+import json
+import os
+import random
+
+from locust import HttpUser, SequentialTaskSet, between, task
+
+ACCOUNTS_PATH = os.environ.get(
+    "LOCUST_ACCOUNTS", os.path.join(os.path.dirname(__file__), "locust_accounts.json"))
+API = "/api/v1"
+
+with open(ACCOUNTS_PATH) as accounts_file:
+    ACCOUNTS = json.load(accounts_file)
+
+
+class StudentJourney(SequentialTaskSet):
+
+    def on_start(self):
+        self.enrollment = random.choice(self.user.account["courses"])
+
+    @task
+    def browse_catalogue(self):
+        response = self.client.get(f"{API}/courses/", name="courses.list")
+        courses = response.json().get("results", []) if response.ok else []
+        if courses:
+            self.client.get(
+                f"{API}/courses/{random.choice(courses)['id']}/", name="courses.retrieve")
+
+    @task
+    def open_enrolled_course(self):
+        self.client.get(f"{API}/courses/{self.enrollment['course']}/", name="courses.retrieve")
+
+    @task
+    def read_modules(self):
+        self.client.get(
+            f"{API}/courses/{self.enrollment['course']}/modules/", name="courses.modules")
+
+    @task
+    def attempt_quiz(self):
+        module_id = self.enrollment["quiz_module"]
+        if not module_id:
+            return
+        response = self.client.get(f"{API}/quizzes/", name="quizzes.list")
+        quizzes = [quiz for quiz in response.json().get("results", [])
+                   if str(quiz["module"]) == module_id] if response.ok else []
+        if not quizzes:
+            return
+        paper = self.client.get(f"{API}/quizzes/{quizzes[0]['id']}/", name="quizzes.retrieve")
+        if not paper.ok:
+            return
+        submissions = [
+            {"question": question["id"], "answer": random.choice(question["answers"])["id"]}
+            for question in paper.json()["questions"] if question["answers"]
+        ]
+        with self.client.post(
+                f"{API}/quizzes/attempt-quiz/{module_id}/", json={"submissions": submissions},
+                name="quizzes.attempt", catch_response=True) as attempt:
+            # A repeat visit is rejected by design; that is not an error for the run.
+            if attempt.status_code == 400 and "taken this quiz" in attempt.text:
+                attempt.success()
+
+    @task
+    def collect_certificate(self):
+        response = self.client.get(f"{API}/certificates/", name="certificates.list")
+        certificates = response.json().get("results", []) if response.ok else []
+        if certificates:
+            self.client.get(
+                f"{API}/certificates/verify/{certificates[0]['certificate_id']}/",
+                name="certificates.verify")
+
+
+class Student(HttpUser):
+    wait_time = between(1, 3)
+    tasks = [StudentJourney]
+
+    def on_start(self):
+        self.account = random.choice([account for account in ACCOUNTS if account["courses"]])
+        response = self.client.post(
+            f"{API}/auth/login/",
+            json={"email": self.account["email"], "password": self.account["password"]},
+            name="auth.login")
+        self.client.headers["Authorization"] = f"Bearer {response.json()['access']}"
+
+
+class Login(HttpUser):
+    '''Back-to-back logins with valid credentials; each one costs a password hash'''
+    wait_time = between(0.1, 0.5)
+
+    @task
+    def login(self):
+        account = random.choice(ACCOUNTS)
+        self.client.post(
+            f"{API}/auth/login/",
+            json={"email": account["email"], "password": account["password"]},
+            name="auth.login")
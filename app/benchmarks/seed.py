@@ -0,0 +1,137 @@
+'''Seeds a catalogue at realistic volumes with the test factories.
+
+Used by the pytest benchmarks and, for locust runs against a dev server, from
+the shell (writes the student accounts the locustfile logs in with):
+
+    python manage.py shell -c "from benchmarks.seed import seed, write_locust_accounts; write_locust_accounts(seed())"
+'''
+import json
+import os
+from dataclasses import asdict, dataclass
+
+import factory
+from django.contrib.auth.hashers import make_password
+
+from certificate.tests.factories import CertificateFactory
+from course.models import EnrollStudent, Module, Transaction
+from course.progress import rebuild_progress
+from quiz.models import Quiz
+from course.tests.factories import (CourseFactory, EnrollStudentFactory,
+                                    ModuleFactory, TransactionFactory)
+from quiz.tests.factories import AnswerFactory, QuestionFactory, QuizFactory
+from user.tests.factories import UserFactory
+
+PASSWORD = "my@pass@access"
+LOCUST_ACCOUNTS_PATH = os.path.join(os.path.dirname(__file__), "locust_accounts.json")
+
+
+class SeedUserFactory(UserFactory):
+    '''Hashes the shared password once instead of once per user'''
+    email = factory.Sequence(lambda n: 'bench-user{}@example.com'.format(n))
+    password = make_password(PASSWORD)
+    is_active = True
+
+
+@dataclass
+class SeedScale:
+    courses: int = 20
+    modules_per_course: int = 8
+    questions_per_quiz: int = 10
+    teachers: int = 5
+    students: int = 200
+    enrollments_per_student: int = 3
+    certificates: int = 50
+
+    @classmethod
+    def from_env(cls) -> "SeedScale":
+        '''Multiplies the row counts (not the per-parent ones) by BENCHMARK_SCALE'''
+        factor = int(os.environ.get("BENCHMARK_SCALE", 1))
+        default = cls()
+        return cls(
+            courses=default.courses * factor,
+            teachers=default.teachers * factor,
+            students=default.students * factor,
+            certificates=default.certificates * factor,
+        )
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def seed(scale: SeedScale = None) -> dict:
+    '''Creates the catalogue and returns one actor of each role plus sample objects'''
+    scale = scale or SeedScale.from_env()
+    admin = SeedUserFactory(email="bench-admin@example.com", roles=["SUPER_ADMIN"])
+    teachers = [
+        SeedUserFactory(email=f"bench-teacher{index}@example.com", roles=["TEACHER"])
+        for index in range(scale.teachers)
+    ]
+    students = [
+        SeedUserFactory(email=f"bench-student{index}@example.com", roles=["STUDENT"])
+        for index in range(scale.students)
+    ]
+
+    courses = [
+        CourseFactory(created_by=admin, teachers=[teachers[index % len(teachers)]])
+        for index in range(scale.courses)
+    ]
+    Module.objects.bulk_create([
+        ModuleFactory.build(course=course, module_order=order)
+        for course in courses for order in range(scale.modules_per_course)
+    ])
+
+    for course in courses:
+        module = course.modules.order_by("module_order").first()
+        quiz = QuizFactory(module=module, created_by=admin)
+        for question in QuestionFactory.create_batch(scale.questions_per_quiz, quiz=quiz):
+            AnswerFactory(question=question, is_correct=True)
+
+    enrollments = [
+        EnrollStudentFactory.build(
+            user=student, course=courses[(index + offset) % len(courses)])
+        for index, student in enumerate(students)
+        for offset in range(scale.enrollments_per_student)
+    ]
+    EnrollStudent.objects.bulk_create(enrollments)
+    Transaction.objects.bulk_create([
+        TransactionFactory.build(
+            user=enrollment.user, course=enrollment.course,
+            amount_paid=float(enrollment.course.course_price), status="SUCCESS")
+        for enrollment in enrollments
+    ])
+    rebuild_progress()
+
+    certificates = [
+        CertificateFactory(user=enrollment.user, course=enrollment.course)
+        for enrollment in enrollments[:scale.certificates]
+    ]
+
+    student = students[0]
+    course = courses[0]
+    return {
+        "students": students,
+        "admin": admin,
+        "teacher": course.teachers.first(),
+        "student": student,
+        "course": course,
+        "module": course.modules.order_by("module_order").first(),
+        "certificate": certificates[0] if certificates else None,
+    }
+
+
+def write_locust_accounts(seeded: dict, path: str = LOCUST_ACCOUNTS_PATH) -> None:
+    '''Dumps each seeded student with the course and quiz modules they are enrolled in'''
+    quiz_modules = dict(Quiz.objects.values_list("module__course_id", "module_id"))
+    enrolled = {}
+    for user_id, course_id in EnrollStudent.objects.filter(
+            user__in=seeded["students"]).values_list("user_id", "course_id"):
+        enrolled.setdefault(user_id, []).append({
+            "course": str(course_id),
+            "quiz_module": str(quiz_modules[course_id]) if course_id in quiz_modules else None,
+        })
+    accounts = [
+        {"email": student.email, "password": PASSWORD, "courses": enrolled.get(student.id, [])}
+        for student in seeded["students"]
+    ]
+    with open(path, "w") as accounts_file:
+        json.dump(accounts, accounts_file, indent=2)
@@ -1 +1,3 @@
 CERTIFICATE_PREFIX = ['AL', 'QW', 'AO', 'SA', 'JK', 'LQ', 'PE', 'UR']
+
+MAX_BULK_VERIFICATION = 100
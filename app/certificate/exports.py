@@ -0,0 +1,17 @@
+from core.exports import ModelExport
+from .models import Certificate
+
+
+class CertificateExport(ModelExport):
+    model = Certificate
+    name = "certificates"
+    select_related = ("user", "course")
+    columns = (
+        ("Certificate ID", "certificate_id"),
+        ("Student email", "user.email"),
+        ("First name", "user.firstname"),
+        ("Last name", "user.lastname"),
+        ("Course", "course.course_name"),
+        ("Grade", "grade"),
+        ("Date issued", "created_at"),
+    )
@@ -0,0 +1,67 @@
+import secrets
+import threading
+import time
+from random import choice
+from .enums import CERTIFICATE_PREFIX
+
+# Crockford base32: no I, L, O or U, so ids survive being read aloud or retyped
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+BASE = len(ALPHABET)
+BODY_LENGTH = 13  # 64 bits
+RANDOM_BITS = 22
+CERTIFICATE_ID_LENGTH = len(CERTIFICATE_PREFIX[0]) + 1 + BODY_LENGTH + 1
+
+_last_value = 0
+_last_value_lock = threading.Lock()
+
+
+def _encode(value: int) -> str:
+    chars = []
+    for _ in range(BODY_LENGTH):
+        value, remainder = divmod(value, BASE)
+        chars.append(ALPHABET[remainder])
+    return "".join(reversed(chars))
+
+
+def check_character(body: str) -> str:
+    """Luhn mod 32 check character: catches any single typo and most transpositions"""
+    factor, total = 2, 0
+    for char in reversed(body):
+        addend = factor * ALPHABET.index(char)
+        factor = 1 if factor == 2 else 2
+        total += addend // BASE + addend % BASE
+    return ALPHABET[(BASE - total % BASE) % BASE]
+
+
+def _next_value() -> int:
+    '''Millisecond timestamp above 22 random bits, strictly increasing within the process'''
+    global _last_value
+    value = (time.time_ns() // 1_000_000) << RANDOM_BITS | secrets.randbits(RANDOM_BITS)
+    with _last_value_lock:
+        # ids built in the same millisecond count up from the previous one instead of drawing again
+        _last_value = value = max(value, _last_value + 1)
+    return value
+
+
+def new_certificate_id() -> str:
+    """Returns a time-ordered certificate id without probing the database.
+
+    The body packs the millisecond timestamp above 22 random bits. Within a
+    process ids never repeat, since an id generated in the same millisecond
+    as the previous one counts up from it; across processes two ids collide
+    only with the same millisecond and random part, and the unique index on
+    `Certificate.certificate_id` is the final guard.
+    """
+    body = _encode(_next_value())
+    return f"{choice(CERTIFICATE_PREFIX)}-{body}{check_character(body)}"
+
+
+def is_valid_certificate_id(certificate_id: str) -> bool:
+    '''Checks the format and check character of ids issued by new_certificate_id'''
+    if len(certificate_id) != CERTIFICATE_ID_LENGTH or "-" not in certificate_id:
+        return False
+    prefix, code = certificate_id.split("-", 1)
+    body, check = code[:-1], code[-1]
+    if prefix not in CERTIFICATE_PREFIX or any(char not in ALPHABET for char in code):
+        return False
+    return check_character(body) == check
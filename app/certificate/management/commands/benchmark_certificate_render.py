@@ -0,0 +1,52 @@
+import time
+from io import BytesIO
+from django.core.management.base import BaseCommand
+from PIL import Image, ImageDraw, ImageFont
+from certificate.renderer import (
+    FONT_COLOR, FONT_PATH, FONT_SIZE, OUTPUT_FORMATS, TEMPLATE_PATH,
+    load_assets, render_certificate)
+
+
+def render_uncached(user_name: str) -> BytesIO:
+    '''The original per-task path: parse the font and decode the template every time'''
+    font = ImageFont.truetype(str(FONT_PATH), FONT_SIZE)
+    with Image.open(TEMPLATE_PATH) as image_source:
+        draw = ImageDraw.Draw(image_source)
+        left, top, right, bottom = draw.textbbox((0, 0), user_name, font=font)
+        width, height = image_source.size
+        draw.text(((width - (right - left)) / 2, (height - (bottom - top)) / 2 - 30),
+                  user_name, fill=FONT_COLOR, font=font)
+        buffer = BytesIO()
+        image_source.save(buffer, format="PNG", quality=85)
+    return buffer
+
+
+class Command(BaseCommand):
+    help = "Measure single-core certificate renders per second, uncached vs preloaded assets"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--name", default="Ada Lovelace")
+
+    def _measure(self, label: str, render, iterations: int) -> None:
+        started = time.perf_counter()
+        size = 0
+        for _ in range(iterations):
+            size = render().getbuffer().nbytes
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"{label:<24} {iterations / elapsed:8.2f} renders/s/core  {size / 1024:8.1f} KiB")
+
+    def handle(self, *args, **options):
+        iterations, name = options["iterations"], options["name"]
+        self._measure("uncached PNG", lambda: render_uncached(name), iterations)
+        load_assets()
+        for output_format in OUTPUT_FORMATS:
+            self._measure(
+                f"preloaded {output_format}",
+                lambda: render_certificate(name, output_format=output_format)[0],
+                iterations)
+        self._measure(
+            "preloaded WEBP preview",
+            lambda: render_certificate(name, output_format="WEBP", max_width=800)[0],
+            iterations)
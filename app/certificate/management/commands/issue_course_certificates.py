@@ -0,0 +1,42 @@
+from multiprocessing import Pool
+from django.core.management.base import BaseCommand, CommandError
+from course.models import Course
+from certificate.renderer import load_assets
+from certificate.tasks import send_certificate_email
+from certificate.utils import get_issuance_progress, issue_course_certificates
+
+
+def _init_render_worker():
+    load_assets()
+
+
+class Command(BaseCommand):
+    help = "Issue certificates to every eligible student of a course. Re-running resumes an interrupted issuance."
+
+    def add_arguments(self, parser):
+        parser.add_argument("course_id")
+        parser.add_argument("--chunk-size", type=int, default=200)
+        parser.add_argument("--workers", type=int, default=None,
+                            help="Render processes (defaults to the CPU count, 0 renders in-process)")
+        parser.add_argument("--notify", action="store_true", help="Email each certificate to its student")
+
+    def handle(self, *args, **options):
+        course_id = options["course_id"]
+        if not Course.objects.filter(id=course_id).exists():
+            raise CommandError(f"Course {course_id} does not exist.")
+
+        def report(certificates):
+            if options["notify"]:
+                for certificate in certificates:
+                    send_certificate_email.delay(str(certificate.id))
+            progress = get_issuance_progress(course_id)
+            self.stdout.write(f"Issued {progress['issued']}/{progress['total']}")
+
+        if options["workers"] == 0:
+            issued_count = issue_course_certificates(
+                course_id, chunk_size=options["chunk_size"], on_chunk=report)
+        else:
+            with Pool(processes=options["workers"], initializer=_init_render_worker) as pool:
+                issued_count = issue_course_certificates(
+                    course_id, chunk_size=options["chunk_size"], render_map=pool.map, on_chunk=report)
+        self.stdout.write(self.style.SUCCESS(f"Issued {issued_count} certificate(s)"))
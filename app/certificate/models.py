@@ -1,13 +1,24 @@
 from django.db import models
+from core.indexes import ConcurrentIndex
 from core.models import AuditableModel
 
 
 class Certificate(AuditableModel):
     course = models.ForeignKey('course.Course', on_delete=models.CASCADE, related_name='certificate_generated')
     user = models.ForeignKey('user.User', on_delete=models.CASCADE, related_name='certificates')
-    certificate_id =  models.CharField(max_length=20)
+    certificate_id =  models.CharField(max_length=20, unique=True)
     grade = models.CharField(max_length=20, blank=True, null=True)
-    file = models.ImageField(storage='certifates/', blank=True, null=True)
+    file = models.FileField(upload_to='certificates/', blank=True, null=True)
+
+    class Meta:
+        constraints = [
+            # one certificate per student and course; also serves the issuance lookups
+            models.UniqueConstraint(fields=["course", "user"], name="unique_course_certificate"),
+        ]
+        indexes = [
+            # keyset pagination pages on (created_at, id), newest first
+            ConcurrentIndex(fields=["-created_at", "-id"], name="certificate_created_idx"),
+        ]
     
     def __str__(self):
     	return str(self.user)
\ No newline at end of file
@@ -0,0 +1,88 @@
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from django.conf import settings
+from PIL import Image, ImageDraw, ImageFont
+
+ASSETS_DIR = Path(__file__).resolve().parent
+TEMPLATE_PATH = ASSETS_DIR / 'extra' / 'template.png'
+FONT_PATH = ASSETS_DIR / 'font' / 'Roboto-Black.ttf'
+FONT_SIZE = 180
+FONT_COLOR = "#FFFFFF"
+
+OUTPUT_FORMATS: Dict[str, Dict] = {
+    "PNG": {"extension": "png", "content_type": "image/png", "save_options": {"compress_level": 6}},
+    "JPEG": {"extension": "jpg", "content_type": "image/jpeg", "save_options": {"quality": 85, "optimize": True}},
+    "WEBP": {"extension": "webp", "content_type": "image/webp", "save_options": {"quality": 85, "method": 2}},
+    "PDF": {"extension": "pdf", "content_type": "application/pdf", "save_options": {"resolution": 150.0}},
+}
+# Formats that cannot carry the template's alpha channel
+OPAQUE_FORMATS = ["JPEG", "PDF"]
+
+_template: Optional[Image.Image] = None
+_font: Optional[ImageFont.FreeTypeFont] = None
+
+
+def load_assets() -> Tuple[Image.Image, ImageFont.FreeTypeFont]:
+    """Decodes the certificate template and parses the font once per process.
+
+    Celery workers call this from `worker_process_init`; any other process loads
+    the assets lazily on its first render.
+    """
+    global _template, _font
+    if _template is None or _font is None:
+        with Image.open(TEMPLATE_PATH) as image_source:
+            image_source.load()
+            _template = image_source.copy()
+        _font = ImageFont.truetype(str(FONT_PATH), FONT_SIZE)
+    return _template, _font
+
+
+def get_output_format(output_format: Optional[str] = None) -> Dict:
+    output_format = (output_format or settings.CERTIFICATE_OUTPUT_FORMAT).upper()
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported certificate format: {output_format}")
+    return {"format": output_format, **OUTPUT_FORMATS[output_format]}
+
+
+def draw_certificate(user_name: str) -> Image.Image:
+    '''Draws the user name centred on a copy of the decoded template'''
+    template, font = load_assets()
+    image = template.copy()
+    draw = ImageDraw.Draw(image)
+    left, top, right, bottom = draw.textbbox((0, 0), user_name, font=font)
+    name_width, name_height = right - left, bottom - top
+    width, height = image.size
+    draw.text(((width - name_width) / 2, (height - name_height) / 2 - 30),
+              user_name, fill=FONT_COLOR, font=font)
+    return image
+
+
+def render_certificate(user_name: str, output_format: Optional[str] = None,
+                       max_width: Optional[int] = None) -> Tuple[BytesIO, Dict]:
+    """Renders a certificate and encodes it in the requested format.
+
+    `max_width` downscales the result, which is meant for previews.
+    Returns the encoded buffer together with the format details.
+    """
+    format_info = get_output_format(output_format)
+    image = draw_certificate(user_name)
+    if max_width and image.width > max_width:
+        image.thumbnail((max_width, image.height), Image.LANCZOS)
+    if format_info["format"] in OPAQUE_FORMATS:
+        image = image.convert("RGB")
+
+    buffer = BytesIO()
+    image.save(buffer, format=format_info["format"], **format_info["save_options"])
+    buffer.seek(0)
+    return buffer, format_info
+
+
+def render_certificate_file(user_name: str, output_format: Optional[str] = None) -> Tuple[bytes, str]:
+    """Picklable render entry point for process pools: returns (content, extension)"""
+    buffer, format_info = render_certificate(user_name, output_format=output_format)
+    return buffer.getvalue(), format_info["extension"]
+
+
+def render_certificate_preview(user_name: str, max_width: int = 800) -> Tuple[BytesIO, Dict]:
+    return render_certificate(user_name, output_format="WEBP", max_width=max_width)
@@ -3,8 +3,10 @@ from rest_framework import serializers
 from user.models import User
 from course.models import Course
 from .models import Certificate
+from .enums import MAX_BULK_VERIFICATION
+from core.utils.validators import is_admin, is_course_teacher
 from .utils import validate_certificate_generation
-from .tasks import process_user_course_certificate
+from .tasks import process_user_course_certificate, issue_course_certificates_task
 
 
 class ListCertificateSerializer(serializers.ModelSerializer):
@@ -55,6 +57,37 @@ class GenerateCertificateSerializer(serializers.Serializer):
         return validated_data
  
 
+class IssueCourseCertificatesSerializer(serializers.Serializer):
+    course =  serializers.PrimaryKeyRelatedField(
+        queryset=Course.objects.all(), required=True
+    )
+    notify = serializers.BooleanField(default=True)
+
+    def validate(self, attrs):
+        user: User = self.context["request"].user
+        if not is_admin(user) and not is_course_teacher(user, attrs.get("course")):
+            raise serializers.ValidationError(
+                {"course": "You can only issue certificates for a course you teach."})
+        return super().validate(attrs)
+
+    def create(self, validated_data):
+        course: Course = validated_data.get("course")
+        issue_course_certificates_task.delay(str(course.id), validated_data.get("notify"))
+        return validated_data
+
+
+class IssuanceProgressSerializer(serializers.Serializer):
+    course = serializers.UUIDField()
+    total = serializers.IntegerField()
+    issued = serializers.IntegerField()
+    completed = serializers.BooleanField()
+
+
+class BulkVerifyCertificateSerializer(serializers.Serializer):
+    certificate_ids = serializers.ListField(
+        child=serializers.CharField(max_length=20), allow_empty=False, max_length=MAX_BULK_VERIFICATION)
+
+
 class VerifyCertificateResponseSerializer(serializers.ModelSerializer):
     course = serializers.CharField(source="course.course_name")
     class Meta:
@@ -0,0 +1,36 @@
+from typing import Iterable, Optional
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from course.models import Course
+from user.models import User
+from .models import Certificate
+from .verification import invalidate_verification, invalidate_verifications
+
+# Fields copied into cached verification responses
+USER_NAME_FIELDS = {"firstname", "lastname"}
+COURSE_NAME_FIELDS = {"course_name"}
+
+
+def _names_changed(update_fields: Optional[Iterable[str]], name_fields: set) -> bool:
+    return update_fields is None or bool(name_fields & set(update_fields))
+
+
+@receiver(post_save, sender=Certificate)
+@receiver(post_delete, sender=Certificate)
+def invalidate_certificate_verification(sender, instance: Certificate, **kwargs):
+    invalidate_verification(instance.certificate_id)
+
+
+# Deleting a user or course cascades to its certificates, which the receiver above handles
+@receiver(post_save, sender=User)
+def invalidate_user_verifications(sender, instance: User, created: bool, update_fields=None, **kwargs):
+    if not created and _names_changed(update_fields, USER_NAME_FIELDS):
+        invalidate_verifications(
+            Certificate.objects.filter(user_id=instance.pk).values_list("certificate_id", flat=True))
+
+
+@receiver(post_save, sender=Course)
+def invalidate_course_verifications(sender, instance: Course, created: bool, update_fields=None, **kwargs):
+    if not created and _names_changed(update_fields, COURSE_NAME_FIELDS):
+        invalidate_verifications(
+            Certificate.objects.filter(course_id=instance.pk).values_list("certificate_id", flat=True))
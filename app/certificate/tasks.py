@@ -1,16 +1,71 @@
-from typing import Dict,BinaryIO
+import mimetypes
+from typing import Dict, List
+from celery import group
+from celery.signals import worker_process_init
 from django.template.loader import get_template
+from course.models import Course
 from user.utils import send_email
-from .utils import generate_certificate
+from .models import Certificate
+from .renderer import load_assets
+from .utils import (
+    certificate_user_name, eligible_enrollments, generate_certificate,
+    issue_certificates_for_users, iter_eligible_user_chunks,
+    record_issuance_progress, start_issuance_progress)
 from core.celery import APP
 
-@APP.task()
-def process_user_course_certificate(cert_info: Dict):
-    cert_file: BinaryIO =  generate_certificate(**cert_info)
+ISSUANCE_CHUNK_SIZE = 200
+
+
+@worker_process_init.connect
+def preload_certificate_assets(**kwargs):
+    '''Decode the template and font once per worker instead of once per task'''
+    load_assets()
+
+
+def email_certificate(certificate: Certificate, email_data: Dict) -> None:
     html_template = get_template("emails/send_cerficate_template.html")
-    html_alternative = html_template.render(cert_info)
-    mail_attachment={'name':'Course-Certifate','file':cert_file,'type':'image/png'}
+    html_alternative = html_template.render(email_data)
+    with certificate.file.open("rb") as cert_file:
+        content_type, _ = mimetypes.guess_type(certificate.file.name)
+        mail_attachment={'name':'Course-Certifate','file':cert_file.read(),'type':content_type}
     send_email(
-        "Your Course Certificate", cert_info["email"], html_alternative, attachment=mail_attachment
+        "Your Course Certificate", email_data["email"], html_alternative, attachment=mail_attachment
     )
 
+
+@APP.task()
+def process_user_course_certificate(cert_info: Dict):
+    certificate: Certificate =  generate_certificate(**cert_info)
+    email_certificate(certificate, cert_info)
+
+
+@APP.task()
+def send_certificate_email(certificate_id: str):
+    certificate: Certificate = Certificate.objects.select_related(
+        "user", "course").get(id=certificate_id)
+    email_certificate(certificate, {
+        "email": certificate.user.email,
+        "fullname": certificate_user_name(certificate.user),
+        "course": certificate.course.course_name,
+    })
+
+
+@APP.task()
+def issue_certificate_chunk(course_id: str, user_ids: List[str], notify: bool = True):
+    course = Course.objects.get(id=course_id)
+    certificates = issue_certificates_for_users(course, user_ids)
+    record_issuance_progress(course_id, len(certificates))
+    if notify:
+        for certificate in certificates:
+            send_certificate_email.delay(str(certificate.id))
+
+
+@APP.task()
+def issue_course_certificates_task(course_id: str, notify: bool = True):
+    '''Fans a cohort out to one render task per chunk across the worker pool'''
+    start_issuance_progress(
+        course_id, eligible_enrollments(course_id).values("user_id").distinct().count())
+    group(
+        issue_certificate_chunk.s(course_id, user_ids, notify)
+        for user_ids in iter_eligible_user_chunks(course_id, ISSUANCE_CHUNK_SIZE)
+    ).apply_async()
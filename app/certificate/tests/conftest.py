@@ -1,5 +1,11 @@
+import pytest
 from pytest_factoryboy import register
 from .factories import CertificateFactory
 
 register(CertificateFactory)
 
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    '''Keep rendered certificates out of the source tree'''
+    settings.MEDIA_ROOT = tmp_path
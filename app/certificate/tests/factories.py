@@ -1,6 +1,7 @@
 import factory
 from faker import Faker
 from certificate.models import Certificate
+from certificate.identifiers import new_certificate_id
 
 fake = Faker()
 
@@ -10,6 +11,6 @@ class CertificateFactory(factory.django.DjangoModelFactory):
         model = Certificate
 
     grade = fake.name()
-    certificate_id = fake.random_int(1000, 99999)
+    certificate_id = factory.LazyFunction(new_certificate_id)
 
 
@@ -1,6 +1,9 @@
 import pytest
+from io import BytesIO
+from openpyxl import load_workbook
 from django.urls import reverse
 from user.tests.conftest import api_client_with_credentials
+from certificate.utils import issue_course_certificates
 
 pytestmark = pytest.mark.django_db
 
@@ -14,7 +17,9 @@ class TestCertificate:
     )
     def test_admin_retrieves_certificate(self, user_role,user_factory,certificate_factory,course_factory, api_client, authenticate_user):
         user = authenticate_user(roles=user_role)
-        certificate_factory.create_batch(5, user=user_factory(), course = course_factory())
+        course = course_factory()
+        for student in user_factory.create_batch(5):
+            certificate_factory(user=student, course=course)
         token = user['token']
         api_client_with_credentials(token, api_client)
         response = api_client.get(self.certificate_list)
@@ -24,7 +29,9 @@ class TestCertificate:
     def test_student_retrieves_only_personal_certificate(self,user_factory,certificate_factory,course_factory, api_client, authenticate_user):
         user = authenticate_user(roles=["STUDENT"])
         token = user['token']
-        certificate_factory.create_batch(5, user=user_factory(), course = course_factory())
+        course = course_factory()
+        for student in user_factory.create_batch(5):
+            certificate_factory(user=student, course=course)
         certificate_factory(user = user['user_instance'], course = course_factory())
         api_client_with_credentials(token, api_client)
         response = api_client.get(self.certificate_list)
@@ -41,6 +48,14 @@ class TestCertificate:
         assert "course" in retuned_response
         assert "user" in retuned_response
         assert "certificate_id" in retuned_response
+
+    def test_verify_certificate_rejects_bad_checksum(self, user_factory, certificate_factory, course_factory, api_client, django_assert_num_queries):
+        certificate = certificate_factory(user = user_factory(), course = course_factory())
+        corrupted_id = certificate.certificate_id[:-1] + ("0" if certificate.certificate_id[-1] != "0" else "1")
+        url = reverse("certificates:certificate-verify-certificate", kwargs={'certificate_id':corrupted_id})
+        with django_assert_num_queries(0):
+            response = api_client.get(url)
+        assert response.status_code == 404
         
     def test_enrolled_student_generate_certificate(self,mocker,enroll_student_factory,course_factory, api_client, authenticate_user):
         mock_process_certificate_in_background = mocker.patch(
@@ -91,4 +106,125 @@ class TestCertificate:
         }
         response = api_client.post(self.certificate_list, data, format="json")
         assert response.status_code == 400
-    
\ No newline at end of file
+
+
+class TestVerifyCertificate:
+    bulk_verify_url = reverse("certificates:certificate-bulk-verify-certificates")
+
+    def get_verify_url(self, certificate_id: str) -> str:
+        return reverse("certificates:certificate-verify-certificate", kwargs={'certificate_id': certificate_id})
+
+    def test_verification_served_from_cache(self, user_factory, certificate_factory, course_factory, api_client, django_assert_num_queries):
+        certificate = certificate_factory(user = user_factory(), course = course_factory())
+        url = self.get_verify_url(certificate.certificate_id)
+        with django_assert_num_queries(1):
+            first_response = api_client.get(url)
+        with django_assert_num_queries(0):
+            cached_response = api_client.get(url)
+        assert cached_response.status_code == 200
+        assert cached_response.json() == first_response.json()
+        assert "public" in cached_response['Cache-Control']
+
+    def test_negative_verification_cached(self, api_client, django_assert_num_queries):
+        url = self.get_verify_url("AL-UNKNOWN1234")
+        with django_assert_num_queries(1):
+            assert api_client.get(url).status_code == 404
+        with django_assert_num_queries(0):
+            assert api_client.get(url).status_code == 404
+
+    def test_verification_cache_invalidated_on_issue(self, user_factory, certificate_factory, course_factory, api_client):
+        certificate = certificate_factory.build(user = user_factory(), course = course_factory())
+        url = self.get_verify_url(certificate.certificate_id)
+        assert api_client.get(url).status_code == 404
+        certificate.save()
+        assert api_client.get(url).status_code == 200
+
+    def test_verification_cache_invalidated_on_rename(self, user_factory, certificate_factory, course_factory, api_client):
+        user, course = user_factory(firstname = "Ada", lastname = "Lovelace"), course_factory()
+        certificate = certificate_factory(user = user, course = course)
+        url = self.get_verify_url(certificate.certificate_id)
+        assert api_client.get(url).json()['data']['user'].startswith("Ada Lovelace")
+        user.lastname = "King"
+        user.save()
+        course.course_name = "Analytical Engines"
+        course.save(update_fields = ["course_name"])
+        data = api_client.get(url).json()['data']
+        assert data['user'].startswith("Ada King")
+        assert data['course'] == "Analytical Engines"
+
+    def test_bulk_verify_certificates(self, user_factory, certificate_factory, course_factory, api_client, django_assert_num_queries):
+        course = course_factory()
+        certificates = [certificate_factory(user = student, course = course) for student in user_factory.create_batch(3)]
+        certificate_ids = [certificate.certificate_id for certificate in certificates] + ["AL-UNKNOWN1234"]
+        with django_assert_num_queries(1):
+            response = api_client.post(self.bulk_verify_url, {"certificate_ids": certificate_ids}, format="json")
+        assert response.status_code == 200
+        returned_data = {result['certificate_id']: result for result in response.json()['data']}
+        assert [returned_data[certificate_id]['valid'] for certificate_id in certificate_ids] == [True, True, True, False]
+
+    def test_bulk_verify_rejects_too_many_ids(self, api_client):
+        response = api_client.post(self.bulk_verify_url, {"certificate_ids": ["AL-UNKNOWN1234"] * 101}, format="json")
+        assert response.status_code == 400
+
+
+class TestIssueCourseCertificates:
+    issue_url = reverse("certificates:certificate-issue-course-certificates")
+
+    def test_course_teacher_issues_course_certificates(self, mocker, course_factory, api_client, authenticate_user):
+        mock_issue_in_background = mocker.patch(
+            'certificate.tasks.issue_course_certificates_task.delay')
+        user = authenticate_user(roles=["TEACHER"])
+        course = course_factory(teachers=[user['user_instance']])
+        api_client_with_credentials(user['token'], api_client)
+        response = api_client.post(self.issue_url, {"course": str(course.id)}, format="json")
+        assert response.status_code == 202
+        mock_issue_in_background.assert_called_once_with(str(course.id), True)
+
+    def test_deny_issue_for_non_teaching_teacher(self, mocker, course_factory, api_client, authenticate_user):
+        mock_issue_in_background = mocker.patch(
+            'certificate.tasks.issue_course_certificates_task.delay')
+        user = authenticate_user(roles=["TEACHER"])
+        course = course_factory()
+        api_client_with_credentials(user['token'], api_client)
+        response = api_client.post(self.issue_url, {"course": str(course.id)}, format="json")
+        assert response.status_code == 400
+        mock_issue_in_background.assert_not_called()
+
+    def test_deny_issue_to_student(self, course_factory, api_client, authenticate_user):
+        user = authenticate_user(roles=["STUDENT"])
+        api_client_with_credentials(user['token'], api_client)
+        response = api_client.post(self.issue_url, {"course": str(course_factory().id)}, format="json")
+        assert response.status_code == 403
+
+    def test_admin_retrieves_issuance_progress(self, user_factory, course_factory, enroll_student_factory, api_client, authenticate_user):
+        user = authenticate_user(roles=["SUPER_ADMIN"])
+        course = course_factory()
+        enroll_student_factory(user=user_factory(), course=course)
+        url = reverse("certificates:certificate-course-issuance-progress", kwargs={"course_id": str(course.id)})
+        api_client_with_credentials(user['token'], api_client)
+        assert api_client.get(url).status_code == 404
+        issue_course_certificates(course.id)
+        response = api_client.get(url)
+        assert response.status_code == 200
+        assert response.json()['data'] == {"course": str(course.id), "total": 1, "issued": 1, "completed": True}
+
+
+class TestExportCertificates:
+    export_url = reverse("certificates:certificate-export-rows")
+
+    def test_admin_exports_certificates_xlsx(self, user_factory, course_factory, certificate_factory, api_client, authenticate_user):
+        user = authenticate_user(roles=["SCHOOL_ADMIN"])
+        course = course_factory()
+        certificates = [certificate_factory(user=student, course=course) for student in user_factory.create_batch(2)]
+        api_client_with_credentials(user['token'], api_client)
+        response = api_client.get(self.export_url, {"file_format": "xlsx"})
+        assert response.status_code == 200
+        sheet = load_workbook(BytesIO(b"".join(response.streaming_content))).active
+        rows = list(sheet.iter_rows(values_only=True))
+        assert rows[0][0] == "Certificate ID"
+        assert [row[0] for row in rows[1:]] == [certificate.certificate_id for certificate in certificates]
+
+    def test_reject_unknown_export_format(self, api_client, authenticate_user):
+        user = authenticate_user(roles=["SUPER_ADMIN"])
+        api_client_with_credentials(user['token'], api_client)
+        assert api_client.get(self.export_url, {"file_format": "pdf"}).status_code == 400
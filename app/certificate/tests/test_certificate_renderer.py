@@ -0,0 +1,45 @@
+import pytest
+from PIL import Image
+from certificate import renderer
+from certificate.renderer import load_assets, render_certificate, render_certificate_preview
+
+
+def test_assets_loaded_once():
+    template, font = load_assets()
+    assert load_assets() == (template, font)
+
+
+def test_render_does_not_mutate_template():
+    template, _ = load_assets()
+    original = template.tobytes()
+    render_certificate("Ada Lovelace")
+    assert template.tobytes() == original
+
+
+@pytest.mark.parametrize(
+    'output_format, pil_format',
+    [("PNG", "PNG"), ("JPEG", "JPEG"), ("WEBP", "WEBP")]
+)
+def test_render_image_formats(output_format, pil_format):
+    buffer, format_info = render_certificate("Ada Lovelace", output_format=output_format)
+    with Image.open(buffer) as image:
+        assert image.format == pil_format
+        assert image.size == load_assets()[0].size
+    assert format_info["extension"] in renderer.OUTPUT_FORMATS[output_format]["extension"]
+
+
+def test_render_pdf():
+    buffer, format_info = render_certificate("Ada Lovelace", output_format="pdf")
+    assert buffer.read(4) == b"%PDF"
+    assert format_info["content_type"] == "application/pdf"
+
+
+def test_render_preview_is_downscaled():
+    buffer, _ = render_certificate_preview("Ada Lovelace", max_width=400)
+    with Image.open(buffer) as image:
+        assert image.width == 400
+
+
+def test_reject_unknown_format():
+    with pytest.raises(ValueError):
+        render_certificate("Ada Lovelace", output_format="BMP")
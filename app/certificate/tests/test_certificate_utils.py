@@ -1,5 +1,12 @@
 import pytest
-from certificate.utils import generate_certificate
+from django.core.management import call_command
+from certificate.models import Certificate
+from certificate import identifiers
+from certificate.identifiers import is_valid_certificate_id, new_certificate_id
+from certificate import utils as certificate_utils
+from certificate.utils import (
+    generate_certificate, generate_certificate_ids, get_issuance_progress,
+    issue_certificates_for_users, issue_course_certificates)
 
 pytestmark = pytest.mark.django_db
 
@@ -13,4 +20,98 @@ def test_generate_certificate_task(user_factory, course_factory):
         'course_name': course.course_name,
         'course_id': course.id,
     }
-    generate_certificate(**cert_info)
\ No newline at end of file
+    generate_certificate(**cert_info)
+
+def test_issue_course_certificates(user_factory, course_factory, enroll_student_factory, certificate_factory):
+    course = course_factory()
+    students = user_factory.create_batch(5)
+    for student in students:
+        enroll_student_factory(user=student, course=course)
+    certificate_factory(user=students[0], course=course)
+    issued_chunks = []
+
+    assert issue_course_certificates(course.id, chunk_size=2, on_chunk=issued_chunks.append) == 4
+    assert [len(chunk) for chunk in issued_chunks] == [2, 2]
+    assert Certificate.objects.filter(course=course).count() == 5
+    assert len(set(Certificate.objects.values_list("certificate_id", flat=True))) == 5
+    assert get_issuance_progress(course.id) == {
+        "course": str(course.id), "total": 4, "issued": 4, "completed": True}
+
+
+def test_issue_course_certificates_resumes(user_factory, course_factory, enroll_student_factory):
+    course = course_factory()
+    for student in user_factory.create_batch(3):
+        enroll_student_factory(user=student, course=course)
+    assert issue_course_certificates(course.id) == 3
+    enroll_student_factory(user=user_factory(), course=course)
+    assert issue_course_certificates(course.id) == 1
+    assert Certificate.objects.filter(course=course).count() == 4
+
+
+def test_issue_certificates_skips_students_issued_concurrently(user_factory, course_factory, certificate_factory):
+    course = course_factory()
+    students = user_factory.create_batch(3)
+
+    def render_while_another_run_issues(render, names):
+        # a concurrent run inserts a certificate after this chunk was selected
+        certificate_factory(user=students[0], course=course)
+        return map(render, names)
+
+    certificates = issue_certificates_for_users(
+        course, [student.id for student in students], render_map=render_while_another_run_issues)
+    assert {certificate.user_id for certificate in certificates} == {students[1].id, students[2].id}
+    assert Certificate.objects.filter(course=course).count() == 3
+def test_issue_course_certificates_command(user_factory, course_factory, enroll_student_factory, capsys):
+    course = course_factory()
+    for student in user_factory.create_batch(3):
+        enroll_student_factory(user=student, course=course)
+    call_command("issue_course_certificates", str(course.id), "--workers", "0", "--chunk-size", "2")
+    output = capsys.readouterr().out
+    assert "Issued 2/3" in output
+    assert "Issued 3 certificate(s)" in output
+
+
+def test_new_certificate_ids_are_unique_and_checksummed():
+    certificate_ids = [new_certificate_id() for _ in range(1000)]
+    assert len(set(certificate_ids)) == 1000
+    assert all(is_valid_certificate_id(certificate_id) for certificate_id in certificate_ids)
+    assert all(len(certificate_id) <= 20 for certificate_id in certificate_ids)
+
+
+def test_certificate_ids_of_one_millisecond_do_not_collide(monkeypatch):
+    monkeypatch.setattr(identifiers.time, "time_ns", lambda: 1_700_000_000_000_000_000)
+    monkeypatch.setattr(identifiers.secrets, "randbits", lambda bits: 7)
+    certificate_ids = generate_certificate_ids(500)
+    assert len(set(certificate_ids)) == 500
+    assert all(is_valid_certificate_id(certificate_id) for certificate_id in certificate_ids)
+
+
+def test_issue_certificates_retries_a_taken_certificate_id(monkeypatch, user_factory, course_factory,
+                                                          certificate_factory):
+    course = course_factory()
+    taken = certificate_factory(user=user_factory(), course=course_factory())
+    student = user_factory()
+    batches = iter([[taken.certificate_id]])
+    monkeypatch.setattr(certificate_utils, "generate_certificate_ids",
+                        lambda count: next(batches, None) or generate_certificate_ids(count))
+
+    [certificate] = issue_certificates_for_users(course, [student.id])
+    assert certificate.certificate_id != taken.certificate_id
+    assert Certificate.objects.filter(course=course, user=student).exists()
+
+
+def test_certificate_id_checksum_detects_typos():
+    certificate_id = new_certificate_id()
+    last_char = certificate_id[-2]
+    typo = "1" if last_char != "1" else "2"
+    assert not is_valid_certificate_id(certificate_id[:-2] + typo + certificate_id[-1])
+    assert not is_valid_certificate_id(certificate_id[:-1])
+
+
+def test_generate_certificate_does_not_probe_certificate_ids(user_factory, course_factory, django_assert_num_queries):
+    user = user_factory()
+    course = course_factory()
+    with django_assert_num_queries(3):
+        certificate = generate_certificate(
+            user_id=user.id, user_name=user.firstname, course_id=course.id)
+    assert is_valid_certificate_id(certificate.certificate_id)
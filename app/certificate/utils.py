@@ -1,22 +1,25 @@
-from typing import Dict, List,BinaryIO
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 from rest_framework import serializers
 from course.models import EnrollStudent, Course
-from random import choice
-from django.utils.crypto import get_random_string
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef, QuerySet
 from django.core.files import File
 from django.core.files.base import ContentFile
-
-from PIL import Image, ImageFont, ImageDraw
+from course.membership import is_enrolled
 from user.models import User
 from .models import Certificate
-from .enums import CERTIFICATE_PREFIX
+from .identifiers import new_certificate_id
+from .renderer import render_certificate, render_certificate_file
+
+ISSUANCE_PROGRESS_TTL = 60 * 60 * 24
+# Inserts of a chunk retried after racing a concurrent issuance
+ISSUE_ATTEMPTS = 3
 
 
 def validate_certificate_generation(user: User, attrs: Dict) -> None:
     course = attrs.get("course")
-    enrolled_students_qs: List(EnrollStudent) = course.enrolled_students.all()
-    is_enrolled = enrolled_students_qs.filter(user = user).exists()
-    if not is_enrolled:
+    if not is_enrolled(user, course):
         raise serializers.ValidationError(
             {"course": "Enroll for course to generate certificate."})
     if Certificate.objects.filter(course=course, user=user).exists():
@@ -25,39 +28,134 @@ def validate_certificate_generation(user: User, attrs: Dict) -> None:
     return
 
 
-def generate_certificate(**kwargs)->BinaryIO:
-    FONT_FILE = ImageFont.truetype(r'certificate/font/Roboto-Black.ttf', 180)
-    FONT_COLOR: str = "#FFFFFF"
-    is_unique: bool = True
-    while is_unique:
-        cert_prefix = choice(CERTIFICATE_PREFIX)
-        unique_number = get_random_string(10)
-        certificate_id = f'{cert_prefix}-{unique_number}'
-        is_unique = Certificate.objects.filter(
-            certificate_id=certificate_id).exists()
-        
-    with Image.open('certificate/extra/template.png') as image_source:
-        image_source.convert('RGB') 
-        WIDTH, HEIGHT = image_source.size
-        draw = ImageDraw.Draw(image_source)
-        name_width, name_height = draw.textsize(
-            kwargs['user_name'], font=FONT_FILE)
-        draw.text(((WIDTH - name_width) / 2, (HEIGHT - name_height) / 2 - 30),
-                  kwargs['user_name'], fill=FONT_COLOR, font=FONT_FILE)
-        
-        from io import BytesIO
-        buffer = BytesIO()
-        image_source.save(buffer, format="PNG", quality=85)
-        buffer.seek(0)
-
-        course_instance = Course.objects.get(id=kwargs['course_id'])
-        user_instance = User.objects.get(id=kwargs['user_id'])  
-        new_certificate: Certificate = Certificate(course=course_instance, 
-                                                                user=user_instance, 
-                                                                certificate_id=certificate_id, 
-                                                               
-        )
-        new_certificate.file = File(buffer, name="sample.png" )
-        new_certificate.save()
-       
-    return new_certificate
\ No newline at end of file
+def generate_certificate(**kwargs)->Certificate:
+    certificate_id = new_certificate_id()
+
+    buffer, format_info = render_certificate(
+        kwargs['user_name'], output_format=kwargs.get('output_format'))
+
+    course_instance = Course.objects.get(id=kwargs['course_id'])
+    user_instance = User.objects.get(id=kwargs['user_id'])  
+    new_certificate: Certificate = Certificate(course=course_instance, 
+                                                            user=user_instance, 
+                                                            certificate_id=certificate_id, 
+                                                           
+    )
+    new_certificate.file = File(buffer, name=f"{certificate_id}.{format_info['extension']}")
+    new_certificate.save()
+    return new_certificate
+
+
+def certificate_user_name(user: User) -> str:
+    return f'{user.firstname} {user.lastname}'
+
+
+def generate_certificate_ids(count: int) -> List[str]:
+    return [new_certificate_id() for _ in range(count)]
+
+
+def eligible_enrollments(course_id) -> QuerySet:
+    """Enrollments of a course whose student has no certificate for it yet"""
+    issued = Certificate.objects.filter(course_id=course_id, user_id=OuterRef("user_id"))
+    return EnrollStudent.objects.filter(course_id=course_id).filter(~Exists(issued))
+
+
+def iter_eligible_user_chunks(course_id, chunk_size: int) -> Iterator[List[str]]:
+    """Yields eligible user ids in keyset-ordered chunks.
+
+    Each chunk is re-queried after the previous one, so users issued in the
+    meantime (by this run or a concurrent one) are skipped.
+    """
+    last_user_id = None
+    while True:
+        enrollments = eligible_enrollments(course_id).order_by("user_id")
+        if last_user_id is not None:
+            enrollments = enrollments.filter(user_id__gt=last_user_id)
+        user_ids = list(enrollments.values_list("user_id", flat=True).distinct()[:chunk_size])
+        if not user_ids:
+            return
+        last_user_id = user_ids[-1]
+        yield [str(user_id) for user_id in user_ids]
+
+
+def _users_without_certificate(course: Course, user_ids: Iterable) -> List[User]:
+    return list(User.objects.filter(id__in=list(user_ids)).exclude(
+        certificates__course=course).only("id", "firstname", "lastname"))
+
+
+def issue_certificates_for_users(course: Course, user_ids: Iterable[str],
+                                 render_map: Callable = map) -> List[Certificate]:
+    """Renders and inserts the certificates of a chunk of users.
+
+    `render_map` lets callers fan rendering out, e.g. `multiprocessing.Pool.map`.
+    When a concurrent run issued some of the chunk first, the unique
+    (course, user) constraint rejects the insert and it is retried without them;
+    an id that another process generated as well is replaced on the retry.
+    """
+    users = _users_without_certificate(course, user_ids)
+    if not users:
+        return []
+    rendered: Dict[str, Tuple[bytes, str]] = dict(zip(
+        [str(user.id) for user in users],
+        render_map(render_certificate_file, [certificate_user_name(user) for user in users])))
+    for attempt in range(ISSUE_ATTEMPTS):
+        certificate_ids = generate_certificate_ids(len(users))
+        certificates = [
+            Certificate(course=course, user=user, certificate_id=certificate_id,
+                        file=ContentFile(content, name=f"{certificate_id}.{extension}"))
+            for user, certificate_id, (content, extension) in zip(
+                users, certificate_ids, [rendered[str(user.id)] for user in users])
+        ]
+        try:
+            with transaction.atomic():
+                return Certificate.objects.bulk_create(certificates)
+        except IntegrityError:
+            if attempt == ISSUE_ATTEMPTS - 1:
+                raise
+            users = _users_without_certificate(course, [user.id for user in users])
+            if not users:
+                return []
+
+
+def _issuance_progress_key(course_id) -> str:
+    return f"certificate-issuance:{course_id}"
+
+
+def start_issuance_progress(course_id, total: int) -> None:
+    cache.set(f"{_issuance_progress_key(course_id)}:total", total, ISSUANCE_PROGRESS_TTL)
+    cache.set(f"{_issuance_progress_key(course_id)}:issued", 0, ISSUANCE_PROGRESS_TTL)
+
+
+def record_issuance_progress(course_id, issued: int) -> None:
+    try:
+        cache.incr(f"{_issuance_progress_key(course_id)}:issued", issued)
+    except ValueError:
+        cache.set(f"{_issuance_progress_key(course_id)}:issued", issued, ISSUANCE_PROGRESS_TTL)
+
+
+def get_issuance_progress(course_id) -> Optional[Dict]:
+    total = cache.get(f"{_issuance_progress_key(course_id)}:total")
+    if total is None:
+        return None
+    issued = cache.get(f"{_issuance_progress_key(course_id)}:issued") or 0
+    return {"course": str(course_id), "total": total, "issued": issued,
+            "completed": issued >= total}
+
+
+def issue_course_certificates(course_id, chunk_size: int = 200, render_map: Callable = map,
+                              on_chunk: Optional[Callable[[List[Certificate]], None]] = None) -> int:
+    """Issues a certificate to every eligible student of a course, chunk by chunk.
+
+    Safe to re-run after an interruption: students who already hold a
+    certificate are skipped, so a second run resumes where the first stopped.
+    """
+    course = Course.objects.get(id=course_id)
+    start_issuance_progress(course_id, eligible_enrollments(course_id).values("user_id").distinct().count())
+    issued_count = 0
+    for user_ids in iter_eligible_user_chunks(course_id, chunk_size):
+        certificates = issue_certificates_for_users(course, user_ids, render_map=render_map)
+        record_issuance_progress(course_id, len(certificates))
+        issued_count += len(certificates)
+        if on_chunk:
+            on_chunk(certificates)
+    return issued_count
@@ -0,0 +1,66 @@
+from typing import Dict, Iterable, Optional
+from django.core.cache import cache
+from .identifiers import CERTIFICATE_ID_LENGTH, is_valid_certificate_id
+from .models import Certificate
+from .serializers import VerifyCertificateResponseSerializer
+
+VERIFICATION_CACHE_TTL = 60 * 60
+NEGATIVE_VERIFICATION_CACHE_TTL = 60
+
+# Cached marker for ids known not to exist; None is reserved for cache misses
+NOT_FOUND = False
+
+
+def _verification_cache_key(certificate_id: str) -> str:
+    return f"certificate-verification:{certificate_id}"
+
+
+def _is_malformed(certificate_id: str) -> bool:
+    '''Ids in the current format must carry a valid check character'''
+    return len(certificate_id) == CERTIFICATE_ID_LENGTH and not is_valid_certificate_id(certificate_id)
+
+
+def verify_certificates(certificate_ids: Iterable[str]) -> Dict[str, Optional[Dict]]:
+    """Returns {certificate id: verification data, or None when not found}.
+
+    Hits and misses are both cached, misses with a short TTL, so repeated
+    lookups of the same id, real or not, are served from Redis. Everything
+    missing from the cache is resolved with one query.
+    """
+    certificate_ids = list(dict.fromkeys(certificate_ids))
+    cache_keys = {certificate_id: _verification_cache_key(certificate_id)
+                  for certificate_id in certificate_ids}
+    cached = cache.get_many(cache_keys.values())
+
+    results: Dict[str, Optional[Dict]] = {}
+    missing = []
+    for certificate_id in certificate_ids:
+        cached_result = cached.get(cache_keys[certificate_id])
+        if cached_result is not None:
+            results[certificate_id] = cached_result or None
+        elif _is_malformed(certificate_id):
+            results[certificate_id] = None
+        else:
+            missing.append(certificate_id)
+
+    if missing:
+        certificates = Certificate.objects.filter(
+            certificate_id__in=missing).select_related("user", "course")
+        found = {certificate.certificate_id: VerifyCertificateResponseSerializer(certificate).data
+                 for certificate in certificates}
+        cache.set_many({cache_keys[certificate_id]: dict(data)
+                        for certificate_id, data in found.items()}, VERIFICATION_CACHE_TTL)
+        not_found = [certificate_id for certificate_id in missing if certificate_id not in found]
+        cache.set_many({cache_keys[certificate_id]: NOT_FOUND
+                        for certificate_id in not_found}, NEGATIVE_VERIFICATION_CACHE_TTL)
+        for certificate_id in missing:
+            results[certificate_id] = found.get(certificate_id)
+    return results
+
+
+def invalidate_verification(certificate_id: str) -> None:
+    cache.delete(_verification_cache_key(certificate_id))
+
+
+def invalidate_verifications(certificate_ids: Iterable[str]) -> None:
+    cache.delete_many([_verification_cache_key(certificate_id) for certificate_id in certificate_ids])
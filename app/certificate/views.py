@@ -5,22 +5,31 @@ from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated,AllowAny
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_cache_control
+from rest_framework.throttling import ScopedRateThrottle
 from user.models import  User
 from course.models import Course, Transaction
 from rest_framework import serializers
 from user.permissions import  IsSuperAdmin,IsTeacher, IsStudent,IsSchoolAdmin
-from core.utils.validators import is_admin
+from core.exports import ExportMixin
+from core.pagination import KeysetPagination
+from core.utils.validators import is_admin, is_course_teacher
+from .exports import CertificateExport
 from .models import Certificate
 from .serializers import (
     GenerateCertificateSerializer, ListCertificateSerializer,
-    VerifyCertificateResponseSerializer
+    VerifyCertificateResponseSerializer, IssueCourseCertificatesSerializer,
+    IssuanceProgressSerializer, BulkVerifyCertificateSerializer
     )
+from .utils import get_issuance_progress
+from .verification import NEGATIVE_VERIFICATION_CACHE_TTL, VERIFICATION_CACHE_TTL, verify_certificates
 
 
-class CertificateViewSets(viewsets.ModelViewSet):
+class CertificateViewSets(ExportMixin, viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     queryset = Certificate.objects.all().select_related('course','user')
     http_method_names = ["get","post"]
+    pagination_class = KeysetPagination
     filter_backends = [
         DjangoFilterBackend,
         filters.SearchFilter,
@@ -29,6 +38,8 @@ class CertificateViewSets(viewsets.ModelViewSet):
     ordering_fields = ["user"]
     search_fields = ["certificate_id", "course__course_name",]
     serializer_class = ListCertificateSerializer
+    throttle_scope = "certificate_verification"
+    export_class = CertificateExport
     
     def get_queryset(self):
         auth_user: User = self.request.user
@@ -38,7 +49,7 @@ class CertificateViewSets(viewsets.ModelViewSet):
     
     def get_permissions(self):
         permission_classes = self.permission_classes
-        if self.action == "verify_certificate":
+        if self.action in ["verify_certificate", "bulk_verify_certificates"]:
             permission_classes = [AllowAny]
         if self.action == "create":
             permission_classes = [IsStudent | IsTeacher]
@@ -64,11 +75,62 @@ class CertificateViewSets(viewsets.ModelViewSet):
         detail=False,
         methods=["GET"],
         url_path=r"verify/(?P<certificate_id>[\w-]+)",
+        throttle_classes=[ScopedRateThrottle],
     )
     def verify_certificate(self, request, certificate_id, pk=None):
         '''Checks if a certificate is real'''
-        instance = get_object_or_404(Certificate,certificate_id=certificate_id)
-       
-        data =VerifyCertificateResponseSerializer(instance=instance).data
+        data = verify_certificates([certificate_id])[certificate_id]
+        if data is None:
+            response = Response({"detail": "Not found."}, status.HTTP_404_NOT_FOUND)
+            patch_cache_control(response, public=True, max_age=NEGATIVE_VERIFICATION_CACHE_TTL)
+            return response
+        response = Response({"success": True, "data": data}, status.HTTP_200_OK)
+        patch_cache_control(response, public=True, max_age=VERIFICATION_CACHE_TTL)
+        return response
+
+    @action(
+        detail=False,
+        methods=["POST"],
+        serializer_class=BulkVerifyCertificateSerializer,
+        url_path="verify-bulk",
+        throttle_classes=[ScopedRateThrottle],
+    )
+    def bulk_verify_certificates(self, request, pk=None):
+        '''Checks up to 100 certificates in one request'''
+        serializer = BulkVerifyCertificateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = verify_certificates(serializer.validated_data["certificate_ids"])
+        data = [{"certificate_id": certificate_id, "valid": result is not None, "data": result}
+                for certificate_id, result in results.items()]
         return Response({"success": True, "data": data}, status.HTTP_200_OK)
-   
\ No newline at end of file
+
+    @action(
+        detail=False,
+        methods=["POST"],
+        permission_classes=[IsTeacher | IsSchoolAdmin | IsSuperAdmin],
+        serializer_class=IssueCourseCertificatesSerializer,
+        url_path="issue-course",
+    )
+    def issue_course_certificates(self, request, pk=None):
+        """Issues certificates to every eligible student of a course in the background"""
+        serializer = IssueCourseCertificatesSerializer(data=request.data, context={"request": request})
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response({"success": True, "message": "Certificates are being issued. Check the progress endpoint for status."}, status.HTTP_202_ACCEPTED)
+
+    @action(
+        detail=False,
+        methods=["GET"],
+        permission_classes=[IsTeacher | IsSchoolAdmin | IsSuperAdmin],
+        serializer_class=IssuanceProgressSerializer,
+        url_path=r"issue-course/(?P<course_id>[\w-]+)",
+    )
+    def course_issuance_progress(self, request, course_id, pk=None):
+        """Returns the progress of a course certificate issuance"""
+        course_instance = get_object_or_404(Course, id=course_id)
+        if not is_admin(request.user) and not is_course_teacher(request.user, course_instance):
+            return Response({"success": False, "message": "You can only view issuance for a course you teach."}, 400)
+        progress = get_issuance_progress(course_id)
+        if progress is None:
+            return Response({"success": False, "message": "No certificate issuance found for this course."}, 404)
+        return Response({"success": True, "data": IssuanceProgressSerializer(progress).data}, status.HTTP_200_OK)
@@ -3,6 +3,7 @@ import pytest
 from user.models import User
 from rest_framework.test import APIClient
 from django.urls import reverse
+from django.core.cache import cache
 from pytest_factoryboy import register
 from user.tests.factories import (
     UserFactory, TokenFactory
@@ -16,6 +17,13 @@ register(ModuleFactory)
 register(EnrollStudentFactory)
 register(CourseFactory)
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    '''Start every test with an empty response cache'''
+    cache.clear()
+    yield
+
+
 @pytest.fixture
 def api_client():
     return APIClient()
@@ -0,0 +1,217 @@
+import csv
+import tempfile
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+from uuid import UUID, uuid4
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files import File
+from django.core.files.storage import get_storage_class
+from django.db.models import Model, QuerySet
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+from drf_spectacular.utils import extend_schema
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from user.permissions import IsSchoolAdmin, IsSuperAdmin
+
+EXPORT_CHUNK_SIZE = 2000
+# Leading characters that make Excel (or openpyxl) treat a cell as a formula
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+EXPORT_STATUS_TTL = 60 * 60 * 24
+CSV = "csv"
+XLSX = "xlsx"
+EXPORT_FORMATS = {
+    CSV: "text/csv",
+    XLSX: "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+class Echo:
+    '''A file-like object whose write() hands the line back instead of buffering it'''
+
+    def write(self, value: str) -> str:
+        return value
+
+
+class ModelExport:
+    '''Describes the columns of a model export and streams its rows
+
+    `columns` pairs a header with a dotted attribute path on the model,
+    e.g. ("Student email", "user.email"); missing relations export as blank.
+    '''
+    model = None
+    name = "export"
+    columns: Sequence[Tuple[str, str]] = ()
+    select_related: Sequence[str] = ()
+    course_lookup = "course_id"
+
+    def get_queryset(self, course_id: Optional[str] = None) -> QuerySet:
+        queryset = self.model.objects.select_related(*self.select_related).order_by("created_at", "id")
+        if course_id:
+            queryset = queryset.filter(**{self.course_lookup: course_id})
+        return queryset
+
+    def headers(self) -> Sequence[str]:
+        return [header for header, _ in self.columns]
+
+    def row(self, instance: Model) -> Sequence[Any]:
+        values = []
+        for _, path in self.columns:
+            value = instance
+            for attr in path.split("."):
+                value = getattr(value, attr, None)
+                if value is None:
+                    break
+            values.append(_escape_formula(value))
+        return values
+
+    def iter_rows(self, queryset: QuerySet) -> Iterator[Sequence[Any]]:
+        for instance in queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+            yield self.row(instance)
+
+    def filename(self, file_format: str) -> str:
+        return f"{self.name}-{timezone.now():%Y%m%d%H%M%S}.{file_format}"
+
+    def iter_csv(self, queryset: QuerySet) -> Iterator[str]:
+        writer = csv.writer(Echo())
+        yield writer.writerow(self.headers())
+        for row in self.iter_rows(queryset):
+            yield writer.writerow(row)
+
+    def write_xlsx(self, queryset: QuerySet, file) -> None:
+        '''Writes rows through a write-only workbook, which spills to disk instead of holding cells'''
+        from openpyxl import Workbook
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet(self.name[:31])
+        sheet.append(self.headers())
+        for row in self.iter_rows(queryset):
+            sheet.append([_xlsx_value(value) for value in row])
+        workbook.save(file)
+        file.seek(0)
+
+    def write(self, queryset: QuerySet, file_format: str, file) -> None:
+        if file_format == XLSX:
+            self.write_xlsx(queryset, file)
+            return
+        for line in self.iter_csv(queryset):
+            file.write(line.encode())
+        file.seek(0)
+
+    def response(self, queryset: QuerySet, file_format: str) -> StreamingHttpResponse:
+        filename = self.filename(file_format)
+        if file_format == XLSX:
+            file = tempfile.TemporaryFile()
+            self.write_xlsx(queryset, file)
+            return FileResponse(
+                file, as_attachment=True, filename=filename, content_type=EXPORT_FORMATS[XLSX])
+        response = StreamingHttpResponse(self.iter_csv(queryset), content_type=EXPORT_FORMATS[CSV])
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+    def save(self, file_format: str, course_id: Optional[str] = None) -> str:
+        '''Writes the export to file storage and returns its download URL'''
+        storage = get_storage_class(getattr(settings, "PRIVATE_FILE_STORAGE", None))()
+        with tempfile.TemporaryFile() as file:
+            self.write(self.get_queryset(course_id), file_format, file)
+            name = storage.save(f"exports/{self.filename(file_format)}", File(file))
+        return storage.url(name)
+
+
+def _escape_formula(value: Any) -> Any:
+    '''Quotes user-entered text such as "=HYPERLINK(...)" so spreadsheets show it as text'''
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+def _xlsx_value(value: Any) -> Any:
+    if isinstance(value, datetime) and timezone.is_aware(value):
+        return timezone.make_naive(value, dt_timezone.utc)
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _export_status_key(export_id: str) -> str:
+    return f"export:{export_id}"
+
+
+def start_export(user_id, export: ModelExport, file_format: str, course_id: Optional[str] = None) -> str:
+    from .tasks import export_to_storage
+
+    export_id = str(uuid4())
+    cache.set(_export_status_key(export_id),
+              {"status": "pending", "url": None, "user_id": str(user_id)}, EXPORT_STATUS_TTL)
+    export_path = f"{type(export).__module__}.{type(export).__qualname__}"
+    export_to_storage.delay(export_id, export_path, file_format, course_id)
+    return export_id
+
+
+def finish_export(export_id: str, url: str) -> None:
+    export_status = cache.get(_export_status_key(export_id)) or {}
+    export_status.update(status="ready", url=url)
+    cache.set(_export_status_key(export_id), export_status, EXPORT_STATUS_TTL)
+
+
+def fail_export(export_id: str) -> None:
+    export_status = cache.get(_export_status_key(export_id)) or {}
+    export_status.update(status="failed", url=None)
+    cache.set(_export_status_key(export_id), export_status, EXPORT_STATUS_TTL)
+
+
+def get_export_status(export_id: str, user_id) -> Optional[Dict]:
+    export_status = cache.get(_export_status_key(export_id))
+    if export_status is None or export_status.get("user_id") != str(user_id):
+        return None
+    return {"status": export_status["status"], "url": export_status["url"]}
+
+
+class ExportQuerySerializer(serializers.Serializer):
+    file_format = serializers.ChoiceField(choices=list(EXPORT_FORMATS), default=CSV)
+    course = serializers.UUIDField(required=False)
+    background = serializers.BooleanField(default=False)
+
+
+class ExportStatusSerializer(serializers.Serializer):
+    status = serializers.CharField()
+    url = serializers.CharField(allow_null=True)
+
+
+class ExportMixin:
+    '''Adds admin-only streaming CSV/XLSX export actions for `export_class`'''
+    export_class = ModelExport
+
+    @extend_schema(parameters=[ExportQuerySerializer], responses={200: None, 202: ExportStatusSerializer})
+    @action(detail=False, methods=["GET"], url_path="export", pagination_class=None,
+            permission_classes=[IsSchoolAdmin | IsSuperAdmin],
+            filter_backends=[], serializer_class=ExportQuerySerializer)
+    def export_rows(self, request, pk=None):
+        '''Streams every row as CSV/XLSX, or builds the file in the background with background=true'''
+        serializer = ExportQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        file_format = serializer.validated_data["file_format"]
+        course_id = serializer.validated_data.get("course")
+        course_id = str(course_id) if course_id else None
+        export = self.export_class()
+        if serializer.validated_data["background"]:
+            export_id = start_export(request.user.id, export, file_format, course_id)
+            return Response({"success": True, "data": {"export_id": export_id}}, status.HTTP_202_ACCEPTED)
+        return export.response(export.get_queryset(course_id), file_format)
+
+    @extend_schema(responses={200: ExportStatusSerializer})
+    @action(detail=False, methods=["GET"], url_path=r"export/(?P<export_id>[\w-]+)",
+            permission_classes=[IsSchoolAdmin | IsSuperAdmin],
+            pagination_class=None, filter_backends=[], serializer_class=ExportStatusSerializer)
+    def export_status(self, request, export_id, pk=None):
+        '''Returns the status and, once ready, the download URL of a background export'''
+        export_status = get_export_status(export_id, request.user.id)
+        if export_status is None:
+            return Response({"success": False, "message": "Export not found."}, status.HTTP_404_NOT_FOUND)
+        return Response({"success": True, "data": export_status}, status.HTTP_200_OK)
+
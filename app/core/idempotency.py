@@ -0,0 +1,72 @@
+'''Idempotency keys for endpoints that must not run twice.
+
+A client sends an `Idempotency-Key` header with an unsafe request. The first
+successful response for that key (per user and URL) is stored and replayed
+for every retry, so a retried submission returns the original result instead
+of being processed again. While the first request is still running, retries
+get 409; reusing a key with a different body gets 422. Failed requests are
+not stored, so the client may fix the body and retry with the same key.
+'''
+import json
+from functools import wraps
+from hashlib import md5
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+IDEMPOTENCY_HEADER = "HTTP_IDEMPOTENCY_KEY"
+IDEMPOTENCY_TTL = 60 * 60 * 24
+# How long a crashed request keeps its key locked
+IDEMPOTENCY_LOCK_TTL = 60
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+PENDING = "pending"
+DONE = "done"
+
+
+def _idempotency_cache_key(request, key: str) -> str:
+    raw_key = "|".join([str(request.user.pk), request.path, key])
+    return f"idempotency:{md5(raw_key.encode()).hexdigest()}"
+
+
+def _fingerprint(request) -> str:
+    return md5(json.dumps(request.data, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _replay(entry, fingerprint: str) -> Response:
+    if entry is not None and entry["fingerprint"] != fingerprint:
+        return Response({"success": False, "message": "This idempotency key was used with a different request."},
+                        status.HTTP_422_UNPROCESSABLE_ENTITY)
+    if entry is None or entry["state"] == PENDING:
+        return Response({"success": False, "message": "A request with this idempotency key is in progress."},
+                        status.HTTP_409_CONFLICT)
+    response = Response(entry["data"], entry["status"])
+    response["Idempotent-Replayed"] = "true"
+    return response
+
+
+def idempotent(view_method):
+    '''Makes a viewset action honour the Idempotency-Key header'''
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.META.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return view_method(self, request, *args, **kwargs)
+        if len(key) > MAX_IDEMPOTENCY_KEY_LENGTH:
+            return Response({"success": False, "message": "Idempotency-Key is too long."},
+                            status.HTTP_400_BAD_REQUEST)
+        cache_key = _idempotency_cache_key(request, key)
+        fingerprint = _fingerprint(request)
+        if not cache.add(cache_key, {"state": PENDING, "fingerprint": fingerprint}, IDEMPOTENCY_LOCK_TTL):
+            return _replay(cache.get(cache_key), fingerprint)
+        try:
+            response = view_method(self, request, *args, **kwargs)
+        except Exception:
+            cache.delete(cache_key)
+            raise
+        if status.is_success(response.status_code):
+            cache.set(cache_key, {"state": DONE, "fingerprint": fingerprint,
+                                  "status": response.status_code, "data": response.data}, IDEMPOTENCY_TTL)
+        else:
+            cache.delete(cache_key)
+        return response
+    return wrapper
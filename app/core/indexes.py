@@ -0,0 +1,25 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.db import models
+
+
+class IfNotExistsIndexMixin:
+    '''Emits CREATE INDEX [CONCURRENTLY] IF NOT EXISTS.
+
+    Migrations are generated per deploy and run in a transaction, which rules
+    out CREATE INDEX CONCURRENTLY there. `manage.py index_report
+    --create-missing` builds declared indexes concurrently ahead of `migrate`,
+    and IF NOT EXISTS turns the migration's AddIndex into a no-op.
+    '''
+
+    def create_sql(self, model, schema_editor, using="", **kwargs):
+        statement = super().create_sql(model, schema_editor, using=using, **kwargs)
+        statement.template = statement.template.replace("%(name)s", "IF NOT EXISTS %(name)s", 1)
+        return statement
+
+
+class ConcurrentIndex(IfNotExistsIndexMixin, models.Index):
+    pass
+
+
+class ConcurrentGinIndex(IfNotExistsIndexMixin, GinIndex):
+    pass
@@ -0,0 +1,126 @@
+from typing import Dict, Iterator, Set
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Q
+from django.db.models.constants import LOOKUP_SEP
+
+UNUSED_INDEXES_SQL = """
+    SELECT s.relname, s.indexrelname, s.idx_scan, pg_size_pretty(pg_relation_size(s.indexrelid))
+    FROM pg_stat_user_indexes s
+    JOIN pg_index i ON i.indexrelid = s.indexrelid
+    WHERE s.schemaname = current_schema() AND s.idx_scan <= %s
+      AND NOT i.indisunique AND NOT i.indisprimary
+    ORDER BY pg_relation_size(s.indexrelid) DESC
+"""
+INVALID_INDEXES_SQL = """
+    SELECT c.relname
+    FROM pg_index i
+    JOIN pg_class c ON c.oid = i.indexrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = current_schema() AND NOT i.indisvalid
+"""
+SEQ_SCAN_TABLES_SQL = """
+    SELECT relname, seq_scan, seq_tup_read, COALESCE(idx_scan, 0), n_live_tup
+    FROM pg_stat_user_tables
+    WHERE schemaname = current_schema() AND n_live_tup >= %s
+      AND seq_scan > COALESCE(idx_scan, 0)
+    ORDER BY seq_tup_read DESC
+    LIMIT 20
+"""
+
+
+def _condition_fields(condition) -> Iterator[str]:
+    for child in condition.children:
+        if isinstance(child, Q):
+            yield from _condition_fields(child)
+        else:
+            yield child[0].split(LOOKUP_SEP)[0]
+
+
+def _index_columns(model, index) -> Set[str]:
+    '''Columns named by the index fields and condition; expression indexes only need their table'''
+    names = [name.lstrip("-") for name in index.fields]
+    if index.condition is not None:
+        names += list(_condition_fields(index.condition))
+    return {model._meta.get_field(name).column for name in names}
+
+
+class _SchemaColumns:
+    '''Introspects each table once, so --create-missing can run before migrate'''
+
+    def __init__(self, connection):
+        self.connection = connection
+        with connection.cursor() as cursor:
+            self.tables = set(connection.introspection.table_names(cursor))
+        self.columns: Dict[str, Set[str]] = {}
+
+    def has_columns(self, table: str, columns: Set[str]) -> bool:
+        if table not in self.tables:
+            return False
+        if table not in self.columns:
+            with self.connection.cursor() as cursor:
+                self.columns[table] = {
+                    column.name for column in self.connection.introspection.get_table_description(cursor, table)}
+        return columns <= self.columns[table]
+
+
+class Command(BaseCommand):
+    help = ("Report model indexes missing from the database, indexes that are never scanned "
+            "and tables read mostly by sequential scans")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument("--max-scans", type=int, default=0,
+                            help="Report indexes scanned at most this many times (default: 0)")
+        parser.add_argument("--min-rows", type=int, default=10000,
+                            help="Only report sequential scans on tables with at least this many rows")
+        parser.add_argument("--create-missing", action="store_true",
+                            help="Build missing model indexes with CREATE INDEX CONCURRENTLY")
+
+    def handle(self, *args, **options):
+        connection = connections[options["database"]]
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT indexname FROM pg_indexes WHERE schemaname = current_schema()")
+            existing = {row[0] for row in cursor.fetchall()}
+            cursor.execute(INVALID_INDEXES_SQL)
+            invalid = [row[0] for row in cursor.fetchall()]
+            cursor.execute(UNUSED_INDEXES_SQL, [options["max_scans"]])
+            unused = cursor.fetchall()
+            cursor.execute(SEQ_SCAN_TABLES_SQL, [options["min_rows"]])
+            seq_scan_tables = cursor.fetchall()
+
+        missing, pending = [], []
+        schema = _SchemaColumns(connection)
+        for model in apps.get_models():
+            for index in model._meta.indexes:
+                if index.name in existing:
+                    continue
+                if schema.has_columns(model._meta.db_table, _index_columns(model, index)):
+                    missing.append((model, index))
+                else:
+                    pending.append((model, index))
+        self.stdout.write(f"Missing model indexes ({len(missing)}):")
+        for model, index in missing:
+            self.stdout.write(f"  {model._meta.db_table}.{index.name}")
+        self.stdout.write(f"Pending migration ({len(pending)}):")
+        for model, index in pending:
+            self.stdout.write(f"  {model._meta.db_table}.{index.name} (table or column not created yet)")
+        self.stdout.write(f"Invalid indexes ({len(invalid)}):")
+        for name in invalid:
+            self.stdout.write(f"  {name} (a failed concurrent build; drop and rebuild it)")
+        self.stdout.write(f"Unused indexes ({len(unused)}):")
+        for table, name, scans, size in unused:
+            self.stdout.write(f"  {table}.{name}: {scans} scan(s), {size}")
+        self.stdout.write(f"Tables mostly read by sequential scan ({len(seq_scan_tables)}):")
+        for table, seq_scans, rows_read, index_scans, live_rows in seq_scan_tables:
+            self.stdout.write(
+                f"  {table}: {seq_scans} seq scan(s) reading {rows_read} row(s), "
+                f"{index_scans} index scan(s), ~{live_rows} row(s)")
+
+        if options["create_missing"]:
+            # CONCURRENTLY cannot run inside a transaction block
+            with connection.schema_editor(atomic=False) as schema_editor:
+                for model, index in missing:
+                    schema_editor.execute(index.create_sql(model, schema_editor, concurrently=True))
+                    self.stdout.write(f"Created {index.name}")
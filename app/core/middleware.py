@@ -1,7 +1,10 @@
+from functools import partial
 from django.conf import settings
 from django.http import JsonResponse, HttpResponse
+from django.utils.functional import SimpleLazyObject
 
 from sentry_sdk import capture_exception
+from user.context import build_request_auth_context
 
 
 class CaptureExceptionMiddleware:
@@ -18,3 +21,13 @@ class CaptureExceptionMiddleware:
                 {"success": False, "detail": str(exception)}, status=500
             )
 
+
+
+class AuthContextMiddleware:
+    """Attaches the request's authorization context, built on first use"""
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.auth_context = SimpleLazyObject(partial(build_request_auth_context, request))
+        return self.get_response(request)
@@ -1,7 +1,14 @@
+from base64 import b64decode, b64encode
+from uuid import UUID
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 import math
 from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
 
 DEFAULT_PAGE = 1
 
@@ -10,15 +17,16 @@ class CustomPagination(PageNumberPagination):
     page_size_query_param = 'page_size'
 
     def get_paginated_response(self, data):
+        page_size = self.get_page_size(self.request)
         return Response({
             'links': {
                 'next': self.get_next_link(),
                 'previous': self.get_previous_link()
             },
             'total': self.page.paginator.count,
-            'total_pages': math.ceil(self.page.paginator.count / self.page_size),
+            'total_pages': math.ceil(self.page.paginator.count / page_size),
             'current_page': int(self.request.GET.get('page', DEFAULT_PAGE)),
-            'page_size': int(self.request.GET.get('page_size', self.page_size)),
+            'page_size': page_size,
             'results': data
         })
 
@@ -27,3 +35,115 @@ class StandardResultsPagination(PageNumberPagination):
     page_size = 100
     page_size_query_param = 'page_size'
     max_page_size = 1000
+
+
+def estimated_row_count(queryset):
+    """Returns the planner's row estimate for an unfiltered queryset, else None.
+
+    Reads `pg_class.reltuples`, which is kept up to date by ANALYZE/autovacuum,
+    instead of running COUNT(*) over the whole table.
+    """
+    if queryset.query.where or connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+            [queryset.model._meta.db_table])
+        row = cursor.fetchone()
+    if not row or row[0] < 0:
+        return None
+    return row[0]
+
+
+class KeysetPagination(CustomPagination):
+    """Page-number pagination with an opt-in keyset (cursor) mode.
+
+    Sending a `cursor` query parameter (empty for the first page) switches to
+    paging on `(created_at, id)`, which costs the same at any depth and skips
+    the COUNT(*). In that mode the ordering is fixed to newest first and
+    `total` is the planner estimate for unfiltered lists, or null. Models
+    paginated this way declare a `(-created_at, -id)` index to serve it.
+    """
+    cursor_query_param = 'cursor'
+    ordering = ('-created_at', '-id')
+    max_page_size = 1000
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_query_param not in request.query_params:
+            self.keyset_mode = False
+            return super().paginate_queryset(queryset, request, view)
+
+        self.keyset_mode = True
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.estimated_total = estimated_row_count(queryset)
+        position, reverse = self.decode_cursor(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        if position is not None:
+            created_at, pk = position
+            if reverse:
+                queryset = queryset.filter(
+                    Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk)
+                ).reverse()
+            else:
+                queryset = queryset.filter(
+                    Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        self.page = results
+        return results
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            direction, created_at, pk = b64decode(encoded.encode()).decode().split('|')
+            created_at = parse_datetime(created_at)
+            pk = UUID(pk)
+        except (TypeError, ValueError):
+            raise NotFound('Invalid cursor')
+        if created_at is None or direction not in ('n', 'p'):
+            raise NotFound('Invalid cursor')
+        return (created_at, pk), direction == 'p'
+
+    def encode_cursor(self, instance, reverse: bool) -> str:
+        raw = f"{'p' if reverse else 'n'}|{instance.created_at.isoformat()}|{instance.pk}"
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, b64encode(raw.encode()).decode())
+
+    def get_next_link(self):
+        if not self.keyset_mode:
+            return super().get_next_link()
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.keyset_mode:
+            return super().get_previous_link()
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        if not self.keyset_mode:
+            return super().get_paginated_response(data)
+        return Response({
+            'links': {
+                'next': self.get_next_link(),
+                'previous': self.get_previous_link()
+            },
+            'total': self.estimated_total,
+            'page_size': self.page_size,
+            'results': data
+        })
@@ -43,6 +43,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     
     #Third-party Apps
     'corsheaders',
@@ -58,6 +59,7 @@ INSTALLED_APPS = [
     'course',
     'quiz',
     'certificate',
+    'search',
     
     
 ]
@@ -74,6 +76,7 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "core.middleware.AuthContextMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "core.middleware.CaptureExceptionMiddleware",
@@ -144,11 +147,14 @@ REST_FRAMEWORK = {
     "DEFAULT_PAGINATION_CLASS": "core.pagination.CustomPagination",
     "PAGE_SIZE": 20,
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.StatelessJWTAuthentication",
         "rest_framework.authentication.BasicAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ),
     "TEST_REQUEST_DEFAULT_FORMAT": "json",
+    "DEFAULT_THROTTLE_RATES": {
+        "certificate_verification": config('CERTIFICATE_VERIFICATION_RATE', '120/minute'),
+    },
 }
 
 
@@ -202,6 +208,7 @@ LOGGING = {
 
 CLIENT_URL = config('CLIENT_URL')
 TOKEN_LIFESPAN = 24 #hrs
+CERTIFICATE_OUTPUT_FORMAT = config('CERTIFICATE_OUTPUT_FORMAT', 'PNG') # PNG, JPEG, WEBP or PDF
 
 REDIS_URL =config('REDIS_URL', 'localhost:6379')
 CELERY_BROKER_URL = REDIS_URL
@@ -209,6 +216,12 @@ CELERY_RESULT_BACKEND = REDIS_URL
 CELERY_ACCEPT_CONTENT = ['application/json']
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TASK_SERIALIZER = 'json'
+CELERY_BEAT_SCHEDULE = {
+    "submit-expired-exam-sessions": {
+        "task": "quiz.tasks.submit_expired_exam_sessions",
+        "schedule": 60.0,  # seconds
+    },
+}
 
 FLOWER_BASIC_AUTH = os.environ.get('FLOWER_BASIC_AUTH')
 
@@ -227,6 +240,8 @@ SESSION_ENGINE = "django.contrib.sessions.backends.cache"
 SESSION_CACHE_ALIAS = "default"
 
 CACHE_TTL = 60 * 1
+# Keep each user's taught/enrolled course ids in Redis sets for permission checks
+COURSE_MEMBERSHIP_CACHE = config('COURSE_MEMBERSHIP_CACHE', False, cast=bool)
 CHANNEL_LAYERS = {
     'default': {
         'BACKEND': 'channels_redis.core.RedisChannelLayer',
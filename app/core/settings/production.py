@@ -11,6 +11,12 @@ sentry_sdk.init(
         send_default_pii=True
     )
 
+# BasicAuthentication runs a full password hash on every request; opt back in explicitly
+if not config('AUTH_ALLOW_BASIC', False, cast=bool):
+    REST_FRAMEWORK["DEFAULT_AUTHENTICATION_CLASSES"] = tuple(
+        auth_class for auth_class in REST_FRAMEWORK["DEFAULT_AUTHENTICATION_CLASSES"]
+        if auth_class != "rest_framework.authentication.BasicAuthentication")
+
 # EMAIL CONFIG
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = config('EMAIL_HOST')
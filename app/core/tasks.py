@@ -0,0 +1,18 @@
+from typing import Optional
+from django.utils.module_loading import import_string
+from .celery import APP
+from .exports import fail_export, finish_export
+
+
+@APP.task()
+def export_to_storage(export_id: str, export_path: str, file_format: str, course_id: Optional[str] = None) -> str:
+    '''Writes a model export to file storage and records its download URL, or that it failed'''
+    try:
+        export = import_string(export_path)()
+        url = export.save(file_format, course_id)
+    except Exception:
+        # clients poll the status until it leaves pending
+        fail_export(export_id)
+        raise
+    finish_export(export_id, url)
+    return url
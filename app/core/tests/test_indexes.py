@@ -0,0 +1,58 @@
+import pytest
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
+from course.models import Module
+
+pytestmark = pytest.mark.django_db
+
+
+def _index_names(table: str) -> set:
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT indexname FROM pg_indexes WHERE tablename = %s", [table])
+        return {row[0] for row in cursor.fetchall()}
+
+
+class TestIndexes:
+
+    def test_declared_indexes_are_created_if_not_exists(self):
+        index = Module._meta.indexes[0]
+        with connection.schema_editor() as schema_editor:
+            sql = str(index.create_sql(Module, schema_editor))
+            concurrent_sql = str(index.create_sql(Module, schema_editor, concurrently=True))
+        assert sql.startswith('CREATE INDEX IF NOT EXISTS "module_course_order_idx"')
+        assert concurrent_sql.startswith('CREATE INDEX CONCURRENTLY IF NOT EXISTS "module_course_order_idx"')
+        assert {"module_course_order_idx", "token_token_type_idx", "enrollment_created_idx",
+                "transaction_created_idx"} <= (
+            _index_names("course_module") | _index_names("user_token")
+            | _index_names("course_enrollstudent") | _index_names("course_transaction"))
+
+    def test_index_report_lists_missing_indexes(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DROP INDEX "module_course_order_idx"')
+        out = StringIO()
+        call_command("index_report", stdout=out)
+        report = out.getvalue()
+        assert "Missing model indexes (1):\n  course_module.module_course_order_idx" in report
+        assert "Unused indexes" in report
+        assert "Tables mostly read by sequential scan" in report
+
+    def test_index_report_defers_indexes_on_unmigrated_columns(self):
+        with connection.cursor() as cursor:
+            cursor.execute('ALTER TABLE "quiz_quiz" DROP COLUMN "search_vector"')
+            cursor.execute('DROP TABLE "quiz_examsession"')
+        out = StringIO()
+        call_command("index_report", stdout=out)
+        report = out.getvalue()
+        assert "Missing model indexes (0):" in report
+        assert "quiz_quiz.quiz_search_vector_idx (table or column not created yet)" in report
+        assert "quiz_examsession.examsession_open_deadline_idx (table or column not created yet)" in report
+
+    @pytest.mark.django_db(transaction=True)
+    def test_index_report_creates_missing_indexes_concurrently(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DROP INDEX "module_course_order_idx"')
+        out = StringIO()
+        call_command("index_report", "--create-missing", stdout=out)
+        assert "Created module_course_order_idx" in out.getvalue()
+        assert "module_course_order_idx" in _index_names("course_module")
@@ -20,6 +20,7 @@ urlpatterns = [
     path('api/v1/transactions/', include('course.urls.transaction')),
     path('api/v1/quizzes/', include('quiz.urls')),
     path('api/v1/certificates/', include('certificate.urls')),
+    path('api/v1/search/', include('search.urls')),
   
 
 ]
@@ -0,0 +1,58 @@
+import time
+from hashlib import md5
+from typing import Iterable, Optional
+from django.core.cache import cache
+
+CATALOGUE_NAMESPACE = "catalogue"
+CACHE_KEY_PREFIX = "course-cache"
+
+
+def _version_key(namespace: str) -> str:
+    return f"{CACHE_KEY_PREFIX}:version:{namespace}"
+
+
+def _modified_key(namespace: str) -> str:
+    return f"{CACHE_KEY_PREFIX}:modified:{namespace}"
+
+
+def get_version(namespace: str) -> int:
+    """Returns the current version counter of a cache namespace.
+
+    A missing counter is seeded from the clock rather than from 1 so that an
+    evicted counter never resurrects entries written under an older version.
+    """
+    version: Optional[int] = cache.get(_version_key(namespace))
+    if version is None:
+        cache.add(_version_key(namespace), time.time_ns(), timeout=None)
+        version = cache.get(_version_key(namespace))
+    return version
+
+
+def get_last_modified(namespace: str) -> int:
+    modified: Optional[int] = cache.get(_modified_key(namespace))
+    if modified is None:
+        modified = int(time.time())
+        cache.add(_modified_key(namespace), modified, timeout=None)
+    return modified
+
+
+def bump_versions(namespaces: Iterable[str]) -> None:
+    """Invalidates every cached response of the namespaces in O(1)"""
+    now = int(time.time())
+    for namespace in namespaces:
+        try:
+            cache.incr(_version_key(namespace))
+        except ValueError:
+            cache.set(_version_key(namespace), time.time_ns(), timeout=None)
+        cache.set(_modified_key(namespace), now, timeout=None)
+
+
+def bump_course_version(course_id) -> None:
+    '''A course change also invalidates the catalogue since it embeds course counts'''
+    bump_versions([CATALOGUE_NAMESPACE, str(course_id)])
+
+
+def build_cache_key(namespace: str, *parts: str) -> str:
+    raw_key = "|".join([namespace, str(get_version(namespace)), *parts])
+    return f"{CACHE_KEY_PREFIX}:response:{md5(raw_key.encode()).hexdigest()}"
+
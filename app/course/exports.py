@@ -0,0 +1,31 @@
+from core.exports import ModelExport
+from .models import EnrollStudent, Transaction
+
+
+class EnrollmentExport(ModelExport):
+    model = EnrollStudent
+    name = "enrollments"
+    select_related = ("user", "course")
+    columns = (
+        ("Enrollment ID", "id"),
+        ("Student email", "user.email"),
+        ("First name", "user.firstname"),
+        ("Last name", "user.lastname"),
+        ("Course", "course.course_name"),
+        ("Amount paid", "amount_paid"),
+        ("Date enrolled", "date_enrolled"),
+    )
+
+
+class TransactionExport(ModelExport):
+    model = Transaction
+    name = "transactions"
+    select_related = ("user", "course")
+    columns = (
+        ("Transaction ID", "id"),
+        ("Student email", "user.email"),
+        ("Course", "course.course_name"),
+        ("Amount paid", "amount_paid"),
+        ("Status", "status"),
+        ("Date", "created_at"),
+    )
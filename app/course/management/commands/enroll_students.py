@@ -0,0 +1,36 @@
+from collections import Counter
+from decimal import Decimal
+from pathlib import Path
+from django.core.management.base import BaseCommand, CommandError
+from course.models import Course
+from course.utils import ENROLLMENT_BATCH_SIZE, bulk_enroll_students, read_enrollment_identifiers
+
+
+class Command(BaseCommand):
+    help = "Enroll the students listed in a CSV or JSON file (emails or user ids) in a course"
+
+    def add_arguments(self, parser):
+        parser.add_argument("course_id")
+        parser.add_argument("path", help="CSV or JSON file of student emails or user ids")
+        parser.add_argument("--amount-paid", type=Decimal, default=None,
+                            help="Defaults to the course price")
+        parser.add_argument("--batch-size", type=int, default=ENROLLMENT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        course = Course.objects.filter(id=options["course_id"]).first()
+        if course is None:
+            raise CommandError(f"Course {options['course_id']} does not exist.")
+        path = Path(options["path"])
+        if not path.exists():
+            raise CommandError(f"{path} does not exist.")
+
+        identifiers = read_enrollment_identifiers(path.read_text(encoding="utf-8-sig"), path.name)
+        results = bulk_enroll_students(
+            course, identifiers, amount_paid=options["amount_paid"], batch_size=options["batch_size"])
+
+        for result in results:
+            if result["status"] == "not_found":
+                self.stderr.write(f"Row {result['row']}: no user matches {result['identifier']!r}")
+        counts = Counter(result["status"] for result in results)
+        summary = ", ".join(f"{count} {status}" for status, count in sorted(counts.items()))
+        self.stdout.write(self.style.SUCCESS(f"{len(results)} row(s): {summary or 'nothing to do'}"))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from course.progress import REBUILD_BATCH_SIZE, rebuild_progress
+
+
+class Command(BaseCommand):
+    help = "Backfill and recount CourseProgress rows from enrollments and module completions"
+
+    def add_arguments(self, parser):
+        parser.add_argument("course_ids", nargs="*", help="Courses to rebuild (default: all)")
+        parser.add_argument("--batch-size", type=int, default=REBUILD_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        rebuilt_count = rebuild_progress(
+            options["course_ids"] or None, batch_size=options["batch_size"])
+        self.stdout.write(f"Rebuilt progress for {rebuilt_count} enrollment(s)")
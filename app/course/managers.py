@@ -0,0 +1,33 @@
+from django.db import models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_subquery(queryset: models.QuerySet, field: str) -> Coalesce:
+    """Correlated COUNT(*) of `queryset` rows whose `field` points at the outer row"""
+    counts = (
+        queryset.filter(**{field: OuterRef("pk")})
+        .order_by()
+        .values(field)
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+class CourseQuerySet(models.QuerySet):
+
+    def with_counts(self) -> models.QuerySet:
+        """Annotate enrollment, module and teacher counts in the same query.
+
+        Subqueries are used instead of joined `Count(..., distinct=True)` so the
+        three relations are not multiplied against each other.
+        """
+        from .models import EnrollStudent, Module
+
+        teachers_through = self.model.teachers.through
+        return self.annotate(
+            num_students=count_subquery(EnrollStudent.objects.all(), "course"),
+            num_modules=count_subquery(Module.objects.all(), "course"),
+            num_teachers=count_subquery(teachers_through.objects.all(), "course"),
+        )
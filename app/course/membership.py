@@ -0,0 +1,148 @@
+'''Course membership checks.
+
+Every check is a single EXISTS query, memoized in the request's auth context
+(see `user.context`). With
+`COURSE_MEMBERSHIP_CACHE` enabled, each user's taught/enrolled course ids are
+also kept in a Redis set that the course signals update in place.
+'''
+from typing import Dict, Iterable, Set, Tuple, Union
+from uuid import UUID
+from django.conf import settings
+from user.context import get_auth_context
+from user.models import User
+from core.utils.validators import is_admin
+from .models import Course, EnrollStudent
+
+TEACHER = "teacher"
+ENROLLED = "enrolled"
+MEMBERSHIP_KEY_PREFIX = "course-membership"
+MEMBERSHIP_CACHE_TTL = 60 * 60
+# Marks a set as loaded, so an empty membership is not read as a cache miss
+LOADED_MARKER = "*"
+
+CourseRef = Union[Course, UUID, str]
+
+
+def _course_id(course: CourseRef) -> str:
+    return str(getattr(course, "pk", course))
+
+
+def _membership_key(user_id, kind: str) -> str:
+    return f"{MEMBERSHIP_KEY_PREFIX}:{kind}:{user_id}"
+
+
+def _redis():
+    if not getattr(settings, "COURSE_MEMBERSHIP_CACHE", False):
+        return None
+    from django_redis import get_redis_connection
+    return get_redis_connection("default")
+
+
+def _request_memo(user: User) -> Dict[Tuple[str, str], bool]:
+    return get_auth_context(user).memberships
+
+
+def _query_course_ids(user_id, kind: str) -> Set[str]:
+    if kind == TEACHER:
+        queryset = Course.teachers.through.objects.filter(user_id=user_id)
+    else:
+        queryset = EnrollStudent.objects.filter(user_id=user_id)
+    return {str(course_id) for course_id in queryset.values_list("course_id", flat=True)}
+
+
+def _exists(user_id, course_id: str, kind: str) -> bool:
+    if kind == TEACHER:
+        queryset = Course.teachers.through.objects.filter(user_id=user_id, course_id=course_id)
+    else:
+        queryset = EnrollStudent.objects.filter(user_id=user_id, course_id=course_id)
+    return queryset.exists()
+
+
+def _cached_is_member(redis, user_id, course_id: str, kind: str) -> bool:
+    key = _membership_key(user_id, kind)
+    pipeline = redis.pipeline()
+    pipeline.sismember(key, LOADED_MARKER)
+    pipeline.sismember(key, course_id)
+    loaded, is_member = pipeline.execute()
+    if loaded:
+        return bool(is_member)
+    course_ids = _query_course_ids(user_id, kind)
+    pipeline = redis.pipeline()
+    pipeline.delete(key)
+    pipeline.sadd(key, LOADED_MARKER, *course_ids)
+    pipeline.expire(key, MEMBERSHIP_CACHE_TTL)
+    pipeline.execute()
+    return course_id in course_ids
+
+
+def _is_member(user: User, course: CourseRef, kind: str) -> bool:
+    if not user.is_authenticated:
+        return False
+    course_id = _course_id(course)
+    memo = _request_memo(user)
+    if (kind, course_id) not in memo:
+        redis = _redis()
+        if redis is None:
+            memo[(kind, course_id)] = _exists(user.pk, course_id, kind)
+        else:
+            memo[(kind, course_id)] = _cached_is_member(redis, user.pk, course_id, kind)
+    return memo[(kind, course_id)]
+
+
+def is_teacher(user: User, course: CourseRef) -> bool:
+    return _is_member(user, course, TEACHER)
+
+
+def is_enrolled(user: User, course: CourseRef) -> bool:
+    return _is_member(user, course, ENROLLED)
+
+
+def role_for(user: User, course: CourseRef) -> str:
+    """Returns the role a user holds on a course, the highest one winning"""
+    if not user.is_authenticated:
+        return "anonymous"
+    if is_admin(user):
+        return "admin"
+    if is_teacher(user, course):
+        return TEACHER
+    if is_enrolled(user, course):
+        return ENROLLED
+    return "authenticated"
+
+
+def add_memberships(kind: str, pairs: Iterable[Tuple[object, object]]) -> None:
+    '''Adds (user_id, course_id) pairs to the sets that are already loaded'''
+    _update_memberships(kind, pairs, add=True)
+
+
+def remove_memberships(kind: str, pairs: Iterable[Tuple[object, object]]) -> None:
+    _update_memberships(kind, pairs, add=False)
+
+
+def forget_memberships(kind: str, user_ids: Iterable[object]) -> None:
+    '''Drops whole sets, for changes whose exact pairs are unknown'''
+    redis = _redis()
+    keys = [_membership_key(user_id, kind) for user_id in user_ids]
+    if redis is not None and keys:
+        redis.delete(*keys)
+
+
+def _update_memberships(kind: str, pairs: Iterable[Tuple[object, object]], add: bool) -> None:
+    redis = _redis()
+    if redis is None:
+        return
+    pairs = list(pairs)
+    keys = [_membership_key(user_id, kind) for user_id, _ in pairs]
+    pipeline = redis.pipeline()
+    for key in keys:
+        pipeline.sismember(key, LOADED_MARKER)
+    loaded = pipeline.execute()
+    # A set that is not loaded is left alone: the next check loads it from the database.
+    pipeline = redis.pipeline()
+    for key, is_loaded, (_, course_id) in zip(keys, loaded, pairs):
+        if is_loaded:
+            if add:
+                pipeline.sadd(key, str(course_id))
+            else:
+                pipeline.srem(key, str(course_id))
+    pipeline.execute()
@@ -0,0 +1,34 @@
+from typing import Callable
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+from .caching import build_cache_key, get_last_modified
+
+
+class VersionedCacheMixin:
+    '''Serves read endpoints from a per-namespace versioned response cache'''
+    cache_timeout = settings.CACHE_TTL
+
+    def cached_response(self, request, namespace: str, build_response: Callable[[], Response], *key_parts: str) -> Response:
+        cache_key = build_cache_key(
+            namespace, request.get_full_path(), *key_parts)
+        headers = {
+            "ETag": quote_etag(cache_key.rsplit(":", 1)[-1]),
+            "Last-Modified": http_date(get_last_modified(namespace)),
+        }
+        conditional_response = get_conditional_response(
+            request._request, etag=headers["ETag"],
+            last_modified=get_last_modified(namespace))
+        if conditional_response is not None:
+            return Response(status=conditional_response.status_code, headers=headers)
+
+        data = cache.get(cache_key)
+        if data is None:
+            response = build_response()
+            if response.status_code != 200:
+                return response
+            data = response.data
+            cache.set(cache_key, data, self.cache_timeout)
+        return Response(data, headers=headers)
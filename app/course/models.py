@@ -1,7 +1,10 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from core.indexes import ConcurrentGinIndex, ConcurrentIndex
 from core.models import AuditableModel
 from core.fields import ArrayFileField 
 from core.enums import COURSE_PAYMENT_STATUS
+from .managers import CourseQuerySet
 #from ckeditor.fields import RichTextField
 
 
@@ -17,17 +20,29 @@ class Course(AuditableModel):
     approved = models.BooleanField(default=False) 
     created_by = models.ForeignKey("user.User", related_name="courses_created", on_delete=models.SET_NULL, blank=True, null=True)
     approved_by = models.ForeignKey("user.User", related_name="courses_approved",on_delete=models.SET_NULL, blank=True, null=True)
+    search_vector = SearchVectorField(null=True, editable=False, serialize=False)
+
+    objects = CourseQuerySet.as_manager()
+
+    class Meta:
+        indexes = [ConcurrentGinIndex(fields=["search_vector"], name="course_search_vector_idx")]
     
     @property
     def student_enrolled_count(self):
+        if hasattr(self, "num_students"):
+            return self.num_students
         return self.enrolled_students.count()
     
     @property
     def total_modules(self):
+        if hasattr(self, "num_modules"):
+            return self.num_modules
         return self.modules.count()
     
     @property
     def total_teachers(self):
+        if hasattr(self, "num_teachers"):
+            return self.num_teachers
         return self.teachers.count()
 
     def __str__(self):
@@ -39,6 +54,15 @@ class EnrollStudent(AuditableModel):
     course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='enrolled_students')
     date_enrolled = models.DateTimeField(auto_now_add=True)
     amount_paid = models.DecimalField(default=0,max_digits=20,decimal_places=2,blank=True, null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "course"], name="unique_course_enrollment"),
+        ]
+        indexes = [
+            # keyset pagination pages on (created_at, id), newest first
+            ConcurrentIndex(fields=["-created_at", "-id"], name="enrollment_created_idx"),
+        ]
     
     def __str__(self):
     	return f'{self.user} - {self.course}'
@@ -53,9 +77,15 @@ class Module(AuditableModel):
     practical_work_sheet = ArrayFileField(models.FileField(upload_to="practical_work_sheet/", null=True, blank=True), null=True)
     created_by = models.ForeignKey('user.User', on_delete=models.SET_NULL, related_name='modules_created', blank=True, null=True)
     completed_by = models.ManyToManyField("user.User", related_name="completed_modules", blank=True)
+    search_vector = SearchVectorField(null=True, editable=False, serialize=False)
     
     class Meta:
         ordering = ('-course', 'module_order')
+        indexes = [
+            # serves course.modules in module order
+            ConcurrentIndex(fields=["course", "module_order"], name="module_course_order_idx"),
+            ConcurrentGinIndex(fields=["search_vector"], name="module_search_vector_idx"),
+        ]
     
     def __str__(self):
     	return f'{self.module_name} {self.course}'
@@ -75,3 +105,32 @@ class Transaction(AuditableModel):
     course = models.ForeignKey(Course, related_name="transactions",  on_delete=models.SET_NULL,blank=True, null=True,)
     amount_paid = models.FloatField()
     status = models.CharField(max_length=15, choices=COURSE_PAYMENT_STATUS, blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            # keyset pagination pages on (created_at, id), newest first
+            ConcurrentIndex(fields=["-created_at", "-id"], name="transaction_created_idx"),
+        ]
+
+
+class CourseProgress(AuditableModel):
+    '''Denormalized module completion per enrolled student, kept current by course.progress'''
+    user = models.ForeignKey("user.User", on_delete=models.CASCADE, related_name="course_progress")
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="student_progress")
+    completed_count = models.PositiveIntegerField(default=0)
+    total_modules = models.PositiveIntegerField(default=0)
+    last_activity = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "course"], name="unique_course_progress"),
+        ]
+
+    @property
+    def percentage(self) -> float:
+        if not self.total_modules:
+            return 0.0
+        return round(self.completed_count * 100 / self.total_modules, 2)
+
+    def __str__(self):
+        return f'{self.user} - {self.course}: {self.completed_count}/{self.total_modules}'
@@ -0,0 +1,116 @@
+'''Per-student course progress.
+
+`CourseProgress` holds one row per enrolled (user, course) with the number of
+modules the student completed and the number of modules in the course, so
+progress reads are a single indexed query instead of a count over
+`Module.completed_by` per request. The course signals keep the rows current.
+'''
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+from typing import Iterable, Optional, Tuple
+from django.db.models import Count, F, IntegerField, OuterRef, Q, QuerySet, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from .models import CourseProgress, EnrollStudent, Module
+
+Pair = Tuple[object, object]
+
+REBUILD_BATCH_SIZE = 5000
+
+
+def _correlated_count(queryset: QuerySet, group_by: str) -> Coalesce:
+    counts = queryset.order_by().values(group_by).annotate(total=Count("pk")).values("total")
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def _completed_count() -> Coalesce:
+    completions = Module.completed_by.through.objects.filter(
+        user_id=OuterRef("user_id"), module__course_id=OuterRef("course_id"))
+    return _correlated_count(completions, "user_id")
+
+
+def _total_modules() -> Coalesce:
+    return _correlated_count(Module.objects.filter(course_id=OuterRef("course_id")), "course_id")
+
+
+def _pairs_filter(pairs: Iterable[Pair]) -> Q:
+    user_ids_by_course = defaultdict(set)
+    for user_id, course_id in pairs:
+        user_ids_by_course[str(course_id)].add(str(user_id))
+    return reduce(or_, (
+        Q(course_id=course_id, user_id__in=user_ids)
+        for course_id, user_ids in user_ids_by_course.items()
+    ), Q(pk__in=[]))
+
+
+def refresh_progress(pairs: Iterable[Pair], create: bool = False, touch: bool = False) -> int:
+    '''Recounts completed and total modules for (user_id, course_id) pairs in one UPDATE.
+
+    Affected rows are recounted from the index rather than adjusted by +/-1
+    because `remove()` reports every id it was given, including ones that
+    were never completed. With `create` missing rows are inserted first.
+    '''
+    pairs = list(pairs)
+    if not pairs:
+        return 0
+    if create:
+        CourseProgress.objects.bulk_create(
+            [CourseProgress(user_id=user_id, course_id=course_id) for user_id, course_id in pairs],
+            ignore_conflicts=True)
+    values = {"completed_count": _completed_count(), "total_modules": _total_modules()}
+    if touch:
+        values["last_activity"] = timezone.now()
+    return CourseProgress.objects.filter(_pairs_filter(pairs)).update(**values)
+
+
+def completion_pairs(instance, reverse: bool, pk_set: Optional[Iterable] = None) -> list:
+    '''(user_id, course_id) pairs touched by a change to `Module.completed_by`'''
+    if not reverse:
+        user_ids = pk_set if pk_set is not None else instance.completed_by.values_list("id", flat=True)
+        return [(user_id, instance.course_id) for user_id in user_ids]
+    modules = Module.objects.filter(id__in=pk_set) if pk_set is not None else instance.completed_modules.all()
+    return [(instance.pk, course_id) for course_id in modules.values_list("course_id", flat=True).distinct()]
+
+
+def module_added(course_id) -> None:
+    CourseProgress.objects.filter(course_id=course_id).update(total_modules=F("total_modules") + 1)
+
+
+def refresh_course_progress(course_id) -> int:
+    '''Recounts every row of a course, e.g. after a module and its completions were deleted'''
+    return CourseProgress.objects.filter(course_id=course_id).update(
+        completed_count=_completed_count(), total_modules=_total_modules())
+
+
+def remove_progress(user_id, course_id) -> None:
+    CourseProgress.objects.filter(user_id=user_id, course_id=course_id).delete()
+
+
+def rebuild_progress(course_ids: Optional[Iterable] = None, batch_size: int = REBUILD_BATCH_SIZE) -> int:
+    '''Backfills rows for every enrollment and recounts them; returns the enrollment count'''
+    enrollments = EnrollStudent.objects.order_by("id").values_list("user_id", "course_id")
+    if course_ids is not None:
+        enrollments = enrollments.filter(course_id__in=list(course_ids))
+    batch, total = [], 0
+    for pair in enrollments.iterator(chunk_size=batch_size):
+        batch.append(pair)
+        if len(batch) == batch_size:
+            total += len(batch)
+            refresh_progress(batch, create=True)
+            batch = []
+    total += len(batch)
+    refresh_progress(batch, create=True)
+    return total
+
+
+def student_progress(user_id) -> QuerySet:
+    return CourseProgress.objects.filter(user_id=user_id).select_related("course").order_by(
+        F("last_activity").desc(nulls_last=True), "course__course_name")
+
+
+def course_progress(course_id, user_id=None) -> QuerySet:
+    queryset = CourseProgress.objects.filter(course_id=course_id).select_related("user")
+    if user_id is not None:
+        queryset = queryset.filter(user_id=user_id)
+    return queryset.order_by("-completed_count", "user__email")
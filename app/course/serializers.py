@@ -1,12 +1,18 @@
 from rest_framework import serializers
 from user.serializers import BasicUserInfoSerializer
-from .models import Course, EnrollStudent, Module, ModuleAssignmentSubmission, Transaction
+from .models import Course, CourseProgress, EnrollStudent, Module, ModuleAssignmentSubmission, Transaction
 from user.models import User
 from core.utils.validators import is_admin, is_course_teacher
+from .utils import (MAX_BULK_ENROLLMENT_ROWS, bulk_enroll_students, read_enrollment_identifiers,
+                    set_modules_completed)
 
 class CourseSerializer(serializers.ModelSerializer):
     created_by = BasicUserInfoSerializer(read_only=True)
     teachers = BasicUserInfoSerializer(many=True, required=False)
+    student_enrolled_count = serializers.IntegerField(read_only=True)
+    total_modules = serializers.IntegerField(read_only=True)
+    total_teachers = serializers.IntegerField(read_only=True)
+
     class Meta:
         model = Course
         exclude = ("approved_by","updated_at")
@@ -33,7 +39,7 @@ class CourseUpdateSerializer(serializers.ModelSerializer):
     def validate(self, attrs): 
         user: User = self.context["request"].user
         if self.instance:
-            if not is_admin(user) and user not in self.instance.teachers.all():
+            if not is_admin(user) and not is_course_teacher(user, self.instance):
                 raise serializers.ValidationError({"course":"You can only edit a course you teach."})
         return super().validate(attrs)
 
@@ -89,19 +95,65 @@ class ModuleAssignmentSerializer(serializers.ModelSerializer):
 
 class BulkUpdateMarkAsCompletedSerializer(serializers.Serializer):
     '''Mark multiple modules as completed'''
-    modules = serializers.PrimaryKeyRelatedField(
-        queryset=Module.objects.all(), many=True, write_only= True)
+    modules = serializers.ListField(
+        child=serializers.UUIDField(), allow_empty=False, write_only=True)
     is_completed = serializers.BooleanField(required=True)
-    
+
+    def validate_modules(self, module_ids):
+        module_courses = dict(
+            Module.objects.filter(id__in=set(module_ids)).values_list("id", "course_id"))
+        missing = {str(module_id) for module_id in module_ids if module_id not in module_courses}
+        if missing:
+            raise serializers.ValidationError(f"Invalid module id(s): {', '.join(sorted(missing))}")
+        return module_courses
+
+    def validate(self, attrs):
+        user: User = self.context["request"].user
+        course_ids = set(attrs["modules"].values())
+        enrolled = set(EnrollStudent.objects.filter(
+            user=user, course_id__in=course_ids).values_list("course_id", flat=True))
+        if course_ids - enrolled:
+            raise serializers.ValidationError(
+                {"modules": "You can only complete modules of courses you are enrolled in."})
+        return super().validate(attrs)
+
     def create(self, validated_data):
         user = self.context["request"].user
-        for module in validated_data["modules"]:
-            module.completed_by.add(user) if validated_data[
-                "is_completed"
-            ] else module.completed_by.remove(user)
+        set_modules_completed(user.id, validated_data["modules"], validated_data["is_completed"])
         _returned = {"is_completed": validated_data["is_completed"]}
         return _returned
 
+class BulkEnrollmentSerializer(serializers.Serializer):
+    '''Enroll many students in a course from a list or a CSV/JSON file of emails or user ids'''
+    course = serializers.PrimaryKeyRelatedField(queryset=Course.objects.all(), required=True)
+    students = serializers.ListField(
+        child=serializers.CharField(allow_blank=True), required=False, write_only=True)
+    file = serializers.FileField(required=False, write_only=True)
+    amount_paid = serializers.DecimalField(
+        max_digits=20, decimal_places=2, required=False, write_only=True)
+
+    def validate(self, attrs):
+        if bool(attrs.get("students")) == bool(attrs.get("file")):
+            raise serializers.ValidationError(
+                {"students": "Provide either a list of students or a file."})
+        if attrs.get("file"):
+            upload = attrs.pop("file")
+            try:
+                content = upload.read().decode("utf-8-sig")
+                attrs["students"] = read_enrollment_identifiers(content, upload.name)
+            except (UnicodeDecodeError, ValueError):
+                raise serializers.ValidationError({"file": "Upload a UTF-8 CSV or JSON file."})
+        if len(attrs["students"]) > MAX_BULK_ENROLLMENT_ROWS:
+            raise serializers.ValidationError(
+                {"students": f"At most {MAX_BULK_ENROLLMENT_ROWS} students per request."})
+        return super().validate(attrs)
+
+    def create(self, validated_data):
+        return bulk_enroll_students(
+            validated_data["course"], validated_data["students"],
+            amount_paid=validated_data.get("amount_paid"))
+
+
 class TransactionSerializer(serializers.ModelSerializer):
     course_name = serializers.CharField(source="course.course_name")
     class Meta:
@@ -111,5 +163,25 @@ class TransactionSerializer(serializers.ModelSerializer):
     def to_representation(self, instance):
         data = super().to_representation(instance)
         data.pop("user")
-        data['payed_by'] = instance.user
-        return data
\ No newline at end of file
+        data['payed_by'] = BasicUserInfoSerializer(instance.user).data if instance.user else None
+        return data
+
+class CourseProgressSerializer(serializers.ModelSerializer):
+    '''A student's progress on one of their courses'''
+    course_name = serializers.CharField(source="course.course_name", read_only=True)
+    percentage = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = CourseProgress
+        fields = ["course", "course_name", "completed_count", "total_modules", "percentage", "last_activity"]
+
+
+class StudentProgressSerializer(serializers.ModelSerializer):
+    '''One enrolled student's progress on a course'''
+    user_id = serializers.UUIDField(read_only=True)
+    user = BasicUserInfoSerializer(read_only=True)
+    percentage = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = CourseProgress
+        fields = ["user_id", "user", "completed_count", "total_modules", "percentage", "last_activity"]
@@ -0,0 +1,137 @@
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import Signal, receiver
+from user.models import User
+from .caching import CATALOGUE_NAMESPACE, bump_course_version, bump_versions
+from .membership import (ENROLLED, TEACHER, add_memberships, forget_memberships,
+                         remove_memberships)
+from .models import Course, EnrollStudent, Module
+from .progress import (completion_pairs, module_added, refresh_course_progress,
+                       refresh_progress, remove_progress)
+
+# sent once per bulk completion change with `user_id` and the `course_ids` touched
+completion_changed = Signal()
+# User fields embedded in cached course responses (BasicUserInfoSerializer)
+EMBEDDED_USER_FIELDS = {"firstname", "lastname", "email"}
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def invalidate_course_cache(sender, instance: Course, **kwargs):
+    bump_course_version(instance.id)
+
+
+def _bump_courses_showing(user: User) -> None:
+    course_ids = Course.objects.filter(
+        Q(created_by=user) | Q(teachers=user)).values_list("id", flat=True).distinct()
+    course_ids = [str(course_id) for course_id in course_ids]
+    if course_ids:
+        bump_versions([CATALOGUE_NAMESPACE, *course_ids])
+
+
+@receiver(post_save, sender=User)
+def invalidate_teacher_course_cache(sender, instance: User, created: bool, update_fields=None, **kwargs):
+    if created or (update_fields is not None and not EMBEDDED_USER_FIELDS & set(update_fields)):
+        return
+    _bump_courses_showing(instance)
+
+
+@receiver(pre_delete, sender=User)
+def invalidate_deleted_teacher_course_cache(sender, instance: User, **kwargs):
+    # after the delete the courses no longer point at the user
+    _bump_courses_showing(instance)
+
+
+@receiver(post_save, sender=Module)
+@receiver(post_delete, sender=Module)
+@receiver(post_save, sender=EnrollStudent)
+@receiver(post_delete, sender=EnrollStudent)
+def invalidate_related_course_cache(sender, instance, **kwargs):
+    bump_course_version(instance.course_id)
+
+
+@receiver(m2m_changed, sender=Course.teachers.through)
+def invalidate_course_teachers_cache(sender, instance, action: str, pk_set, **kwargs):
+    if not action.startswith("post_"):
+        return
+    if isinstance(instance, Course):
+        bump_course_version(instance.id)
+    else:
+        bump_versions([CATALOGUE_NAMESPACE])
+        for course_id in pk_set or []:
+            bump_course_version(course_id)
+
+
+@receiver(post_save, sender=EnrollStudent)
+def add_enrollment_membership(sender, instance: EnrollStudent, created: bool, **kwargs):
+    if created:
+        add_memberships(ENROLLED, [(instance.user_id, instance.course_id)])
+
+
+@receiver(post_delete, sender=EnrollStudent)
+def remove_enrollment_membership(sender, instance: EnrollStudent, **kwargs):
+    remove_memberships(ENROLLED, [(instance.user_id, instance.course_id)])
+
+
+@receiver(m2m_changed, sender=Course.teachers.through)
+def update_teacher_memberships(sender, instance, action: str, reverse: bool, pk_set, **kwargs):
+    if action == "pre_clear":
+        # post_clear does not say who was removed, so drop their sets up front
+        if reverse:
+            forget_memberships(TEACHER, [instance.pk])
+        else:
+            forget_memberships(TEACHER, instance.teachers.values_list("id", flat=True))
+        return
+    if action not in ("post_add", "post_remove") or not pk_set:
+        return
+    if reverse:
+        pairs = [(instance.pk, course_id) for course_id in pk_set]
+    else:
+        pairs = [(user_id, instance.pk) for user_id in pk_set]
+    if action == "post_add":
+        add_memberships(TEACHER, pairs)
+    else:
+        remove_memberships(TEACHER, pairs)
+
+
+@receiver(post_save, sender=EnrollStudent)
+def create_enrollment_progress(sender, instance: EnrollStudent, created: bool, **kwargs):
+    if created:
+        refresh_progress([(instance.user_id, instance.course_id)], create=True)
+
+
+@receiver(post_delete, sender=EnrollStudent)
+def delete_enrollment_progress(sender, instance: EnrollStudent, **kwargs):
+    remove_progress(instance.user_id, instance.course_id)
+
+
+@receiver(post_save, sender=Module)
+def count_new_module(sender, instance: Module, created: bool, **kwargs):
+    if created:
+        module_added(instance.course_id)
+
+
+@receiver(post_delete, sender=Module)
+def recount_course_progress(sender, instance: Module, **kwargs):
+    # the module's completions are cascade-deleted without an m2m_changed signal
+    refresh_course_progress(instance.course_id)
+
+
+@receiver(m2m_changed, sender=Module.completed_by.through)
+def update_completion_progress(sender, instance, action: str, reverse: bool, pk_set, **kwargs):
+    if action == "pre_clear":
+        # post_clear does not say what was cleared, so remember it up front
+        instance._cleared_progress_pairs = completion_pairs(instance, reverse)
+        return
+    if action == "post_clear":
+        pairs = instance.__dict__.pop("_cleared_progress_pairs", [])
+    elif action in ("post_add", "post_remove") and pk_set:
+        pairs = completion_pairs(instance, reverse, pk_set)
+    else:
+        return
+    refresh_progress(pairs, touch=True)
+
+
+@receiver(completion_changed)
+def update_bulk_completion_progress(sender, user_id, course_ids, **kwargs):
+    refresh_progress([(user_id, course_id) for course_id in course_ids], touch=True)
@@ -1,5 +1,6 @@
 from pytest_factoryboy import register
-from .factories import ( ModuleFactory,)
+from .factories import ( ModuleFactory, TransactionFactory)
 
 
 register(ModuleFactory)
+register(TransactionFactory)
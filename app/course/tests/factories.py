@@ -1,6 +1,7 @@
 import factory
 from faker import Faker
 from django.contrib.auth.models import User
+from user.tests.factories import UserFactory
 from course.models import (Course,EnrollStudent,Module, 
                            Transaction,ModuleAssignmentSubmission)
 
@@ -26,6 +27,9 @@ class CourseFactory(factory.django.DjangoModelFactory):
 class EnrollStudentFactory(factory.django.DjangoModelFactory):
     class Meta:
         model = EnrollStudent
+
+    user = factory.SubFactory(UserFactory)
+    course = factory.SubFactory(CourseFactory)
         
 
 class ModuleFactory(factory.django.DjangoModelFactory):
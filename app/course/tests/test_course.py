@@ -1,8 +1,22 @@
+import csv
+import json
 import pytest
+from io import BytesIO, StringIO
+from openpyxl import load_workbook
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
 from django.urls import reverse
 from rest_framework import status
+from rest_framework.routers import DefaultRouter
 from typing import Callable
-from course.models import Course
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from course import membership
+from core.exports import get_export_status
+from core.tasks import export_to_storage
+from course.models import Course, CourseProgress, EnrollStudent, Transaction
+from course.views import EnrollStudentViewSets
+from user.models import User
 from user.tests.conftest import api_client_with_credentials
 
 
@@ -28,6 +42,32 @@ class TestRetrieveCourse:
         teachers_in_response = returned_response['results'][0]['teachers']
         assert len(teachers_in_response) == 2
 
+    def test_course_list_returns_annotated_counts(self, api_client, course_factory, module_factory, enroll_student_factory, user_factory):
+        teachers = user_factory.create_batch(2)
+        course = course_factory(teachers=teachers)
+        module_factory.create_batch(3, course=course)
+        enroll_student_factory.create_batch(4, course=course)
+        response = api_client.get(self.course_list_url)
+        assert response.status_code == 200
+        returned_course = response.json()['results'][0]
+        assert returned_course['student_enrolled_count'] == 4
+        assert returned_course['total_modules'] == 3
+        assert returned_course['total_teachers'] == 2
+
+    def test_course_list_query_count_is_constant(self, api_client, course_factory, module_factory, enroll_student_factory, user_factory):
+        '''Listing courses must not issue per-row count queries'''
+        def _list_query_count(page_size: int) -> int:
+            with CaptureQueriesContext(connection) as context:
+                response = api_client.get(self.course_list_url, {"page_size": page_size})
+            assert response.status_code == 200
+            assert len(response.json()['results']) == page_size
+            return len(context)
+
+        for course in course_factory.create_batch(10, teachers=user_factory.create_batch(2)):
+            module_factory.create_batch(2, course=course)
+            enroll_student_factory(course=course, user=user_factory())
+        assert _list_query_count(2) == _list_query_count(10)
+
     def test_retrieve_course_details(self , api_client, course_factory, user_factory, active_user):
         """Any person can retrieve course details"""
         teachers = user_factory.create_batch(3)
@@ -131,6 +171,108 @@ class TestRetrieveCourse:
             assert "text_cotent" not in module
             assert "practical_work_sheet" not   in module
 
+class TestCourseCache:
+    course_list_url = reverse("course:course-list")
+
+    def test_course_list_served_from_cache(self, api_client, course_factory, django_assert_num_queries):
+        course_factory.create_batch(2)
+        first_response = api_client.get(self.course_list_url)
+        with django_assert_num_queries(0):
+            cached_response = api_client.get(self.course_list_url)
+        assert cached_response.status_code == 200
+        assert cached_response.json() == first_response.json()
+
+    def test_course_list_cache_invalidated_on_course_change(self, api_client, course_factory):
+        course_factory()
+        assert api_client.get(self.course_list_url).json()['total'] == 1
+        course_factory()
+        assert api_client.get(self.course_list_url).json()['total'] == 2
+
+    def test_course_list_cache_invalidated_on_teacher_rename(self, api_client, course_factory, user_factory):
+        teacher, creator = user_factory.create_batch(2)
+        course_factory(created_by=creator, teachers=[teacher])
+        api_client.get(self.course_list_url)
+        teacher.firstname = "Renamed"
+        teacher.save()
+        creator.lastname = "Renamed"
+        creator.save(update_fields=["lastname"])
+        [listed] = api_client.get(self.course_list_url).json()['results']
+        assert listed['teachers'][0]['firstname'] == "Renamed"
+        assert listed['created_by']['lastname'] == "Renamed"
+
+    def test_course_list_returns_not_modified_for_matching_etag(self, api_client, course_factory):
+        course_factory()
+        response = api_client.get(self.course_list_url)
+        etag = response['ETag']
+        assert response.has_header('Last-Modified')
+        response = api_client.get(self.course_list_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        course_factory()
+        response = api_client.get(self.course_list_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response['ETag'] != etag
+
+    def test_course_modules_cache_keyed_by_role(self, api_client, module_factory, course_factory, enroll_student_factory, authenticate_user):
+        user = authenticate_user(roles=["STUDENT"])
+        course = course_factory()
+        module_factory.create_batch(2, course=course)
+        url = reverse("course:course-get-course-modules", kwargs={"pk": course.id})
+        anonymous_modules = api_client.get(url).json()['data']
+        assert "video_link" not in anonymous_modules[0]
+        enroll_student_factory.create(user=user['user_instance'], course=course)
+        api_client_with_credentials(user['token'], api_client)
+        enrolled_modules = api_client.get(url).json()['data']
+        assert "video_link" in enrolled_modules[0]
+
+    def test_course_modules_cache_invalidated_on_module_change(self, api_client, module_factory, course_factory):
+        course = course_factory()
+        module_factory(course=course)
+        url = reverse("course:course-get-course-modules", kwargs={"pk": course.id})
+        assert len(api_client.get(url).json()['data']) == 1
+        module_factory(course=course)
+        assert len(api_client.get(url).json()['data']) == 2
+
+
+class TestCourseMembership:
+
+    def test_role_for(self, course_factory, user_factory, enroll_student_factory):
+        teacher, student, outsider = user_factory.create_batch(3)
+        admin = user_factory(roles=["SCHOOL_ADMIN"])
+        course = course_factory(teachers=[teacher])
+        enroll_student_factory(user=student, course=course)
+        assert membership.role_for(admin, course) == "admin"
+        assert membership.role_for(teacher, course) == "teacher"
+        assert membership.role_for(student, course) == "enrolled"
+        assert membership.role_for(outsider, course) == "authenticated"
+        assert membership.is_teacher(teacher, course.id)
+        assert not membership.is_enrolled(teacher, course)
+
+    def test_checks_are_memoized_per_user_instance(self, course_factory, user_factory, django_assert_num_queries):
+        teacher = user_factory()
+        course = course_factory(teachers=[teacher])
+        with django_assert_num_queries(1):
+            assert membership.is_teacher(teacher, course)
+            assert membership.is_teacher(teacher, course)
+
+    def test_redis_sets_are_kept_warm_by_signals(self, settings, course_factory, user_factory, enroll_student_factory, django_assert_num_queries):
+        settings.COURSE_MEMBERSHIP_CACHE = True
+        user = user_factory()
+        first_course, second_course = course_factory.create_batch(2)
+        enroll_student_factory(user=user, course=first_course)
+        assert membership.is_enrolled(user, first_course)
+        assert not membership.is_teacher(user, second_course)
+
+        enroll_student_factory(user=user, course=second_course)
+        second_course.teachers.add(user)
+        fresh_user = User.objects.get(id=user.id)
+        with django_assert_num_queries(0):
+            assert membership.is_enrolled(fresh_user, second_course)
+            assert membership.is_teacher(fresh_user, second_course)
+
+        second_course.teachers.remove(user)
+        assert not membership.is_teacher(User.objects.get(id=user.id), second_course)
+
+
 class TestCreateCourse:
     course_list = reverse("course:course-list")
 
@@ -265,7 +407,6 @@ class TestUpdateDeleteCourse:
 
 class TestRetrieveCourseEnrollment:
     
-    @pytest.mark.skip(reason="URL returning 404")
     @pytest.mark.parametrize(
         'user_role',
         [["SUPER_ADMIN"], ["SCHOOL_ADMIN"]]
@@ -273,13 +414,13 @@ class TestRetrieveCourseEnrollment:
     def test_admin_retrieves_all_enrollments(self, api_client,user_role,  user_factory,course_factory,  enroll_student_factory,authenticate_user):
         user = authenticate_user(roles=user_role)
         token = user['token']
-        enroll_student_factory.create_batch(3, course=course_factory(), user= user_factory())
+        enroll_student_factory.create_batch(3, course=course_factory())
         
         api_client_with_credentials(token, api_client)
         url = reverse("course:enrollstudent-list")
         response = api_client.get(url)
-        print(response.json())
-        pass
+        assert response.status_code == 200
+        assert len(response.json()['results']) == 3
     
     @pytest.mark.parametrize(
         'user_role',
@@ -291,9 +432,9 @@ class TestRetrieveCourseEnrollment:
         user = authenticate_user(roles=user_role)
         token = user['token']
         course1 = course_factory()
-        enroll_student_factory.create_batch(2, course=course1, user= user_factory())
+        enroll_student_factory.create_batch(2, course=course1)
         course2 = course_factory()
-        enroll_student_factory.create_batch(3, course=course2, user= user_factory())    
+        enroll_student_factory.create_batch(3, course=course2)    
         api_client_with_credentials(token, api_client)
         url = reverse("course:enrollstudent-get-enrolled-students", kwargs={"course_id": str(course2.id)})
         response = api_client.get(url)
@@ -305,7 +446,7 @@ class TestRetrieveCourseEnrollment:
         user = authenticate_user(roles=["TEACHER"])
         token = user['token']
         course = course_factory(teachers=[user['user_instance']])
-        enroll_student_factory.create_batch(2, course=course, user= user_factory())
+        enroll_student_factory.create_batch(2, course=course)
         api_client_with_credentials(token, api_client)
         url = reverse("course:enrollstudent-get-enrolled-students", kwargs={"course_id": str(course.id)})
         response = api_client.get(url)
@@ -318,11 +459,305 @@ class TestRetrieveCourseEnrollment:
         user = authenticate_user(roles=["TEACHER"])
         token = user['token']
         course = course_factory()
-        enroll_student_factory.create_batch(2, course=course, user= user_factory())
+        enroll_student_factory.create_batch(2, course=course)
         api_client_with_credentials(token, api_client)
         url = reverse("course:enrollstudent-get-enrolled-students", kwargs={"course_id": str(course.id)})
         response = api_client.get(url)
         assert response.status_code == 400
     
     
-    
\ No newline at end of file
+    
+
+class TestBulkEnrollment:
+    bulk_enroll_url = reverse("course:enrollstudent-bulk-enroll-students")
+
+    def test_enrollment_list_route_only_reads(self):
+        '''POST on the enrollment list must not reach a create that saves arbitrary user/course pairs'''
+        router = DefaultRouter()
+        list_route = next(route for route in router.get_routes(EnrollStudentViewSets) if route.name == "{basename}-list")
+        assert router.get_method_map(EnrollStudentViewSets, list_route.mapping) == {"get": "list"}
+
+    def test_admin_bulk_enrolls_students(self, api_client, authenticate_user, user_factory, course_factory, enroll_student_factory):
+        user = authenticate_user(roles=["SCHOOL_ADMIN"])
+        course = course_factory(course_price=50)
+        new_student, enrolled_student, id_student = user_factory.create_batch(3)
+        enroll_student_factory(user=enrolled_student, course=course)
+        api_client_with_credentials(user['token'], api_client)
+        students = [new_student.email.upper(), enrolled_student.email, f"{{{str(id_student.id).upper()}}}",
+                    "nobody@example.com", new_student.email, id_student.id.hex]
+        response = api_client.post(self.bulk_enroll_url, {"course": str(course.id), "students": students})
+        assert response.status_code == 200
+        statuses = [row['status'] for row in response.json()['data']]
+        assert statuses == ["enrolled", "already_enrolled", "enrolled", "not_found", "duplicate", "duplicate"]
+        assert EnrollStudent.objects.filter(course=course).count() == 3
+        transactions = Transaction.objects.filter(course=course)
+        assert {str(user_id) for user_id in transactions.values_list("user_id", flat=True)} == {
+            str(new_student.id), str(id_student.id)}
+        assert {transaction.amount_paid for transaction in transactions} == {50.0}
+        assert membership.is_enrolled(User.objects.get(id=new_student.id), course)
+
+    def test_bulk_enroll_from_csv_file(self, api_client, authenticate_user, user_factory, course_factory):
+        user = authenticate_user(roles=["SUPER_ADMIN"])
+        course = course_factory()
+        students = user_factory.create_batch(3)
+        content = "name,email\n" + "".join(f"x,{student.email}\n" for student in students)
+        upload = SimpleUploadedFile("cohort.csv", content.encode(), content_type="text/csv")
+        api_client_with_credentials(user['token'], api_client)
+        response = api_client.post(
+            self.bulk_enroll_url, {"course": str(course.id), "file": upload}, format="multipart")
+        assert response.status_code == 200
+        assert EnrollStudent.objects.filter(course=course).count() == 3
+
+    def test_bulk_enroll_query_count_is_independent_of_rows(self, api_client, authenticate_user, user_factory, course_factory):
+        user = authenticate_user(roles=["SUPER_ADMIN"])
+        course = course_factory()
+        api_client_with_credentials(user['token'], api_client)
+
+        def _enroll_query_count(students) -> int:
+            with CaptureQueriesContext(connection) as context:
+                response = api_client.post(self.bulk_enroll_url, {
+                    "course": str(course.id), "students": [student.email for student in students]})
+            assert response.status_code == 200
+            return len(context)
+
+        assert _enroll_query_count(user_factory.create_batch(2)) == _enroll_query_count(user_factory.create_batch(20))
+
+    def test_deny_bulk_enroll_to_teacher(self, api_client, authenticate_user, course_factory):
+        user = authenticate_user(roles=["TEACHER"])
+        course = course_factory(teachers=[user['user_instance']])
+        api_client_with_credentials(user['token'], api_client)
+        response = api_client.post(self.bulk_enroll_url, {"course": str(course.id), "students": ["a@b.com"]})
+        assert response.status_code == 403
+
+    def test_enroll_students_command(self, tmp_path, user_factory, course_factory):
+        course = course_factory()
+        students = user_factory.create_batch(2)
+        path = tmp_path / "cohort.json"
+        path.write_text(json.dumps([{"email": student.email} for student in students] + ["ghost@example.com"]))
+        out, err = StringIO(), StringIO()
+        call_command("enroll_students", str(course.id), str(path), stdout=out, stderr=err)
+        assert "2 enrolled, 1 not_found" in out.getvalue()
+        assert "ghost@example.com" in err.getvalue()
+        assert EnrollStudent.objects.filter(course=course).count() == 2
+
+
+class TestExportEnrollments:
+    export_url = reverse("course:enrollstudent-export-rows")
+
+    def test_admin_streams_enrollments_csv(self, api_client, authenticate_user, course_factory, enroll_student_factory):
+        user = authenticate_user(roles=["SCHOOL_ADMIN"])
+        course, other_course = course_factory.create_batch(2)
+        enrollments = enroll_student_factory.create_batch(3, course=course, amount_paid=20)
+        enroll_student_factory(course=other_course)
+        api_client_with_credentials(user['token'], api_client)
+        response = api_client.get(self.export_url, {"course": str(course.id)})
+        assert response.status_code == 200
+        assert response.streaming
+        assert response['Content-Type'] == "text/csv"
+        rows = list(csv.reader(StringIO(b"".join(response.streaming_content).decode())))
+        assert rows[0][:2] == ["Enrollment ID", "Student email"]
+        assert [row[1] for row in rows[1:]] == [enrollment.user.email for enrollment in enrollments]
+        assert {row[5] for row in rows[1:]} == {"20.00"}
+
+    def test_admin_exports_enrollments_xlsx(self, api_client, authenticate_user, enroll_student_factory):
+        user = authenticate_user(roles=["SUPER_ADMIN"])
+        enroll_student_factory.create_batch(2)
+        api_client_with_credentials(user['token'], api_client)
+        response = api_client.get(self.export_url, {"file_format": "xlsx"})
+        assert response.status_code == 200
+        assert response['Content-Disposition'].startswith('attachment; filename="enrollments-')
+        sheet = load_workbook(BytesIO(b"".join(response.streaming_content))).active
+        assert sheet.max_row == 3
+
+    def test_export_quotes_formula_like_values(self, api_client, authenticate_user, user_factory, course_factory,
+                                               enroll_student_factory):
+        user = authenticate_user(roles=["SUPER_ADMIN"])
+        student = user_factory(firstname="=HYPERLINK(\"http://x\")", lastname="-2+3")
+        enroll_student_factory(user=student, course=course_factory(course_name="@SUM(A1)"))
+        api_client_with_credentials(user['token'], api_client)
+
+        response = api_client.get(self.export_url)
+        rows = list(csv.reader(StringIO(b"".join(response.streaming_content).decode())))
+        assert rows[1][2:5] == ["'=HYPERLINK(\"http://x\")", "'-2+3", "'@SUM(A1)"]
+        response = api_client.get(self.export_url, {"file_format": "xlsx"})
+        sheet = load_workbook(BytesIO(b"".join(response.streaming_content))).active
+        cells = list(sheet.iter_rows(min_row=2))[0][2:5]
+        assert [(cell.value, cell.data_type) for cell in cells] == [
+            ("'=HYPERLINK(\"http://x\")", "s"), ("'-2+3", "s"), ("'@SUM(A1)", "s")]
+
+    def test_export_query_count_is_independent_of_rows(self, api_client, authenticate_user, enroll_student_factory):
+        user = authenticate_user(roles=["SUPER_ADMIN"])
+        api_client_with_credentials(user['token'], api_client)
+
+        def _export_query_count() -> int:
+            with CaptureQueriesContext(connection) as context:
+                response = api_client.get(self.export_url)
+                b"".join(response.streaming_content)
+            return len(context)
+
+        enroll_student_factory.create_batch(2)
+        query_count = _export_query_count()
+        enroll_student_factory.create_batch(10)
+        assert _export_query_count() == query_count
+
+    def test_background_export_returns_download_url(self, api_client, authenticate_user, user_factory, enroll_student_factory, mocker, settings, tmp_path):
+        settings.MEDIA_ROOT = tmp_path
+        mocker.patch("core.tasks.export_to_storage.delay", side_effect=export_to_storage)
+        user = authenticate_user(roles=["SUPER_ADMIN"])
+        enroll_student_factory.create_batch(2)
+        api_client_with_credentials(user['token'], api_client)
+        response = api_client.get(self.export_url, {"background": "true"})
+        assert response.status_code == 202
+        export_id = response.json()['data']['export_id']
+
+        status_url = reverse("course:enrollstudent-export-status", kwargs={"export_id": export_id})
+        response = api_client.get(status_url)
+        assert response.status_code == 200
+        data = response.json()['data']
+        assert data['status'] == "ready"
+        assert "exports/enrollments-" in data['url']
+        assert len(list((tmp_path / "exports").iterdir())) == 1
+
+        assert get_export_status(export_id, user_factory().id) is None
+
+    def test_failed_background_export_is_reported(self, api_client, authenticate_user, mocker):
+        mocker.patch("core.tasks.export_to_storage.delay")
+        mocker.patch("course.exports.EnrollmentExport.save", side_effect=OSError("storage unavailable"))
+        user = authenticate_user(roles=["SUPER_ADMIN"])
+        api_client_with_credentials(user['token'], api_client)
+        export_id = api_client.get(self.export_url, {"background": "true"}).json()['data']['export_id']
+
+        with pytest.raises(OSError):
+            export_to_storage(export_id, "course.exports.EnrollmentExport", "csv")
+        assert get_export_status(export_id, user['user_instance'].id) == {"status": "failed", "url": None}
+
+    def test_deny_export_to_non_admin(self, api_client, authenticate_user):
+        user = authenticate_user(roles=["TEACHER"])
+        api_client_with_credentials(user['token'], api_client)
+        response = api_client.get(self.export_url)
+        assert response.status_code == 403
+
+    def test_admin_streams_transactions_csv(self, api_client, authenticate_user, course_factory, transaction_factory):
+        user = authenticate_user(roles=["SUPER_ADMIN"])
+        course = course_factory()
+        transaction_factory.create_batch(2, course=course, amount_paid=15, status="SUCCESS")
+        api_client_with_credentials(user['token'], api_client)
+        response = api_client.get(reverse("transaction:transaction-export-rows"))
+        assert response.status_code == 200
+        rows = list(csv.reader(StringIO(b"".join(response.streaming_content).decode())))
+        assert len(rows) == 3
+        assert {(row[2], row[4]) for row in rows[1:]} == {(course.course_name, "SUCCESS")}
+
+
+    def test_admin_lists_transactions(self, api_client, authenticate_user, user_factory, course_factory,
+                                      transaction_factory):
+        user = authenticate_user(roles=["SUPER_ADMIN"])
+        student = user_factory()
+        transaction_factory(user=student, course=course_factory(), amount_paid=15, status="SUCCESS")
+        api_client_with_credentials(user['token'], api_client)
+        response = api_client.get(reverse("transaction:transaction-list"))
+        assert response.status_code == 200
+        [transaction] = response.json()['results']
+        assert transaction['payed_by']['email'] == student.email
+
+
+class TestCourseProgress:
+    my_progress_url = reverse("course:course-get-my-progress")
+    mark_complete_url = reverse("modules:module-bulk-update-complete-status")
+
+    def test_progress_follows_enrollment_completion_and_modules(self, user_factory, course_factory, module_factory, enroll_student_factory):
+        course = course_factory()
+        first, second = module_factory.create_batch(2, course=course)
+        student = user_factory()
+        enroll_student_factory(user=student, course=course)
+        progress = CourseProgress.objects.get(user=student, course=course)
+        assert (progress.completed_count, progress.total_modules, progress.last_activity) == (0, 2, None)
+
+        first.completed_by.add(student)
+        student.completed_modules.add(second)
+        progress.refresh_from_db()
+        assert (progress.completed_count, progress.percentage) == (2, 100.0)
+        assert progress.last_activity is not None
+
+        first.completed_by.remove(student, user_factory())
+        module_factory(course=course)
+        progress.refresh_from_db()
+        assert (progress.completed_count, progress.total_modules) == (1, 3)
+
+        second.delete()
+        progress.refresh_from_db()
+        assert (progress.completed_count, progress.total_modules) == (0, 2)
+
+        first.completed_by.add(student)
+        student.completed_modules.clear()
+        progress.refresh_from_db()
+        assert progress.completed_count == 0
+
+        EnrollStudent.objects.filter(user=student, course=course).delete()
+        assert not CourseProgress.objects.filter(user=student, course=course).exists()
+
+    def test_student_retrieves_own_progress(self, course_factory, module_factory, enroll_student_factory, api_client, authenticate_user):
+        user = authenticate_user(roles=["STUDENT"])
+        course, other_course = course_factory.create_batch(2)
+        module, _ = module_factory.create_batch(2, course=course)
+        enroll_student_factory(user=user['user_instance'], course=course)
+        enroll_student_factory(user=user['user_instance'], course=other_course)
+        api_client_with_credentials(user['token'], api_client)
+        response = api_client.put(self.mark_complete_url, {"is_completed": True, "modules": [str(module.id)]}, format="json")
+        assert response.status_code == 200
+
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.get(self.my_progress_url)
+        assert response.status_code == 200
+        assert len(context) == 1
+        data = response.json()['data']
+        assert [(row['course'], row['completed_count'], row['total_modules'], row['percentage']) for row in data] == [
+            (str(course.id), 1, 2, 50.0), (str(other_course.id), 0, 0, 0.0)]
+
+    def test_teacher_retrieves_course_progress(self, user_factory, course_factory, module_factory, enroll_student_factory, api_client, authenticate_user):
+        user = authenticate_user(roles=["TEACHER"])
+        course = course_factory(teachers=[user['user_instance']])
+        module = module_factory(course=course)
+        students = user_factory.create_batch(3)
+        for student in students:
+            enroll_student_factory(user=student, course=course)
+        module.completed_by.add(students[1])
+        url = reverse("course:course-get-course-progress", kwargs={"pk": course.id})
+        api_client_with_credentials(user['token'], api_client)
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.get(url)
+        assert response.status_code == 200
+        assert len(context) == 2  # teacher EXISTS check + progress rows
+        data = response.json()['data']
+        assert len(data) == 3
+        assert (data[0]['user_id'], data[0]['percentage']) == (str(students[1].id), 100.0)
+
+    def test_student_sees_only_own_course_progress(self, user_factory, course_factory, enroll_student_factory, api_client, authenticate_user):
+        user = authenticate_user(roles=["STUDENT"])
+        course = course_factory()
+        enroll_student_factory(user=user['user_instance'], course=course)
+        enroll_student_factory(user=user_factory(), course=course)
+        url = reverse("course:course-get-course-progress", kwargs={"pk": course.id})
+        api_client_with_credentials(user['token'], api_client)
+        response = api_client.get(url)
+        assert response.status_code == 200
+        assert [row['user_id'] for row in response.json()['data']] == [str(user['user_instance'].id)]
+
+    def test_deny_course_progress_to_outsider(self, course_factory, api_client, authenticate_user):
+        user = authenticate_user(roles=["TEACHER"])
+        url = reverse("course:course-get-course-progress", kwargs={"pk": course_factory().id})
+        api_client_with_credentials(user['token'], api_client)
+        assert api_client.get(url).status_code == 400
+
+    def test_rebuild_course_progress_command(self, user_factory, course_factory, module_factory, enroll_student_factory):
+        course = course_factory()
+        module = module_factory(course=course)
+        student = user_factory()
+        enroll_student_factory(user=student, course=course)
+        module.completed_by.add(student)
+        CourseProgress.objects.all().delete()
+        out = StringIO()
+        call_command("rebuild_course_progress", str(course.id), stdout=out)
+        assert "1 enrollment(s)" in out.getvalue()
+        progress = CourseProgress.objects.get(user=student, course=course)
+        assert (progress.completed_count, progress.total_modules) == (1, 1)
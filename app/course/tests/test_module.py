@@ -1,6 +1,9 @@
 import pytest
+from uuid import uuid4
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
-from course.models import Course, Module
+from course.models import Course, CourseProgress, Module
 from user.tests.conftest import api_client_with_credentials
 
 
@@ -129,10 +132,11 @@ class TestUpdateModule:
         response = api_client.patch(url, module_data, format="json")
         assert response.status_code == 400
     
-    def test_bulk_update_module_read_status(self, user_factory,module_factory,course_factory, api_client, authenticate_user):
+    def test_bulk_update_module_read_status(self, user_factory,module_factory,course_factory, enroll_student_factory, api_client, authenticate_user):
         user = authenticate_user(roles=["STUDENT"])
         course = course_factory()
         module = module_factory(course=course)
+        enroll_student_factory(user=user['user_instance'], course=course)
         token = user['token']
         api_client_with_credentials(token, api_client)
         data = {
@@ -143,7 +147,50 @@ class TestUpdateModule:
         response = api_client.put(url, data, format="json")
         assert response.status_code == 200
         assert Module.objects.get(completed_by = user['user_instance'])
-    
+
+    def test_bulk_mark_complete_query_count_is_independent_of_modules(self, module_factory, course_factory, enroll_student_factory, api_client, authenticate_user):
+        user = authenticate_user(roles=["STUDENT"])
+        courses = course_factory.create_batch(2)
+        modules = [module_factory(course=courses[index % 2]) for index in range(200)]
+        for course in courses:
+            enroll_student_factory(user=user['user_instance'], course=course)
+        modules[0].completed_by.add(user['user_instance'])
+        api_client_with_credentials(user['token'], api_client)
+        url = reverse("modules:module-bulk-update-complete-status")
+        data = {"is_completed": True, "modules": [str(module.id) for module in modules]}
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.put(url, data, format="json")
+        assert response.status_code == 200
+        assert len(context) <= 8
+        assert user['user_instance'].completed_modules.count() == 200
+        progress = CourseProgress.objects.get(user=user['user_instance'], course=courses[0])
+        assert (progress.completed_count, progress.total_modules) == (100, 100)
+
+        data = {"is_completed": False, "modules": [str(module.id) for module in modules[:150]]}
+        response = api_client.put(url, data, format="json")
+        assert response.status_code == 200
+        assert user['user_instance'].completed_modules.count() == 50
+        progress.refresh_from_db()
+        assert progress.completed_count == 25
+
+    def test_deny_mark_complete_for_course_not_enrolled(self, module_factory, course_factory, enroll_student_factory, api_client, authenticate_user):
+        user = authenticate_user(roles=["STUDENT"])
+        enrolled_course, other_course = course_factory.create_batch(2)
+        enroll_student_factory(user=user['user_instance'], course=enrolled_course)
+        modules = [module_factory(course=enrolled_course), module_factory(course=other_course)]
+        api_client_with_credentials(user['token'], api_client)
+        url = reverse("modules:module-bulk-update-complete-status")
+        response = api_client.put(url, {"is_completed": True, "modules": [str(module.id) for module in modules]}, format="json")
+        assert response.status_code == 400
+        assert not user['user_instance'].completed_modules.exists()
+
+    def test_reject_unknown_module(self, api_client, authenticate_user):
+        user = authenticate_user(roles=["STUDENT"])
+        api_client_with_credentials(user['token'], api_client)
+        url = reverse("modules:module-bulk-update-complete-status")
+        response = api_client.put(url, {"is_completed": True, "modules": [str(uuid4())]}, format="json")
+        assert response.status_code == 400
+
     
 #TODO: Submit Module Assignment Test      
 #TODO: Module Assignment Test  
@@ -4,9 +4,10 @@ from ..views import CourseViewSets, EnrollStudentViewSets,TransactionViewSets
 
 app_name = "course"
 router = DefaultRouter()
-router.register("", CourseViewSets)
+# Fixed prefixes come first; the course detail route would otherwise match /enrollment/ as a course id
 router.register("enrollment", EnrollStudentViewSets)
 router.register("transaction", TransactionViewSets)
+router.register("", CourseViewSets)
 
 urlpatterns = [
     path("", include(router.urls)),
@@ -0,0 +1,155 @@
+import csv
+import io
+import json
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
+from core.enums import COURSE_PAYMENT_STATUS
+from user.models import User
+from .caching import bump_course_version
+from .membership import ENROLLED, add_memberships
+from .models import Course, EnrollStudent, Module, Transaction
+from .progress import refresh_progress
+from .signals import completion_changed
+
+ENROLLMENT_BATCH_SIZE = 5000
+MAX_BULK_ENROLLMENT_ROWS = 100_000
+IDENTIFIER_COLUMNS = ("email", "user_id", "user", "id")
+PAYMENT_SUCCESS = COURSE_PAYMENT_STATUS[0][0]
+
+
+def read_enrollment_identifiers(content: str, filename: str = "") -> List[str]:
+    '''Reads emails/user ids from a JSON list or a CSV file.
+
+    JSON items may be strings or objects with an email/user_id key. A CSV may
+    have a header naming one of those columns, otherwise the first column is used.
+    '''
+    if filename.lower().endswith(".json") or content.lstrip().startswith("["):
+        identifiers = []
+        for item in json.loads(content):
+            if isinstance(item, dict):
+                item = next((item[key] for key in IDENTIFIER_COLUMNS if item.get(key)), "")
+            identifiers.append(str(item).strip())
+        return identifiers
+
+    rows = [row for row in csv.reader(io.StringIO(content)) if row]
+    if not rows:
+        return []
+    header = [cell.strip().lower() for cell in rows[0]]
+    column = next((header.index(name) for name in IDENTIFIER_COLUMNS if name in header), None)
+    if column is None:
+        column = 0
+    else:
+        rows = rows[1:]
+    return [row[column].strip() if len(row) > column else "" for row in rows]
+
+
+def _as_uuid(value: str) -> Optional[UUID]:
+    try:
+        return UUID(value)
+    except ValueError:
+        return None
+
+
+def resolve_users(identifiers: Iterable[str]) -> Dict[str, str]:
+    '''Maps each identifier (email, any case, or user id) to a user id in one query'''
+    uuids, emails = set(), set()
+    for identifier in identifiers:
+        user_uuid = _as_uuid(identifier)
+        if user_uuid is not None:
+            uuids.add(user_uuid)
+        elif identifier:
+            emails.add(identifier.lower())
+    if not uuids and not emails:
+        return {}
+    users = User.objects.alias(email_lower=Lower("email")).filter(
+        Q(id__in=uuids) | Q(email_lower__in=emails)).values_list("id", "email")
+    resolved = {}
+    for user_id, email in users:
+        resolved[str(user_id)] = str(user_id)
+        if email:
+            resolved[email.lower()] = str(user_id)
+    return resolved
+
+
+def _enroll_batch(course: Course, user_ids: List[str], amount_paid) -> set:
+    '''Inserts one batch of enrollments plus their transactions and returns the newly enrolled ids'''
+    with transaction.atomic():
+        enrollments = [
+            EnrollStudent(user_id=user_id, course=course, amount_paid=amount_paid)
+            for user_id in user_ids
+        ]
+        EnrollStudent.objects.bulk_create(enrollments, ignore_conflicts=True)
+        # ignore_conflicts hides which rows were skipped, so read back the ids we generated
+        enrolled = {
+            str(user_id) for user_id in EnrollStudent.objects.filter(
+                id__in=[enrollment.id for enrollment in enrollments]).values_list("user_id", flat=True)
+        }
+        Transaction.objects.bulk_create([
+            Transaction(user_id=user_id, course=course,
+                        amount_paid=float(amount_paid or 0), status=PAYMENT_SUCCESS)
+            for user_id in user_ids if user_id in enrolled
+        ])
+        refresh_progress([(user_id, course.id) for user_id in enrolled], create=True)
+    return enrolled
+
+
+def bulk_enroll_students(course: Course, identifiers: List[str], amount_paid=None,
+                         batch_size: int = ENROLLMENT_BATCH_SIZE) -> List[Dict]:
+    '''Enrolls a list of emails/user ids in a course and returns one result per row.
+
+    Statuses: enrolled, already_enrolled, duplicate (repeated in the input) and
+    not_found. Rows already enrolled are skipped through the unique
+    (user, course) constraint, so concurrent imports cannot double-enroll.
+    '''
+    if amount_paid is None:
+        amount_paid = course.course_price
+    resolved = resolve_users(identifiers)
+
+    results: List[Dict] = []
+    row_user_ids: List[Tuple[int, str]] = []
+    seen = set()
+    for row, identifier in enumerate(identifiers):
+        user_uuid = _as_uuid(identifier)
+        # resolve_users keys ids in canonical form, whatever case or braces the input used
+        user_id = resolved.get(str(user_uuid) if user_uuid else identifier.lower())
+        results.append({"row": row, "identifier": identifier, "user": user_id, "status": "not_found"})
+        if user_id is None:
+            continue
+        if user_id in seen:
+            results[row]["status"] = "duplicate"
+            continue
+        seen.add(user_id)
+        row_user_ids.append((row, user_id))
+
+    enrolled = set()
+    for start in range(0, len(row_user_ids), batch_size):
+        batch = [user_id for _, user_id in row_user_ids[start:start + batch_size]]
+        enrolled |= _enroll_batch(course, batch, amount_paid)
+    for row, user_id in row_user_ids:
+        results[row]["status"] = "enrolled" if user_id in enrolled else "already_enrolled"
+
+    if enrolled:
+        # bulk_create skips post_save, so do what the enrollment signals would have done
+        bump_course_version(course.id)
+        add_memberships(ENROLLED, [(user_id, course.id) for user_id in enrolled])
+    return results
+
+
+def set_modules_completed(user_id, module_courses: Dict, is_completed: bool) -> None:
+    '''Marks {module_id: course_id} completed or not for a user with one write.
+
+    Through rows are written directly, so instead of an m2m_changed signal per
+    module a single `completion_changed` is sent for the courses touched.
+    '''
+    through = Module.completed_by.through
+    with transaction.atomic():
+        if is_completed:
+            through.objects.bulk_create(
+                [through(module_id=module_id, user_id=user_id) for module_id in module_courses],
+                ignore_conflicts=True)
+        else:
+            through.objects.filter(user_id=user_id, module_id__in=list(module_courses)).delete()
+    completion_changed.send(sender=Module, user_id=user_id, course_ids=set(module_courses.values()))
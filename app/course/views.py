@@ -3,45 +3,59 @@ from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import Exists, Q
 from django.shortcuts import get_object_or_404
 from drf_spectacular.utils import extend_schema, inline_serializer
-from rest_framework import viewsets, filters, status
+from rest_framework import mixins, viewsets, filters, status
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from user.serializers import BasicUserInfoSerializer
+from core.exports import ExportMixin
+from core.pagination import KeysetPagination
+from search.filters import FullTextSearchFilter
 from core.utils.validators import is_admin, is_course_teacher
+from user.context import get_auth_context
 from user.models import User
 from course.models import Course, Transaction
 from rest_framework import serializers
 from user.permissions import IsSuperAdmin, IsTeacher, IsStudent, IsSchoolAdmin
 from .models import Course, EnrollStudent, Module
-from .serializers import (BulkUpdateMarkAsCompletedSerializer, CourseSerializer, EnrollStudentSerializer,
+from .caching import CATALOGUE_NAMESPACE
+from .exports import EnrollmentExport, TransactionExport
+from .membership import role_for
+from .progress import course_progress, student_progress
+from .mixins import VersionedCacheMixin
+from .serializers import (BulkEnrollmentSerializer, BulkUpdateMarkAsCompletedSerializer, CourseSerializer, EnrollStudentSerializer,
+                          CourseProgressSerializer, StudentProgressSerializer,
                           ModuleAssignmentSerializer, ModuleSerializer, TransactionSerializer,
                           CreateModuleSerializer, BasicModuleSerializer,CourseUpdateSerializer)
 
 
-class CourseViewSets(viewsets.ModelViewSet):
-    queryset = Course.objects.all().prefetch_related("teachers").select_related("created_by")
+class CourseViewSets(VersionedCacheMixin, viewsets.ModelViewSet):
+    queryset = Course.objects.with_counts().prefetch_related("teachers").select_related("created_by")
     serializer_class = CourseSerializer
     permission_classes = [IsAuthenticated]
     http_method_names = ["get", "post", "patch", "delete", "put"]
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
+        FullTextSearchFilter,
         filters.OrderingFilter,
     ]
     filterset_fields = ["is_active"]
-    search_fields = ["course_name", "display_title",
-                     "short_description", "long_description"]
     ordering_fields = ["created_at", "display_title",
                        "short_description", "is_active"]
+    # catalogue reads only need the token's id and roles
+    stateless_authentication = True
 
     def list(self, request, *args, **kwargs):
         '''Returns all courses available'''
-        return super().list(request, *args, **kwargs)
+        return self.cached_response(
+            request, CATALOGUE_NAMESPACE,
+            lambda: super(CourseViewSets, self).list(request, *args, **kwargs))
 
     def retrieve(self, request, *args, **kwargs):
         '''Returns details of a single course'''
-        return super().retrieve(request, *args, **kwargs)
+        return self.cached_response(
+            request, str(kwargs["pk"]),
+            lambda: super(CourseViewSets, self).retrieve(request, *args, **kwargs))
 
     def create(self, request, *args, **kwargs):
         '''Create a new course '''
@@ -87,22 +101,61 @@ class CourseViewSets(viewsets.ModelViewSet):
         '''Returns all modules available for course'''
         user = self.request.user
         course_instance: Course = self.get_object()
-        modules: List(Module) = course_instance.modules
-        enrolled_students_qs = course_instance.enrolled_students.all()
-        is_enrolled_student =enrolled_students_qs.filter(user=user).exists()
-        serializer_class_ = ModuleSerializer if is_admin(
-            user) or is_enrolled_student or user in course_instance.teachers.all() else BasicModuleSerializer
-        data = serializer_class_(
-            instance=modules, context={"request": request}, many=True
-        ).data
+        role_class = role_for(user, course_instance)
+
+        def _build_response():
+            serializer_class_ = ModuleSerializer if role_class in [
+                "admin", "teacher", "enrolled"] else BasicModuleSerializer
+            data = serializer_class_(
+                instance=course_instance.modules.all(), context={"request": request}, many=True
+            ).data
+            return Response({"success": True, "data": data}, status.HTTP_200_OK)
+
+        return self.cached_response(
+            request, str(course_instance.id), _build_response, role_class)
+
+    @action(
+        detail=False,
+        methods=["GET"],
+        permission_classes=[IsAuthenticated],
+        serializer_class=CourseProgressSerializer,
+        pagination_class=None,
+        url_path="progress",
+    )
+    def get_my_progress(self, request, *args, **kwargs):
+        '''Returns the auth user's progress on every course they are enrolled in'''
+        data = CourseProgressSerializer(student_progress(request.user.id), many=True).data
         return Response({"success": True, "data": data}, status.HTTP_200_OK)
 
+    @action(
+        detail=True,
+        methods=["GET"],
+        permission_classes=[IsAuthenticated],
+        serializer_class=StudentProgressSerializer,
+        pagination_class=None,
+        url_path="progress",
+    )
+    def get_course_progress(self, request, pk=None):
+        '''Returns every student's progress on a course; students only see their own'''
+        role_class = role_for(request.user, pk)
+        if role_class in ["admin", "teacher"]:
+            progress = course_progress(pk)
+        elif role_class == "enrolled":
+            progress = course_progress(pk, user_id=request.user.id)
+        else:
+            return Response({"success": False, "message": "You can only view progress for a course you teach or take."}, 400)
+        data = StudentProgressSerializer(progress, many=True).data
+        return Response({"success": True, "data": data}, status.HTTP_200_OK)
 
-class EnrollStudentViewSets(viewsets.ModelViewSet):
+
+class EnrollStudentViewSets(ExportMixin, mixins.ListModelMixin, mixins.RetrieveModelMixin,
+                            viewsets.GenericViewSet):
+    '''Read-only enrollments; students are enrolled through payment or the admin bulk action'''
     queryset = EnrollStudent.objects.all().select_related("user", "course")
     serializer_class = EnrollStudentSerializer
     permission_classes = [IsAuthenticated]
-    http_method_names = ["get"]
+    http_method_names = ["get", "post"]
+    pagination_class = KeysetPagination
     filter_backends = [
         DjangoFilterBackend,
         filters.SearchFilter,
@@ -110,26 +163,24 @@ class EnrollStudentViewSets(viewsets.ModelViewSet):
     ]
     search_fields = ["course", "user"]
     ordering_fields = ["created_at", ]
+    export_class = EnrollmentExport
 
     def get_queryset(self):
         '''Returns enrolled students base on permission'''
         auth_user: User = self.request.user
         if is_admin(auth_user):
             return self.queryset.all()
-        if "TEACHER" in auth_user.roles:
+        auth_context = get_auth_context(auth_user)
+        if auth_context.has_role("TEACHER"):
             return self.queryset.filter(Q(course__teachers=auth_user) & Q(user=auth_user))
-        if "STUDENT" in auth_user.roles:
+        if auth_context.has_role("STUDENT"):
             return self.queryset.filter(user=auth_user)
         return self.queryset.none()
 
     def get_permissions(self):
         permission_classes = self.permission_classes
-        if self.action == "create":
-            permission_classes = [IsStudent]
-        elif self.action in ["list", "retrieve"]:
+        if self.action in ["list", "retrieve"]:
             permission_classes = [AllowAny]
-        elif self.action in ["destroy"]:
-            permission_classes = [IsSuperAdmin]
         return [permission() for permission in permission_classes]
 
     def list(self, request, *args, **kwargs):
@@ -141,6 +192,31 @@ class EnrollStudentViewSets(viewsets.ModelViewSet):
         '''A unique identifier for this enrolled student'''
         return super().retrieve(request, *args, **kwargs)
 
+    @extend_schema(
+        responses={
+            200: inline_serializer(
+                name='BulkEnrollmentResult',
+                fields={
+                    "success": serializers.BooleanField(default=True),
+                    "data": serializers.ListField(child=serializers.DictField()),
+                }
+            ),
+        },
+    )
+    @action(
+        detail=False,
+        methods=["POST"],
+        permission_classes=[IsSchoolAdmin | IsSuperAdmin],
+        serializer_class=BulkEnrollmentSerializer,
+        url_path="bulk",
+    )
+    def bulk_enroll_students(self, request, pk=None):
+        '''Enrolls a list (or CSV/JSON file) of student emails or ids in a course'''
+        serializer = BulkEnrollmentSerializer(data=request.data, context={"request": request})
+        serializer.is_valid(raise_exception=True)
+        results = serializer.save()
+        return Response({"success": True, "data": results}, status.HTTP_200_OK)
+
     @action(
         detail=False,
         methods=["GET"],
@@ -166,11 +242,10 @@ class ModuleViewSets(viewsets.ModelViewSet):
     http_method_names = ["post", "put","patch", "delete"]
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
+        FullTextSearchFilter,
         filters.OrderingFilter,
     ]
-    ordering_fields = ["name"]
-    search_fields = ["module_name", "topic", "text_cotent"]
+    ordering_fields = ["module_name"]
     pagination_class = None
     serializer_class = ModuleSerializer
 
@@ -232,11 +307,12 @@ class ModuleViewSets(viewsets.ModelViewSet):
         return Response({'success': False, 'errors': serializer.errors}, status.HTTP_400_BAD_REQUEST)
 
 
-class TransactionViewSets(viewsets.ModelViewSet):
+class TransactionViewSets(ExportMixin, viewsets.ModelViewSet):
     queryset = Transaction.objects.all().select_related("user", "course")
     serializer_class = TransactionSerializer
     permission_classes = [IsAuthenticated]
     http_method_names = ["get", ]
+    pagination_class = KeysetPagination
     filter_backends = [
         DjangoFilterBackend,
         filters.SearchFilter,
@@ -244,6 +320,7 @@ class TransactionViewSets(viewsets.ModelViewSet):
     ]
     search_fields = ["course", "user", ]
     ordering_fields = ["created_at", ]
+    export_class = TransactionExport
 
     def get_queryset(self):
         auth_user: User = self.request.user
@@ -0,0 +1,19 @@
+from core.exports import ModelExport
+from .models import TakenQuiz
+
+
+class TakenQuizExport(ModelExport):
+    model = TakenQuiz
+    name = "quiz-results"
+    select_related = ("user", "quiz__module__course")
+    course_lookup = "quiz__module__course_id"
+    columns = (
+        ("Attempt ID", "id"),
+        ("Student email", "user.email"),
+        ("Course", "quiz.module.course.course_name"),
+        ("Module", "quiz.module.module_name"),
+        ("Quiz", "quiz.quiz_name"),
+        ("Score", "score"),
+        ("Percentage score", "percentage_score"),
+        ("Date taken", "date_taken"),
+    )
@@ -0,0 +1,182 @@
+'''Bulk question import.
+
+Questions come from a JSON list or a CSV file and are written with two
+bulk_create calls (questions, then answers), however many rows there are.
+Each row is validated up front; invalid rows are reported and skipped while
+the rest of the batch is imported.
+
+CSV layout, one question per row:
+
+    question,option_a,option_b,option_c,correct
+    What is 2 + 2?,3,4,5,B
+
+`correct` is the letter or 1-based number of the correct option. Every
+column whose header starts with "option" or "answer" is an option.
+'''
+import csv
+import io
+import json
+from typing import Dict, List, Optional
+from django.core.files import File
+from django.db import transaction
+from .models import Answer, Question, Quiz, TakenQuiz
+from .paper import invalidate_paper
+from .utils import invalidate_answer_key
+
+APPEND = "append"
+REPLACE = "replace"
+IMPORT_MODES = (APPEND, REPLACE)
+MAX_QUESTION_IMPORT_ROWS = 2000
+OPTION_PREFIXES = ("option", "answer")
+TRUE_VALUES = {"1", "true", "yes", "y"}
+QUESTION_MAX_LENGTH = Question._meta.get_field("prompt_question").max_length
+ANSWER_MAX_LENGTH = Answer._meta.get_field("text").max_length
+
+
+def _as_bool(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value or "").strip().lower() in TRUE_VALUES
+
+
+def _correct_index(value: str, options: int) -> Optional[int]:
+    value = value.strip()
+    if value.isdigit():
+        index = int(value) - 1
+    elif len(value) == 1 and value.isalpha():
+        index = ord(value.upper()) - ord("A")
+    else:
+        return None
+    return index if 0 <= index < options else None
+
+
+def _cell(row: List[str], index: Optional[int]) -> str:
+    return row[index].strip() if index is not None and index < len(row) else ""
+
+
+def _read_csv_rows(content: str) -> List[Dict]:
+    reader = csv.reader(io.StringIO(content))
+    header = [cell.strip().lower() for cell in next(reader, [])]
+    if "question" not in header or "correct" not in header:
+        raise ValueError("A CSV file needs a header with question and correct columns.")
+    option_columns = [index for index, name in enumerate(header) if name.startswith(OPTION_PREFIXES)]
+    question_column, correct_column = header.index("question"), header.index("correct")
+    audio_column = header.index("has_audio") if "has_audio" in header else None
+
+    questions = []
+    for row in reader:
+        if not any(cell.strip() for cell in row):
+            continue
+        options = [_cell(row, index) for index in option_columns if _cell(row, index)]
+        correct = _correct_index(_cell(row, correct_column), len(options))
+        questions.append({
+            "prompt_question": _cell(row, question_column),
+            "has_audio": _as_bool(_cell(row, audio_column)),
+            "answers": [
+                {"text": text, "is_correct": index == correct, "has_audio": False}
+                for index, text in enumerate(options)
+            ],
+        })
+    return questions
+
+
+def read_question_rows(content: str, filename: str = "") -> List[Dict]:
+    '''Reads questions from a JSON list (the set-questions payload shape) or a CSV file'''
+    if filename.lower().endswith(".json") or content.lstrip().startswith("["):
+        rows = json.loads(content)
+        if not isinstance(rows, list):
+            raise ValueError("A JSON file must hold a list of questions.")
+        return rows
+    return _read_csv_rows(content)
+
+
+def _prompt(row: Dict) -> str:
+    return str(row.get("prompt_question") or row.get("question") or "").strip()
+
+
+def validate_question_row(row) -> List[str]:
+    '''Returns the problems with one question; an empty list means it can be imported'''
+    if not isinstance(row, dict):
+        return ["Expected an object with prompt_question and answers."]
+    errors = []
+    prompt = _prompt(row)
+    if not prompt:
+        errors.append("The question text is required.")
+    elif len(prompt) > QUESTION_MAX_LENGTH:
+        errors.append(f"The question text is longer than {QUESTION_MAX_LENGTH} characters.")
+    answers = row.get("answers")
+    if not isinstance(answers, list) or len(answers) < 2:
+        return errors + ["A question needs at least two answers."]
+    if any(not isinstance(answer, dict) or not str(answer.get("text") or "").strip() for answer in answers):
+        errors.append("Every answer needs a text.")
+        return errors
+    if any(len(str(answer["text"]).strip()) > ANSWER_MAX_LENGTH for answer in answers):
+        errors.append(f"An answer is longer than {ANSWER_MAX_LENGTH} characters.")
+    if sum(_as_bool(answer.get("is_correct")) for answer in answers) != 1:
+        errors.append("A question needs exactly one correct answer.")
+    return errors
+
+
+def _uploaded_file(value) -> Optional[File]:
+    '''Only files uploaded through set-questions; a raw string would point the field at any stored path'''
+    return value if isinstance(value, File) else None
+
+
+def create_questions(quiz: Quiz, rows: List[Dict]) -> List[Question]:
+    '''Inserts questions and their answers with one bulk_create each.
+
+    Ids are generated client-side, so the answers can point at their
+    questions without reading the inserted rows back. bulk_create skips
+    post_save, so the quiz caches are invalidated once the transaction commits.
+    '''
+    questions = [
+        Question(quiz=quiz,
+                 prompt_question=_prompt(row),
+                 has_audio=_as_bool(row.get("has_audio")),
+                 question_audio_record=_uploaded_file(row.get("question_audio_record")))
+        for row in rows
+    ]
+    answers = [
+        Answer(question=question,
+               text=str(answer.get("text") or "").strip(),
+               is_correct=_as_bool(answer.get("is_correct")),
+               has_audio=_as_bool(answer.get("has_audio")),
+               answer_audio_record=_uploaded_file(answer.get("answer_audio_record")))
+        for question, row in zip(questions, rows)
+        for answer in row.get("answers") or []
+    ]
+    with transaction.atomic():
+        Question.objects.bulk_create(questions)
+        Answer.objects.bulk_create(answers)
+        transaction.on_commit(lambda: invalidate_answer_key(quiz.id))
+        transaction.on_commit(lambda: invalidate_paper([quiz.id]))
+    return questions
+
+
+def import_questions(quiz: Quiz, rows: List, mode: str = APPEND) -> List[Dict]:
+    '''Imports question rows into a quiz and returns one result per row.
+
+    Statuses are created (with the new question id) and invalid (with its
+    errors). In replace mode the existing questions are removed first, unless
+    no row is valid, and replacing is refused once students have attempted
+    the quiz.
+    '''
+    if mode == REPLACE and TakenQuiz.objects.filter(quiz=quiz).exists():
+        raise ValueError("This quiz has attempts; its questions can no longer be replaced.")
+
+    results: List[Dict] = []
+    valid_rows: List[Dict] = []
+    for index, row in enumerate(rows):
+        errors = validate_question_row(row)
+        results.append({"row": index, "status": "invalid" if errors else "created", "errors": errors})
+        if not errors:
+            valid_rows.append(row)
+
+    with transaction.atomic():
+        if mode == REPLACE and valid_rows:
+            Question.objects.filter(quiz=quiz).delete()
+        questions = iter(create_questions(quiz, valid_rows))
+    for result in results:
+        if result["status"] == "created":
+            result["question"] = str(next(questions).id)
+    return results
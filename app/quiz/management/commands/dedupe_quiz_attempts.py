@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from quiz.models import ExamSession, TakenQuiz, TakenQuizAnswer
+
+# Every attempt but the first of each (user, quiz)
+DUPLICATE_ATTEMPTS_SQL = '''
+    SELECT id FROM (
+        SELECT id, ROW_NUMBER() OVER (PARTITION BY user_id, quiz_id ORDER BY date_taken, id) AS position
+        FROM {table}
+    ) AS attempts
+    WHERE position > 1
+'''
+
+
+class Command(BaseCommand):
+    help = ("Keep only the first attempt of each user at each quiz; "
+            "run before migrating the unique_quiz_attempt constraint")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Report duplicates without deleting them")
+
+    def handle(self, *args, **options):
+        # Raw SQL rather than the ORM collector: before migrate, the tables that
+        # reference attempts (answers, exam sessions) may not exist yet
+        attempts = TakenQuiz._meta.db_table
+        duplicates = DUPLICATE_ATTEMPTS_SQL.format(table=connection.ops.quote_name(attempts))
+        with transaction.atomic(), connection.cursor() as cursor:
+            tables = set(connection.introspection.table_names(cursor))
+            if attempts not in tables:
+                self.stdout.write("No attempts table yet, nothing to dedupe")
+                return
+            cursor.execute(duplicates)
+            duplicate_ids = [row[0] for row in cursor.fetchall()]
+            if options["dry_run"] or not duplicate_ids:
+                self.stdout.write(f"{len(duplicate_ids)} duplicate attempt(s) "
+                                  f"{'would be' if options['dry_run'] else 'were'} deleted")
+                return
+
+            deleted_answers = 0
+            if TakenQuizAnswer._meta.db_table in tables:
+                cursor.execute(
+                    f"DELETE FROM {connection.ops.quote_name(TakenQuizAnswer._meta.db_table)} "
+                    "WHERE taken_quiz_id = ANY(%s)", [duplicate_ids])
+                deleted_answers = cursor.rowcount
+            if ExamSession._meta.db_table in tables:
+                cursor.execute(
+                    f"UPDATE {connection.ops.quote_name(ExamSession._meta.db_table)} SET taken_quiz_id = NULL "
+                    "WHERE taken_quiz_id = ANY(%s)", [duplicate_ids])
+            cursor.execute(
+                f"DELETE FROM {connection.ops.quote_name(attempts)} WHERE id = ANY(%s)", [duplicate_ids])
+            deleted_attempts = cursor.rowcount
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {deleted_attempts} duplicate attempt(s) and {deleted_answers} of their answer(s)"))
@@ -0,0 +1,36 @@
+from collections import Counter
+from pathlib import Path
+from django.core.management.base import BaseCommand, CommandError
+from quiz.imports import APPEND, IMPORT_MODES, import_questions, read_question_rows
+from quiz.models import Quiz
+
+
+class Command(BaseCommand):
+    help = "Import the questions listed in a CSV or JSON file into a quiz"
+
+    def add_arguments(self, parser):
+        parser.add_argument("quiz_id")
+        parser.add_argument("path", help="CSV or JSON file of questions, see quiz.imports")
+        parser.add_argument("--mode", choices=IMPORT_MODES, default=APPEND,
+                            help="replace removes the quiz's current questions first")
+
+    def handle(self, *args, **options):
+        quiz = Quiz.objects.filter(id=options["quiz_id"]).first()
+        if quiz is None:
+            raise CommandError(f"Quiz {options['quiz_id']} does not exist.")
+        path = Path(options["path"])
+        if not path.exists():
+            raise CommandError(f"{path} does not exist.")
+
+        try:
+            rows = read_question_rows(path.read_text(encoding="utf-8-sig"), path.name)
+            results = import_questions(quiz, rows, options["mode"])
+        except ValueError as error:
+            raise CommandError(str(error))
+
+        for result in results:
+            if result["errors"]:
+                self.stderr.write(f"Row {result['row']}: {' '.join(result['errors'])}")
+        counts = Counter(result["status"] for result in results)
+        summary = ", ".join(f"{count} {status}" for status, count in sorted(counts.items()))
+        self.stdout.write(self.style.SUCCESS(f"{len(results)} row(s): {summary or 'nothing to do'}"))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+from quiz.models import Quiz
+from quiz.utils import regrade_quiz_attempts
+
+
+class Command(BaseCommand):
+    help = "Recompute TakenQuiz scores from the stored responses after an answer key change"
+
+    def add_arguments(self, parser):
+        parser.add_argument("quiz_ids", nargs="*", help="Quizzes to regrade")
+        parser.add_argument("--all", action="store_true", help="Regrade every quiz")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if options["all"]:
+            quiz_ids = Quiz.objects.values_list("id", flat=True).iterator()
+        elif options["quiz_ids"]:
+            quiz_ids = options["quiz_ids"]
+        else:
+            raise CommandError("Pass one or more quiz ids or --all.")
+
+        for quiz_id in quiz_ids:
+            regraded_count = regrade_quiz_attempts(quiz_id, batch_size=options["batch_size"])
+            self.stdout.write(f"Quiz {quiz_id}: regraded {regraded_count} attempt(s)")
@@ -0,0 +1,26 @@
+from django.db import models
+from django.db.models import Exists, OuterRef
+from course.managers import count_subquery
+
+
+class QuizQuerySet(models.QuerySet):
+
+    def with_question_counts(self) -> models.QuerySet:
+        """Annotate the number of questions so listing does not COUNT per quiz"""
+        from .models import Question
+
+        return self.annotate(num_questions=count_subquery(Question.objects.all(), "quiz"))
+
+    def accessible_to(self, user) -> models.QuerySet:
+        """Quizzes of courses the user teaches or is enrolled in.
+
+        EXISTS keeps one row per quiz, where OR-ing the teacher and enrollment
+        joins multiplied rows and needed DISTINCT.
+        """
+        from course.models import Course, EnrollStudent
+
+        teaches = Course.teachers.through.objects.filter(
+            course_id=OuterRef("module__course_id"), user_id=user.pk)
+        enrolled = EnrollStudent.objects.filter(
+            course_id=OuterRef("module__course_id"), user_id=user.pk)
+        return self.filter(Exists(teaches) | Exists(enrolled))
@@ -1,18 +1,30 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models import Q
+from core.indexes import ConcurrentGinIndex, ConcurrentIndex
 from core.models import AuditableModel
+from .managers import QuizQuerySet
 
 class Quiz(AuditableModel):
     module = models.OneToOneField("course.Module", related_name="module_quiz", on_delete=models.CASCADE, blank=True, null=True)
     quiz_name = models.CharField(max_length=255) 
+    # time allowed for an exam session; sessions fall back to DEFAULT_EXAM_DURATION
+    duration_minutes = models.PositiveIntegerField(blank=True, null=True)
     created_by =  models.ForeignKey("user.User", related_name='created_quizzes',on_delete=models.CASCADE
 	)
+    search_vector = SearchVectorField(null=True, editable=False, serialize=False)
+
+    objects = QuizQuerySet.as_manager()
     
     class Meta:
         verbose_name_plural = "Quizzes"
         ordering = ['id','module']
+        indexes = [ConcurrentGinIndex(fields=["search_vector"], name="quiz_search_vector_idx")]
     
     @property    
     def question_count(self)->int:
+        if hasattr(self, "num_questions"):
+            return self.num_questions
         return self.questions.count()
     
     def __str__(self):
@@ -57,6 +69,44 @@ class TakenQuiz(AuditableModel):
     score = models.FloatField()
     date_taken = models.DateTimeField(auto_now_add=True)
     percentage_score = models.FloatField(default=0.00)
+
+    class Meta:
+        constraints = [
+            # also serves the (user, quiz) attempt lookups
+            models.UniqueConstraint(fields=["user", "quiz"], name="unique_quiz_attempt"),
+        ]
+
+    def __str__(self):
+        return f'{self.quiz} - {self.user}'
+
+
+class TakenQuizAnswer(AuditableModel):
+    taken_quiz = models.ForeignKey(TakenQuiz, on_delete=models.CASCADE, related_name='answers')
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name='taken_answers')
+    answer = models.ForeignKey(Answer, on_delete=models.CASCADE, related_name='taken_answers')
+
+    def __str__(self):
+        return f'{self.taken_quiz} - {self.question}'
+
+
+class ExamSession(AuditableModel):
+    '''A timed sitting of a quiz; answers are drafted in Redis until it is submitted'''
+    user = models.ForeignKey("user.User", on_delete=models.CASCADE, related_name='exam_sessions')
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name='exam_sessions')
+    deadline = models.DateTimeField()
+    submitted_at = models.DateTimeField(blank=True, null=True)
+    taken_quiz = models.OneToOneField(
+        TakenQuiz, on_delete=models.SET_NULL, related_name='exam_session', blank=True, null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "quiz"], name="unique_exam_session"),
+        ]
+        indexes = [
+            # the auto-submit job scans open sessions by deadline
+            ConcurrentIndex(fields=["deadline"], name="examsession_open_deadline_idx",
+                            condition=Q(submitted_at__isnull=True)),
+        ]
+
     def __str__(self):
         return f'{self.quiz} - {self.user}'
-	
\ No newline at end of file
@@ -0,0 +1,73 @@
+'''Renders a quiz "paper": the quiz with its questions and answers.
+
+Questions and answers are read with one prefetch (two queries) whatever the
+number of questions. Teachers and admins get the full paper including
+`is_correct`; students get a projection without it, which is identical for
+every student and is therefore cached per quiz version. Any change to the
+quiz, its questions or answers bumps that version (see `quiz.signals`).
+The cached copy holds relative audio URLs, which are made absolute for the
+request serving it, as teachers get them.
+'''
+from typing import Dict, List, Optional
+from django.core.cache import cache
+from django.db.models import Prefetch, prefetch_related_objects
+from course.caching import build_cache_key, bump_versions
+from .models import Answer, Question, Quiz
+
+PAPER_CACHE_TTL = 60 * 60
+TEACHER = "teacher"
+STUDENT = "student"
+
+
+def paper_namespace(quiz_id) -> str:
+    return f"quiz-paper:{quiz_id}"
+
+
+def prefetch_paper(quiz: Quiz) -> Quiz:
+    '''Loads questions and their answers onto `quiz` in two queries'''
+    prefetch_related_objects([quiz], Prefetch(
+        "questions",
+        queryset=Question.objects.prefetch_related(
+            Prefetch("answers", queryset=Answer.objects.order_by("created_at", "id")))))
+    return quiz
+
+
+def render_paper(quiz: Quiz, projection: str, context: Dict = None) -> Dict:
+    from .serializers import QuizDetailsSerializer, StudentQuizDetailsSerializer
+
+    serializer_class = QuizDetailsSerializer if projection == TEACHER else StudentQuizDetailsSerializer
+    return serializer_class(prefetch_paper(quiz), context=context or {}).data
+
+
+def _absolute_url(request, url: Optional[str]) -> Optional[str]:
+    return request.build_absolute_uri(url) if url else url
+
+
+def _with_absolute_audio_urls(paper: Dict, request) -> Dict:
+    return {**paper, "questions": [
+        {**question,
+         "question_audio_record": _absolute_url(request, question["question_audio_record"]),
+         "answers": [{**answer, "answer_audio_record": _absolute_url(request, answer["answer_audio_record"])}
+                     for answer in question["answers"]]}
+        for question in paper["questions"]
+    ]}
+
+
+def student_paper(quiz: Quiz, request=None) -> Dict:
+    '''The student projection, served from cache once rendered.
+
+    It is rendered without a request so the cached copy is valid for every
+    student; audio URLs are made absolute for `request` on the way out.
+    '''
+    cache_key = build_cache_key(paper_namespace(quiz.pk), STUDENT)
+    paper = cache.get(cache_key)
+    if paper is None:
+        paper = render_paper(quiz, STUDENT)
+        cache.set(cache_key, paper, PAPER_CACHE_TTL)
+    if request is not None:
+        paper = _with_absolute_audio_urls(paper, request)
+    return paper
+
+
+def invalidate_paper(quiz_ids: List) -> None:
+    bump_versions([paper_namespace(quiz_id) for quiz_id in quiz_ids])
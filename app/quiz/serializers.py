@@ -1,14 +1,20 @@
+import json
 from typing import Dict, List
 from rest_framework import serializers
-from django.db import transaction
+from django.db import IntegrityError, transaction
 from user.serializers import BasicUserInfoSerializer
 from core.utils.validators import is_admin
 from course.serializers import CourseSerializer
 from course.models import Module
-from core.utils.validators import is_course_student
+from core.utils.validators import is_course_student, is_course_teacher
 from user.models import User
-from .models import Quiz, Question, Answer, TakenQuiz
-from .utils import score_test_attempt
+from .models import ExamSession, Quiz, Question, Answer, TakenQuiz
+from .imports import (APPEND, IMPORT_MODES, MAX_QUESTION_IMPORT_ROWS, create_questions,
+                      import_questions, read_question_rows)
+from .sessions import is_open, remaining_seconds, save_answer, start_session
+from .utils import (
+    load_answer_key, save_attempt_answers,
+    score_test_attempt, validate_submissions)
 from django.db.models.fields.files import File
 
 
@@ -39,19 +45,37 @@ class QuestionSerializer(serializers.ModelSerializer):
         }
 
 
+class StudentAnswerSerializer(serializers.ModelSerializer):
+    '''An answer option as shown to a student, without `is_correct`'''
+    class Meta:
+        fields = ['id', 'text', 'has_audio', 'answer_audio_record']
+        model = Answer
+        read_only_fields = fields
+
+
+class StudentQuestionSerializer(serializers.ModelSerializer):
+    answers = StudentAnswerSerializer(many=True, read_only=True)
+
+    class Meta:
+        fields = ['id', 'quiz', 'prompt_question',
+                  'answers', 'has_audio', 'question_audio_record']
+        model = Question
+        read_only_fields = fields
+
+
 class QuizCreateSerializer(serializers.Serializer):
     quiz_name = serializers.CharField(max_length=200, required=True)
     module = serializers.PrimaryKeyRelatedField(
         queryset=Module.objects.all(), required=True
     )
+    duration_minutes = serializers.IntegerField(min_value=1, required=False, allow_null=True)
     created_by = BasicUserInfoSerializer(read_only=True)
 
 
     def validate(self, attrs):
         user: User = self.context["request"].user
         module: Module = attrs.get("module")
-        teachers = module.course.teachers.all()
-        if user not in teachers and not is_admin(user):
+        if not is_course_teacher(user, module.course_id) and not is_admin(user):
             raise serializers.ValidationError(
                 {"module": "You can only create a quiz for a course you teach."})
         return super().validate(attrs)
@@ -61,7 +85,8 @@ class QuizCreateSerializer(serializers.Serializer):
         quiz_name: str = validated_data.get("quiz_name")
         module: Module = validated_data.get("module")
         insance = Quiz.objects.create(
-            module=module, quiz_name=quiz_name, created_by=user)
+            module=module, quiz_name=quiz_name, created_by=user,
+            duration_minutes=validated_data.get("duration_minutes"))
         return insance
 
 
@@ -77,8 +102,7 @@ class QuizUpdateSerializer(serializers.ModelSerializer):
     def validate(self, attrs):
         user: User = self.context["request"].user
         module: Module = self.instance.module
-        teachers = module.course.teachers.all()
-        if user not in teachers and not is_admin(user):
+        if not is_course_teacher(user, module.course_id) and not is_admin(user):
             raise serializers.ValidationError(
                 {"module": "You can only create/edite/delete a quiz for a course you teach."})
         return super().validate(attrs)
@@ -119,6 +143,14 @@ class QuizDetailsSerializer(serializers.ModelSerializer):
         return data
 
 
+class StudentQuizDetailsSerializer(serializers.ModelSerializer):
+    questions = StudentQuestionSerializer(read_only=True, many=True)
+
+    class Meta:
+        fields = "__all__"
+        model = Quiz
+
+
 class TakenQuizSerializer(serializers.ModelSerializer):
 
     class Meta:
@@ -135,41 +167,60 @@ class CreatModuleQuizQuestionSerializer(serializers.Serializer):
         if module.module_quiz is None:
             raise serializers.ValidationError(
                 {"module": "No quiz found for this module. Create one to continue"})
-        if user not in module.course.teachers.all() and not is_admin(user):
+        if not is_course_teacher(user, module.course_id) and not is_admin(user):
             raise serializers.ValidationError(
                 {"module": "You need to be a teacher to set questions."})
         return super().validate(attrs)
 
-    @transaction.atomic
     def create(self, validated_data):
         quiz = self.context.get('module').module_quiz
-        questions_list: List[Dict] = validated_data.get('questions')
-        for question in questions_list:
-            question_data = {
-                'quiz': quiz,
-                'prompt_question': question.get('prompt_question'),
-                'has_audio': question.get('has_audio'),
-                'question_audio_record': question.get('question_audio_record')
-
-            }
-            question_instance = Question.objects.create(**question_data)
-            answers = [Answer(question=question_instance,
-                              text=answer.get('text', None), has_audio=answer.get('has_audio', False),
-                              answer_audio_record=answer.get('answer_audio_record', False),
-                              is_correct=answer.get('is_correct', False)
-                              ) for answer in question.get('answers')]
-
-            Answer.objects.bulk_create(answers)
+        create_questions(quiz, validated_data.get('questions'))
         return validated_data
 
 
+class QuestionImportSerializer(serializers.Serializer):
+    '''Import questions from a JSON list or a CSV/JSON file; see `quiz.imports`'''
+    questions = serializers.ListField(child=serializers.JSONField(), required=False, write_only=True)
+    file = serializers.FileField(required=False, write_only=True)
+    mode = serializers.ChoiceField(choices=IMPORT_MODES, default=APPEND, write_only=True)
+
+    def validate(self, attrs):
+        user: User = self.context["request"].user
+        module: Module = self.context.get('module')
+        if not hasattr(module, "module_quiz"):
+            raise serializers.ValidationError(
+                {"module": "No quiz found for this module. Create one to continue"})
+        if not is_course_teacher(user, module.course_id) and not is_admin(user):
+            raise serializers.ValidationError(
+                {"module": "You need to be a teacher to set questions."})
+        if bool(attrs.get("questions")) == bool(attrs.get("file")):
+            raise serializers.ValidationError(
+                {"questions": "Provide either a list of questions or a file."})
+        if attrs.get("file"):
+            upload = attrs.pop("file")
+            try:
+                attrs["questions"] = read_question_rows(upload.read().decode("utf-8-sig"), upload.name)
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                raise serializers.ValidationError({"file": "Upload a UTF-8 CSV or JSON file."})
+            except ValueError as error:
+                raise serializers.ValidationError({"file": str(error)})
+        if len(attrs["questions"]) > MAX_QUESTION_IMPORT_ROWS:
+            raise serializers.ValidationError(
+                {"questions": f"At most {MAX_QUESTION_IMPORT_ROWS} questions per request."})
+        return super().validate(attrs)
+
+    def create(self, validated_data):
+        try:
+            return import_questions(
+                self.context.get('module').module_quiz, validated_data["questions"], validated_data["mode"])
+        except ValueError as error:
+            raise serializers.ValidationError({"mode": str(error)})
+
+
 class BaseQuizAttemptSerializer(serializers.Serializer):
-    question = serializers.PrimaryKeyRelatedField(
-        queryset=Question.objects.all(), required=True
-    )
-    answer = serializers.PrimaryKeyRelatedField(
-        queryset=Answer.objects.all(), required=True
-    )
+    '''Raw ids, resolved in bulk against the quiz answer key'''
+    question = serializers.UUIDField(required=True)
+    answer = serializers.UUIDField(required=True)
 
 
 class AttemptQuizSerializer(serializers.Serializer):
@@ -182,9 +233,14 @@ class AttemptQuizSerializer(serializers.Serializer):
         if TakenQuiz.objects.filter(user=user, quiz__module=module).exists():
             raise serializers.ValidationError(
                 {"module": "You have taken this quiz before"})
-        if module.module_quiz.question_count == 0:
+        if ExamSession.objects.filter(user=user, quiz__module=module).exists():
+            raise serializers.ValidationError(
+                {"module": "Submit your exam session for this quiz instead."})
+        self.answer_key = load_answer_key(module.module_quiz.id)
+        if not self.answer_key:
             raise serializers.ValidationError(
                 {"module": "Quiz question not yet set!"})
+        validate_submissions(self.answer_key, attrs.get('submissions'))
         return super().validate(attrs)
     
     def to_representation(self, instance):
@@ -192,15 +248,79 @@ class AttemptQuizSerializer(serializers.Serializer):
         data['result'] = self.custom_result_dict
         return data
 
+    @transaction.atomic
     def create(self, validated_data):    
         user: User = self.context["request"].user
         module: Module = self.context.get('module')
-        total_question_count = module.module_quiz.question_count
-        result : Dict = score_test_attempt(total_question_count,validated_data)
+        result : Dict = score_test_attempt(self.answer_key, validated_data)
        
        
-        TakenQuiz.objects.create(user=user, quiz=module.module_quiz, score=result.get('score'),
-                                 percentage_score=result.get('score_percent'))
+        try:
+            # the unique (user, quiz) constraint admits one of several concurrent submissions
+            with transaction.atomic():
+                taken_quiz = TakenQuiz.objects.create(user=user, quiz=module.module_quiz, score=result.get('score'),
+                                         percentage_score=result.get('score_percent'))
+        except IntegrityError:
+            raise serializers.ValidationError(
+                {"module": "You have taken this quiz before"})
+        save_attempt_answers(taken_quiz, validated_data.get('submissions'))
 
         self.custom_result_dict = result
         return validated_data
+
+
+class ExamSessionSerializer(serializers.ModelSerializer):
+    '''A session with its remaining time and the drafted answers passed in as context["answers"]'''
+    class Meta:
+        fields = ['id', 'quiz', 'created_at', 'deadline', 'submitted_at', 'taken_quiz']
+        model = ExamSession
+        read_only_fields = fields
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        data['remaining_seconds'] = remaining_seconds(instance)
+        data['answers'] = self.context.get('answers', {})
+        return data
+
+
+class StartExamSessionSerializer(serializers.Serializer):
+
+    def validate(self, attrs):
+        user: User = self.context["request"].user
+        module: Module = self.context.get('module')
+        is_course_student(user, module)
+        if not hasattr(module, "module_quiz"):
+            raise serializers.ValidationError(
+                {"module": "No quiz found for this module."})
+        if TakenQuiz.objects.filter(user=user, quiz__module=module).exists():
+            raise serializers.ValidationError(
+                {"module": "You have taken this quiz before"})
+        if not load_answer_key(module.module_quiz.id):
+            raise serializers.ValidationError(
+                {"module": "Quiz question not yet set!"})
+        return super().validate(attrs)
+
+    def create(self, validated_data):
+        return start_session(self.context["request"].user, self.context.get('module').module_quiz)
+
+
+class ExamAnswerSerializer(serializers.Serializer):
+    '''Autosaves one answer of a running exam session to its Redis draft'''
+    question = serializers.UUIDField(required=True)
+    answer = serializers.UUIDField(required=True)
+
+    def validate(self, attrs):
+        session: ExamSession = self.context.get('session')
+        if not is_open(session):
+            raise serializers.ValidationError(
+                {"session": "This exam session is closed."})
+        answer_key = load_answer_key(session.quiz_id)
+        options = answer_key.get(str(attrs['question']), {}).get("answers", set())
+        if str(attrs['answer']) not in options:
+            raise serializers.ValidationError(
+                {"answer": "Answer does not belong to this question."})
+        return super().validate(attrs)
+
+    def create(self, validated_data):
+        save_answer(self.context.get('session'), validated_data['question'], validated_data['answer'])
+        return validated_data
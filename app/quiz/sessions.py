@@ -0,0 +1,159 @@
+'''Timed exam sessions.
+
+Starting a quiz creates an `ExamSession` with a deadline. Answers autosaved
+during the exam go to a Redis hash (question id -> answer id) instead of
+Postgres, so thousands of students answering at once cost no database
+writes. Submitting, or the deadline passing, flushes the draft into a
+`TakenQuiz` through the same answer key and grading as one-shot attempts.
+Expired sessions are submitted in batches by the
+`submit_expired_exam_sessions` beat task.
+'''
+from datetime import timedelta
+from functools import partial
+from typing import Dict, Iterable, List
+from django.db import transaction
+from django.utils import timezone
+from django_redis import get_redis_connection
+from user.models import User
+from .models import ExamSession, Quiz, TakenQuiz, TakenQuizAnswer
+from .utils import grade_selection, load_answer_key
+
+DEFAULT_EXAM_DURATION = 60  # minutes
+# Late autosaves/submits still count for this long after the deadline
+EXAM_GRACE_SECONDS = 30
+# Drafts outlive the deadline so a delayed auto-submit still finds them
+DRAFT_RETENTION = 60 * 60 * 24
+EXPIRED_SESSION_BATCH_SIZE = 500
+
+
+def _draft_key(session_id) -> str:
+    return f"exam-draft:{session_id}"
+
+
+def _redis():
+    return get_redis_connection("default")
+
+
+def is_open(session: ExamSession) -> bool:
+    grace = timedelta(seconds=EXAM_GRACE_SECONDS)
+    return session.submitted_at is None and timezone.now() <= session.deadline + grace
+
+
+def remaining_seconds(session: ExamSession) -> int:
+    if session.submitted_at is not None:
+        return 0
+    return max(0, int((session.deadline - timezone.now()).total_seconds()))
+
+
+def start_session(user: User, quiz: Quiz) -> ExamSession:
+    '''Starts the user's session, or returns the running one so a reload resumes it'''
+    duration = timedelta(minutes=quiz.duration_minutes or DEFAULT_EXAM_DURATION)
+    session, _ = ExamSession.objects.get_or_create(
+        user=user, quiz=quiz, defaults={"deadline": timezone.now() + duration})
+    return session
+
+
+def save_answer(session: ExamSession, question_id, answer_id) -> None:
+    key = _draft_key(session.pk)
+    retention = int((session.deadline - timezone.now()).total_seconds()) + DRAFT_RETENTION
+    pipeline = _redis().pipeline()
+    pipeline.hset(key, str(question_id), str(answer_id))
+    pipeline.expire(key, max(retention, EXAM_GRACE_SECONDS))
+    pipeline.execute()
+
+
+def load_drafts(session_ids: Iterable) -> Dict[str, Dict[str, str]]:
+    '''Reads the drafts of many sessions in one round trip'''
+    session_ids = [str(session_id) for session_id in session_ids]
+    pipeline = _redis().pipeline()
+    for session_id in session_ids:
+        pipeline.hgetall(_draft_key(session_id))
+    return {
+        session_id: {question.decode(): answer.decode() for question, answer in draft.items()}
+        for session_id, draft in zip(session_ids, pipeline.execute())
+    }
+
+
+def clear_drafts(session_ids: Iterable) -> None:
+    keys = [_draft_key(session_id) for session_id in session_ids]
+    if keys:
+        _redis().delete(*keys)
+
+
+def _record_attempts(sessions: List[ExamSession]) -> Dict[str, Dict]:
+    '''Grades locked, unsubmitted sessions from their drafts and records the attempts in bulk.
+
+    Draft answers that are not options of their question are ignored. A
+    session whose user already holds an attempt (e.g. through the one-shot
+    endpoint) is closed without a second `TakenQuiz`.
+    '''
+    drafts = load_drafts(session.pk for session in sessions)
+    answer_keys = {quiz_id: load_answer_key(quiz_id) for quiz_id in {session.quiz_id for session in sessions}}
+    results: Dict[str, Dict] = {}
+    attempts: Dict[str, TakenQuiz] = {}
+    selections: Dict[str, Dict[str, str]] = {}
+    for session in sessions:
+        answer_key = answer_keys[session.quiz_id]
+        selections[str(session.pk)] = {
+            question_id: answer_id for question_id, answer_id in drafts[str(session.pk)].items()
+            if answer_id in answer_key.get(question_id, {}).get("answers", ())
+        }
+        result = grade_selection(answer_key, {
+            question_id: {answer_id} for question_id, answer_id in selections[str(session.pk)].items()})
+        results[str(session.pk)] = result
+        attempts[str(session.pk)] = TakenQuiz(
+            user_id=session.user_id, quiz_id=session.quiz_id,
+            score=result.get('score'), percentage_score=result.get('score_percent'))
+
+    TakenQuiz.objects.bulk_create(attempts.values(), ignore_conflicts=True)
+    # ignore_conflicts hides which rows were skipped, so read back the ids we generated
+    recorded = set(TakenQuiz.objects.filter(
+        id__in=[attempt.id for attempt in attempts.values()]).values_list("id", flat=True))
+    TakenQuizAnswer.objects.bulk_create([
+        TakenQuizAnswer(taken_quiz=attempts[session_id], question_id=question_id, answer_id=answer_id)
+        for session_id, selection in selections.items() if attempts[session_id].id in recorded
+        for question_id, answer_id in selection.items()
+    ])
+    now = timezone.now()
+    for session in sessions:
+        attempt = attempts[str(session.pk)]
+        session.submitted_at = now
+        session.taken_quiz_id = attempt.id if attempt.id in recorded else None
+    ExamSession.objects.bulk_update(sessions, ["submitted_at", "taken_quiz"])
+    return results
+
+
+def submit_session(session: ExamSession) -> Dict:
+    '''Submits one session, even past its deadline, and returns its result.
+
+    The session stays closed when the user already held an attempt, but no
+    result is returned for it since nothing was recorded.
+    '''
+    with transaction.atomic():
+        session = ExamSession.objects.select_for_update().get(pk=session.pk)
+        if session.submitted_at is not None:
+            raise ValueError("This exam session has already been submitted.")
+        result = _record_attempts([session])[str(session.pk)]
+        transaction.on_commit(partial(clear_drafts, [session.pk]))
+    if session.taken_quiz_id is None:
+        raise ValueError("You have taken this quiz before")
+    return result
+
+
+def submit_expired_sessions(batch_size: int = EXPIRED_SESSION_BATCH_SIZE) -> int:
+    '''Submits every session past its deadline, one locked batch per transaction.
+
+    Rows locked by a student submitting at the same moment are skipped and
+    left to that request, so a session is never graded twice.
+    '''
+    cutoff = timezone.now() - timedelta(seconds=EXAM_GRACE_SECONDS)
+    submitted = 0
+    while True:
+        with transaction.atomic():
+            sessions = list(ExamSession.objects.select_for_update(skip_locked=True).filter(
+                submitted_at__isnull=True, deadline__lt=cutoff).order_by("deadline")[:batch_size])
+            if not sessions:
+                return submitted
+            _record_attempts(sessions)
+            transaction.on_commit(partial(clear_drafts, [session.pk for session in sessions]))
+        submitted += len(sessions)
@@ -0,0 +1,28 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import Answer, Question, Quiz
+from .paper import invalidate_paper
+from .utils import invalidate_answer_key
+
+
+@receiver(post_save, sender=Quiz)
+@receiver(post_delete, sender=Quiz)
+def invalidate_quiz_paper(sender, instance: Quiz, **kwargs):
+    invalidate_paper([instance.id])
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def invalidate_question_answer_key(sender, instance: Question, **kwargs):
+    invalidate_answer_key(instance.quiz_id)
+    invalidate_paper([instance.quiz_id])
+
+
+@receiver(post_save, sender=Answer)
+@receiver(post_delete, sender=Answer)
+def invalidate_answer_answer_key(sender, instance: Answer, **kwargs):
+    quiz_id = Question.objects.filter(
+        id=instance.question_id).values_list("quiz_id", flat=True).first()
+    if quiz_id:
+        invalidate_answer_key(quiz_id)
+        invalidate_paper([quiz_id])
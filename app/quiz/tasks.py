@@ -0,0 +1,8 @@
+from core.celery import APP
+from .sessions import submit_expired_sessions
+
+
+@APP.task()
+def submit_expired_exam_sessions():
+    '''Beat job: grades exam sessions whose deadline has passed'''
+    return submit_expired_sessions()
@@ -1,9 +1,26 @@
+import csv
+import json
+import threading
 import pytest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from io import StringIO
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
+from rest_framework.test import APIClient
+from quiz.serializers import ExamAnswerSerializer
+from quiz.tasks import submit_expired_exam_sessions
 from quiz.tests.factories import AnswerFactory
-from course.models import Course
-from quiz.models import TakenQuiz
+from course.models import Course, Module
+from quiz import sessions as sessions_module
+from quiz.imports import import_questions
+from quiz.models import Answer, ExamSession, Question, Quiz, TakenQuiz, TakenQuizAnswer
 from user.tests.conftest import api_client_with_credentials
 
 
@@ -148,8 +165,107 @@ class TestRetrieveQuiz:
         response = api_client.get(self.quiz_list)
         assert response.status_code == 200
         assert response.json()['total'] == 1
-        
-        
+
+    def test_list_query_count_is_flat_at_1k_quizzes(self, api_client, enroll_student_factory, course_factory, authenticate_user):
+        '''A user who teaches and is enrolled in the course still sees each quiz once'''
+        user = authenticate_user(roles=["TEACHER"])
+        course = course_factory(teachers=[user['user_instance']], course_name="Chemistry")
+        enroll_student_factory(user=user['user_instance'], course=course)
+        modules = Module.objects.bulk_create(
+            [Module(course=course, module_order=order) for order in range(1000)])
+        quizzes = Quiz.objects.bulk_create([
+            Quiz(module=module, quiz_name=f"Quiz {module.module_order}", created_by=user['user_instance'])
+            for module in modules])
+        Question.objects.bulk_create(
+            [Question(quiz=quiz, prompt_question="Why?") for quiz in quizzes for _ in range(2)])
+        api_client_with_credentials(user['token'], api_client)
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.get(self.quiz_list, {"page_size": 1000})
+        assert response.status_code == 200
+        assert len(context) == 3  # auth user, page count, page rows
+        data = response.json()
+        assert data['total'] == 1000
+        assert len({row['id'] for row in data['results']}) == 1000
+        assert {(row['course'], row['question_count']) for row in data['results']} == {("Chemistry", 2)}
+
+    def test_search_quizzes_by_module_name(self, api_client, quiz_factory, course_factory, module_factory, authenticate_user):
+        user = authenticate_user(roles=["SUPER_ADMIN"])
+        quiz = quiz_factory(module=module_factory(course=course_factory(), module_name="Acids"), created_by=user['user_instance'])
+        quiz_factory(module=module_factory(course=course_factory(), module_name="Bases"), created_by=user['user_instance'])
+        api_client_with_credentials(user['token'], api_client)
+        response = api_client.get(self.quiz_list, {"search": "acids"})
+        assert response.status_code == 200
+        assert [row['id'] for row in response.json()['results']] == [str(quiz.id)]
+
+    def _quiz_with_questions(self, course, owner, questions=40):
+        quiz = Quiz.objects.create(
+            module=Module.objects.create(course=course), quiz_name="Finals", created_by=owner)
+        created = Question.objects.bulk_create(
+            [Question(quiz=quiz, prompt_question=f"Q{index}") for index in range(questions)])
+        Answer.objects.bulk_create([
+            Answer(question=question, text=text, is_correct=text == "right")
+            for question in created for text in ("right", "wrong")])
+        return quiz
+
+    def test_teacher_retrieves_paper_with_answer_key(self, api_client, course_factory, authenticate_user):
+        user = authenticate_user(roles=["TEACHER"])
+        quiz = self._quiz_with_questions(course_factory(teachers=[user['user_instance']]), user['user_instance'])
+        api_client_with_credentials(user['token'], api_client)
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.get(reverse("quiz:quiz-detail", kwargs={"pk": quiz.id}))
+        assert response.status_code == 200
+        # auth user, quiz, teacher check, questions, answers
+        assert len(context) == 5
+        questions = response.json()['questions']
+        assert len(questions) == 40
+        assert {answer['text'] for answer in questions[0]['answers'] if answer['is_correct']} == {"right"}
+
+    def test_student_paper_hides_answer_key_and_is_cached(self, api_client, course_factory, user_factory,
+                                                          enroll_student_factory, authenticate_user):
+        user = authenticate_user(roles=["STUDENT"])
+        course = course_factory()
+        enroll_student_factory(user=user['user_instance'], course=course)
+        quiz = self._quiz_with_questions(course, user_factory())
+        url = reverse("quiz:quiz-detail", kwargs={"pk": quiz.id})
+        api_client_with_credentials(user['token'], api_client)
+
+        response = api_client.get(url)
+        assert response.status_code == 200
+        answers = [answer for question in response.json()['questions'] for answer in question['answers']]
+        assert len(answers) == 80
+        assert all('is_correct' not in answer for answer in answers)
+
+        with CaptureQueriesContext(connection) as context:
+            cached = api_client.get(url)
+        assert cached.json() == response.json()
+        assert not [query for query in context.captured_queries if "quiz_question" in query['sql']]
+
+        question = Question.objects.filter(quiz=quiz).first()
+        question.prompt_question = "Edited"
+        question.save()
+        refreshed = api_client.get(url).json()
+        assert refreshed['questions'][0]['prompt_question'] == "Edited"
+
+    def test_student_paper_audio_urls_are_absolute(self, api_client, course_factory, enroll_student_factory,
+                                                   authenticate_user, mocker):
+        # the audio fields declare their storage as a bare path, which cannot build URLs
+        for model, field in ((Question, "question_audio_record"), (Answer, "answer_audio_record")):
+            mocker.patch.object(model._meta.get_field(field), "storage", default_storage)
+        user = authenticate_user(roles=["STUDENT"])
+        course = course_factory()
+        enroll_student_factory(user=user['user_instance'], course=course)
+        quiz = self._quiz_with_questions(course, user['user_instance'], questions=1)
+        Question.objects.filter(quiz=quiz).update(question_audio_record="audio/question.mp3")
+        Answer.objects.filter(question__quiz=quiz).update(answer_audio_record="audio/answer.mp3")
+        url = reverse("quiz:quiz-detail", kwargs={"pk": quiz.id})
+        api_client_with_credentials(user['token'], api_client)
+
+        for _ in range(2):  # rendered, then served from cache
+            [question] = api_client.get(url).json()['questions']
+            assert question['question_audio_record'].startswith("http://testserver/")
+            assert all(answer['answer_audio_record'].startswith("http://testserver/")
+                       for answer in question['answers'])
+
 
 class TestUpdateDeleteQuiz:
 
@@ -371,6 +487,110 @@ class TestSetModuleQuizQuestions:
         assert response.status_code == 400
 
 
+class TestImportQuizQuestions:
+
+    def _question(self, index, correct=(0,)):
+        return {
+            "prompt_question": f"Question {index}?",
+            "answers": [{"text": f"Option {option}", "is_correct": option in correct} for option in range(4)],
+        }
+
+    def _import(self, api_client, authenticate_user, module, data, format="json"):
+        user = authenticate_user(roles=["SUPER_ADMIN"])
+        api_client_with_credentials(user['token'], api_client)
+        url = reverse("quiz:quiz-import-module-quiz-questions", kwargs={"module_id": str(module.id)})
+        return api_client.post(url, data, format=format)
+
+    def test_import_query_count_does_not_grow_with_rows(self, api_client, course_factory, module_factory,
+                                                        quiz_factory, user_factory, authenticate_user):
+        counts = []
+        for rows in (2, 200):
+            module = module_factory(course=course_factory())
+            quiz_factory(module=module, created_by=user_factory())
+            with CaptureQueriesContext(connection) as context:
+                response = self._import(api_client, authenticate_user, module,
+                                        {"questions": [self._question(index) for index in range(rows)]})
+            assert response.status_code == 200
+            counts.append(len(context))
+        assert counts[0] == counts[1]
+        assert Question.objects.filter(quiz__module=module).count() == 200
+        assert Answer.objects.filter(question__quiz__module=module, is_correct=True).count() == 200
+
+    def test_invalid_rows_are_reported_without_aborting(self, api_client, course_factory, module_factory,
+                                                        quiz_factory, user_factory, authenticate_user):
+        module = module_factory(course=course_factory())
+        quiz = quiz_factory(module=module, created_by=user_factory())
+        questions = [
+            self._question(0),
+            self._question(1, correct=(0, 1)),
+            self._question(2, correct=()),
+            {"prompt_question": "", "answers": [{"text": "Only", "is_correct": True}]},
+        ]
+        response = self._import(api_client, authenticate_user, module, {"questions": questions})
+        assert response.status_code == 200
+        results = response.json()['data']
+        assert [result['status'] for result in results] == ["created", "invalid", "invalid", "invalid"]
+        assert results[1]['errors'] == ["A question needs exactly one correct answer."]
+        assert len(results[3]['errors']) == 2
+        assert [str(pk) for pk in quiz.questions.values_list("id", flat=True)] == [results[0]['question']]
+
+    def test_overlong_text_is_a_row_error(self, course_factory, module_factory, quiz_factory, user_factory):
+        quiz = quiz_factory(module=module_factory(course=course_factory()), created_by=user_factory())
+        long_question = dict(self._question(1), prompt_question="x" * 300)
+        long_answer = self._question(2)
+        long_answer["answers"][1]["text"] = "y" * 300
+        results = import_questions(quiz, [self._question(0), long_question, long_answer])
+        assert [result['status'] for result in results] == ["created", "invalid", "invalid"]
+        assert quiz.questions.count() == 1
+
+    def test_imported_rows_cannot_reference_stored_files(self, course_factory, module_factory, quiz_factory,
+                                                         user_factory):
+        quiz = quiz_factory(module=module_factory(course=course_factory()), created_by=user_factory())
+        row = dict(self._question(0), question_audio_record="certificates/someone.png")
+        row["answers"][0]["answer_audio_record"] = "certificates/someone.png"
+        import_questions(quiz, [row])
+        question = quiz.questions.get()
+        assert not question.question_audio_record
+        assert not any(answer.answer_audio_record for answer in question.answers.all())
+
+    def test_csv_upload_replaces_questions(self, api_client, question_factory, course_factory, module_factory,
+                                           quiz_factory, user_factory, authenticate_user):
+        module = module_factory(course=course_factory())
+        quiz = quiz_factory(module=module, created_by=user_factory())
+        question_factory(quiz=quiz)
+        content = "question,option_a,option_b,option_c,correct\nWhat is 2 + 2?,3,4,5,B\nCapital of France?,Paris,Rome,,1\n"
+        upload = SimpleUploadedFile("questions.csv", content.encode(), content_type="text/csv")
+        response = self._import(api_client, authenticate_user, module,
+                                {"file": upload, "mode": "replace"}, format="multipart")
+        assert response.status_code == 200
+        assert sorted(quiz.questions.values_list("prompt_question", flat=True)) == [
+            "Capital of France?", "What is 2 + 2?"]
+        assert sorted(Answer.objects.filter(question__quiz=quiz, is_correct=True).values_list(
+            "text", flat=True)) == ["4", "Paris"]
+        assert Answer.objects.filter(question__quiz=quiz).count() == 5
+
+    def test_deny_replace_after_attempts(self, api_client, question_factory, course_factory, module_factory,
+                                         quiz_factory, user_factory, authenticate_user):
+        module = module_factory(course=course_factory())
+        quiz = quiz_factory(module=module, created_by=user_factory())
+        question_factory(quiz=quiz)
+        TakenQuiz.objects.create(user=user_factory(), quiz=quiz, score=1)
+        response = self._import(api_client, authenticate_user, module,
+                                {"questions": [self._question(0)], "mode": "replace"})
+        assert response.status_code == 400
+        assert quiz.questions.count() == 1
+
+    def test_import_quiz_questions_command(self, tmp_path, course_factory, module_factory, quiz_factory, user_factory):
+        quiz = quiz_factory(module=module_factory(course=course_factory()), created_by=user_factory())
+        path = tmp_path / "questions.json"
+        path.write_text(json.dumps([self._question(0), self._question(1, correct=())]))
+        out, err = StringIO(), StringIO()
+        call_command("import_quiz_questions", str(quiz.id), str(path), stdout=out, stderr=err)
+        assert quiz.questions.count() == 1
+        assert "1 created, 1 invalid" in out.getvalue()
+        assert "Row 1" in err.getvalue()
+
+
 class TestAttemptModuleQuizQuestions:
 
     def test_student_attempt_module_quiz_questions(self,question_factory,enroll_student_factory,course_factory, quiz_factory, module_factory, api_client, authenticate_user):
@@ -381,7 +601,7 @@ class TestAttemptModuleQuizQuestions:
             user=user['user_instance'], course=course)
         quiz = quiz_factory(module=module, created_by=user['user_instance'])
         questions = question_factory.create_batch(5, quiz=quiz)
-        answer = AnswerFactory(question = questions[0])
+        answers = [AnswerFactory(question = question) for question in questions[:3]]
         token = user['token']
         api_client_with_credentials(token, api_client)
         
@@ -389,15 +609,15 @@ class TestAttemptModuleQuizQuestions:
             "submissions": [
                 {
                     "question": str(questions[0].id),
-                    "answer": str(answer.id)
+                    "answer": str(answers[0].id)
                 },
                 {
                     "question": str(questions[1].id),
-                    "answer": str(answer.id)
+                    "answer": str(answers[1].id)
                 },
                 {
                     "question": str(questions[2].id),
-                    "answer": str(answer.id)
+                    "answer": str(answers[2].id)
                 },
 
             ]
@@ -409,7 +629,8 @@ class TestAttemptModuleQuizQuestions:
         response = api_client.post(url, submission_attempt)
         print(response.json())
         assert response.status_code == 200
-        assert TakenQuiz.objects.get(user = user['user_instance'], quiz=quiz)
+        taken_quiz = TakenQuiz.objects.get(user = user['user_instance'], quiz=quiz)
+        assert TakenQuizAnswer.objects.filter(taken_quiz=taken_quiz).count() == 3
         returned_json =  response.json()['data']['result']
         assert returned_json['score'] == 0
         assert returned_json['total_question'] == 5
@@ -460,10 +681,206 @@ class TestAttemptModuleQuizQuestions:
                       kwargs={"module_id": str(module.id)})
         response = api_client.post(url, submission_attempt)
         assert response.status_code == 400
-    
- 
- 
- 
- 
- 
- 
\ No newline at end of file
+
+    def test_reject_answer_from_another_quiz(self,question_factory,enroll_student_factory,course_factory, quiz_factory, module_factory, api_client, authenticate_user):
+        user = authenticate_user(roles=["STUDENT"])
+        course = course_factory()
+        module = module_factory(course=course)
+        enroll_student_factory.create(
+            user=user['user_instance'], course=course)
+        quiz = quiz_factory(module=module, created_by=user['user_instance'])
+        question = question_factory(quiz=quiz)
+        other_quiz = quiz_factory(created_by=user['user_instance'])
+        foreign_answer = AnswerFactory(question=question_factory(quiz=other_quiz), is_correct=True)
+        api_client_with_credentials(user['token'], api_client)
+        submission_attempt = {
+                "submissions": [
+                    {
+                        "question": str(question.id),
+                        "answer": str(foreign_answer.id)
+                    }
+                ]
+            }
+        url = reverse("quiz:quiz-attempt-module-quiz",
+                      kwargs={"module_id": str(module.id)})
+        response = api_client.post(url, submission_attempt)
+        assert response.status_code == 400
+        assert not TakenQuiz.objects.filter(user=user['user_instance'], quiz=quiz).exists()
+
+
+    def _attempt_setup(self, question_factory, enroll_student_factory, course_factory, module_factory,
+                       quiz_factory, user):
+        course = course_factory()
+        module = module_factory(course=course)
+        enroll_student_factory.create(user=user, course=course)
+        quiz = quiz_factory(module=module, created_by=user)
+        question = question_factory(quiz=quiz)
+        answer = AnswerFactory(question=question, is_correct=True)
+        url = reverse("quiz:quiz-attempt-module-quiz", kwargs={"module_id": str(module.id)})
+        return quiz, url, {"submissions": [{"question": str(question.id), "answer": str(answer.id)}]}
+
+    def test_idempotent_retry_returns_original_result(self, question_factory, enroll_student_factory, course_factory,
+                                                      quiz_factory, module_factory, api_client, authenticate_user):
+        user = authenticate_user(roles=["STUDENT"])
+        quiz, url, submission = self._attempt_setup(
+            question_factory, enroll_student_factory, course_factory, module_factory, quiz_factory,
+            user['user_instance'])
+        api_client_with_credentials(user['token'], api_client)
+
+        first = api_client.post(url, submission, format="json", HTTP_IDEMPOTENCY_KEY="attempt-1")
+        retry = api_client.post(url, submission, format="json", HTTP_IDEMPOTENCY_KEY="attempt-1")
+        assert first.status_code == retry.status_code == 200
+        assert retry.json() == first.json()
+        assert retry["Idempotent-Replayed"] == "true"
+        assert TakenQuiz.objects.filter(quiz=quiz).count() == 1
+
+        changed = api_client.post(url, {"submissions": []}, format="json", HTTP_IDEMPOTENCY_KEY="attempt-1")
+        assert changed.status_code == 422
+        assert api_client.post(url, submission, format="json").status_code == 400
+
+    @pytest.mark.django_db(transaction=True)
+    def test_concurrent_submissions_record_one_attempt(self, question_factory, enroll_student_factory,
+                                                       course_factory, quiz_factory, module_factory, authenticate_user):
+        user = authenticate_user(roles=["STUDENT"])
+        quiz, url, submission = self._attempt_setup(
+            question_factory, enroll_student_factory, course_factory, module_factory, quiz_factory,
+            user['user_instance'])
+        submitters = 8
+        barrier = threading.Barrier(submitters)
+
+        def submit(_):
+            client = APIClient()
+            api_client_with_credentials(user['token'], client)
+            try:
+                barrier.wait()
+                return client.post(url, submission, format="json").status_code
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=submitters) as executor:
+            statuses = list(executor.map(submit, range(submitters)))
+        assert sorted(statuses) == [200] + [400] * (submitters - 1)
+        assert TakenQuiz.objects.filter(quiz=quiz).count() == 1
+
+
+class TestExamSessions:
+
+    def _exam(self, question_factory, enroll_student_factory, course_factory, module_factory, quiz_factory, user,
+              duration_minutes=30):
+        course = course_factory()
+        module = module_factory(course=course)
+        enroll_student_factory.create(user=user, course=course)
+        quiz = quiz_factory(module=module, created_by=user, duration_minutes=duration_minutes)
+        questions = question_factory.create_batch(2, quiz=quiz)
+        correct = [AnswerFactory(question=question, is_correct=True) for question in questions]
+        return module, quiz, questions, correct
+
+    def _url(self, name, module):
+        return reverse(f"quiz:quiz-{name}", kwargs={"module_id": str(module.id)})
+
+    def test_start_autosave_and_submit(self, question_factory, enroll_student_factory, course_factory,
+                                       module_factory, quiz_factory, api_client, authenticate_user,
+                                       django_capture_on_commit_callbacks):
+        user = authenticate_user(roles=["STUDENT"])
+        module, quiz, questions, correct = self._exam(
+            question_factory, enroll_student_factory, course_factory, module_factory, quiz_factory,
+            user['user_instance'])
+        api_client_with_credentials(user['token'], api_client)
+
+        response = api_client.post(self._url("start-exam-session", module))
+        assert response.status_code == 201
+        assert 29 * 60 < response.json()['data']['remaining_seconds'] <= 30 * 60
+
+        wrong = questions[1].answers.exclude(id=correct[1].id).first()
+        with CaptureQueriesContext(connection) as context:
+            for question, answer in [(questions[0], correct[0]), (questions[1], correct[1]), (questions[1], wrong)]:
+                response = api_client.put(self._url("save-exam-answer", module),
+                                          {"question": str(question.id), "answer": str(answer.id)})
+                assert response.status_code == 200
+        assert not [query for query in context.captured_queries
+                    if query['sql'].startswith(("INSERT", "UPDATE", "DELETE"))]
+        response = api_client.put(self._url("save-exam-answer", module),
+                                  {"question": str(questions[0].id), "answer": str(correct[1].id)})
+        assert response.status_code == 400
+
+        resumed = api_client.post(self._url("start-exam-session", module)).json()['data']
+        assert resumed['answers'] == {str(questions[0].id): str(correct[0].id), str(questions[1].id): str(wrong.id)}
+        assert api_client.post(self._url("attempt-module-quiz", module), {"submissions": []},
+                               format="json").status_code == 400
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = api_client.post(self._url("submit-exam-session", module))
+        assert response.status_code == 200
+        assert response.json()['data']['result']['score'] == 1
+        taken_quiz = TakenQuiz.objects.get(user=user['user_instance'], quiz=quiz)
+        assert TakenQuizAnswer.objects.filter(taken_quiz=taken_quiz).count() == 2
+        session = api_client.get(self._url("get-exam-session", module)).json()['data']
+        assert session['taken_quiz'] == str(taken_quiz.id)
+        assert session['answers'] == {}
+        assert api_client.post(self._url("submit-exam-session", module)).status_code == 400
+
+    def test_submit_is_rejected_when_attempt_already_recorded(self, question_factory, enroll_student_factory,
+                                                              course_factory, module_factory, quiz_factory,
+                                                              api_client, authenticate_user):
+        user = authenticate_user(roles=["STUDENT"])
+        module, quiz, questions, correct = self._exam(
+            question_factory, enroll_student_factory, course_factory, module_factory, quiz_factory,
+            user['user_instance'])
+        api_client_with_credentials(user['token'], api_client)
+        assert api_client.post(self._url("start-exam-session", module)).status_code == 201
+        api_client.put(self._url("save-exam-answer", module),
+                       {"question": str(questions[0].id), "answer": str(correct[0].id)})
+        # recorded meanwhile through another path, e.g. a concurrent one-shot attempt
+        earlier = TakenQuiz.objects.create(user=user['user_instance'], quiz=quiz, score=0)
+
+        response = api_client.post(self._url("submit-exam-session", module))
+        assert response.status_code == 400
+        assert response.json()['session'] == "You have taken this quiz before"
+        assert TakenQuiz.objects.filter(quiz=quiz).get() == earlier
+        assert ExamSession.objects.get(user=user['user_instance'], quiz=quiz).submitted_at is not None
+
+    def test_expired_sessions_are_submitted_in_batches(self, question_factory, enroll_student_factory,
+                                                       course_factory, module_factory, quiz_factory, user_factory):
+        module, quiz, questions, correct = self._exam(
+            question_factory, enroll_student_factory, course_factory, module_factory, quiz_factory, user_factory())
+        students = user_factory.create_batch(5)
+        sessions = [sessions_module.start_session(student, quiz) for student in students]
+        for session in sessions[:4]:
+            sessions_module.save_answer(session, questions[0].id, correct[0].id)
+        ExamSession.objects.filter(id__in=[session.id for session in sessions[:4]]).update(
+            deadline=timezone.now() - timedelta(minutes=5))
+
+        assert submit_expired_exam_sessions.apply(kwargs={}).get() == 4
+        attempts = TakenQuiz.objects.filter(quiz=quiz)
+        assert sorted(attempts.values_list("score", flat=True)) == [1, 1, 1, 1]
+        assert ExamSession.objects.filter(submitted_at__isnull=True).get() == sessions[4]
+        assert sessions_module.submit_expired_sessions(batch_size=2) == 0
+
+        closed = ExamSession.objects.get(id=sessions[0].id)
+        serializer = ExamAnswerSerializer(
+            data={"question": str(questions[1].id), "answer": str(correct[1].id)}, context={"session": closed})
+        assert not serializer.is_valid()
+
+
+class TestExportQuizResults:
+    export_url = reverse("quiz:quiz-export-rows")
+
+    def test_admin_exports_quiz_results_for_course(self, user_factory, course_factory, module_factory, quiz_factory, api_client, authenticate_user):
+        user = authenticate_user(roles=["SUPER_ADMIN"])
+        course = course_factory()
+        quiz = quiz_factory(module=module_factory(course=course), created_by=user['user_instance'])
+        other_quiz = quiz_factory(module=module_factory(course=course_factory()), created_by=user['user_instance'])
+        student = user_factory()
+        TakenQuiz.objects.create(user=student, quiz=quiz, score=2, percentage_score=50)
+        TakenQuiz.objects.create(user=student, quiz=other_quiz, score=1)
+        api_client_with_credentials(user['token'], api_client)
+        response = api_client.get(self.export_url, {"course": str(course.id)})
+        assert response.status_code == 200
+        rows = list(csv.reader(StringIO(b"".join(response.streaming_content).decode())))
+        assert len(rows) == 2
+        assert rows[1][1:7] == [student.email, course.course_name, quiz.module.module_name, quiz.quiz_name, "2.0", "50.0"]
+
+    def test_deny_export_to_student(self, api_client, authenticate_user):
+        user = authenticate_user(roles=["STUDENT"])
+        api_client_with_credentials(user['token'], api_client)
+        assert api_client.get(self.export_url).status_code == 403
@@ -1,5 +1,11 @@
 import pytest
-from quiz.utils import score_test_attempt
+from rest_framework import serializers
+from django.core.management import call_command
+from django.db import connection
+from quiz.models import TakenQuiz, TakenQuizAnswer
+from quiz.utils import (
+    load_answer_key, regrade_quiz_attempts, save_attempt_answers,
+    score_test_attempt, validate_submissions)
 
 pytestmark = pytest.mark.django_db
 
@@ -41,8 +47,153 @@ def test_score_quiz_attempt(question_factory, answer_factory, quiz_factory, user
             ]
     }
     
-    result: dict = score_test_attempt(4, data)  
+    result: dict = score_test_attempt(load_answer_key(quiz.id), data)
     assert result.get('score') == 2
     assert result.get('score_percent') == 50.0
     assert result.get('total_question') == 4
- 
\ No newline at end of file
+ 
+
+def test_answer_key_supports_multiple_correct_answers(question_factory, answer_factory, quiz_factory, user_factory):
+    quiz = quiz_factory(created_by = user_factory())
+    question = question_factory(quiz = quiz)
+    first_correct = answer_factory(question = question, is_correct = True)
+    second_correct = answer_factory(question = question, is_correct = True)
+    wrong_answer = answer_factory(question = question, is_correct = False)
+
+    answer_key = load_answer_key(quiz.id)
+    assert answer_key[str(question.id)]["correct"] == {str(first_correct.id), str(second_correct.id)}
+
+    for answer in (first_correct, second_correct):
+        result = score_test_attempt(answer_key, {"submissions": [{"question": question.id, "answer": answer.id}]})
+        assert result.get('score') == 1
+    result = score_test_attempt(answer_key, {"submissions": [
+        {"question": question.id, "answer": first_correct.id},
+        {"question": question.id, "answer": wrong_answer.id},
+    ]})
+    assert result.get('score') == 0
+
+
+def test_repeated_submissions_score_once(question_factory, answer_factory, quiz_factory, user_factory):
+    quiz = quiz_factory(created_by = user_factory())
+    questions = question_factory.create_batch(2, quiz = quiz)
+    correct_answer = answer_factory(question = questions[0], is_correct = True)
+    submission = {"question": questions[0].id, "answer": correct_answer.id}
+    result = score_test_attempt(load_answer_key(quiz.id), {"submissions": [submission] * 5})
+    assert result.get('score') == 1
+    assert result.get('score_percent') == 50.0
+
+
+def test_answer_key_loaded_once(question_factory, quiz_factory, user_factory, django_assert_num_queries):
+    quiz = quiz_factory(created_by = user_factory())
+    question_factory.create_batch(10, quiz = quiz)
+    with django_assert_num_queries(1):
+        load_answer_key(quiz.id)
+    with django_assert_num_queries(0):
+        answer_key = load_answer_key(quiz.id)
+    assert len(answer_key) == 10
+
+
+def test_answer_key_invalidated_on_question_change(question_factory, quiz_factory, user_factory):
+    quiz = quiz_factory(created_by = user_factory())
+    question_factory(quiz = quiz)
+    assert len(load_answer_key(quiz.id)) == 1
+    question_factory(quiz = quiz)
+    assert len(load_answer_key(quiz.id)) == 2
+
+
+def test_reject_submissions_outside_quiz(question_factory, answer_factory, quiz_factory, user_factory):
+    quiz = quiz_factory(created_by = user_factory())
+    other_quiz = quiz_factory(created_by = user_factory())
+    question = question_factory(quiz = quiz)
+    answer = answer_factory(question = question)
+    foreign_question = question_factory(quiz = other_quiz)
+    foreign_answer = answer_factory(question = foreign_question)
+    answer_key = load_answer_key(quiz.id)
+
+    validate_submissions(answer_key, [{"question": question.id, "answer": answer.id}])
+    with pytest.raises(serializers.ValidationError):
+        validate_submissions(answer_key, [{"question": foreign_question.id, "answer": answer.id}])
+    with pytest.raises(serializers.ValidationError):
+        validate_submissions(answer_key, [{"question": question.id, "answer": foreign_answer.id}])
+
+
+def test_reject_answer_of_another_question(question_factory, answer_factory, quiz_factory, user_factory):
+    quiz = quiz_factory(created_by = user_factory())
+    question = question_factory(quiz = quiz)
+    answer_factory(question = question, is_correct = False)
+    other_question = question_factory(quiz = quiz)
+    other_correct = answer_factory(question = other_question, is_correct = True)
+    answer_key = load_answer_key(quiz.id)
+
+    with pytest.raises(serializers.ValidationError):
+        validate_submissions(answer_key, [{"question": question.id, "answer": other_correct.id}])
+
+
+def test_regrade_quiz_attempts(question_factory, answer_factory, quiz_factory, user_factory):
+    quiz = quiz_factory(created_by = user_factory())
+    question = question_factory(quiz = quiz)
+    old_correct = answer_factory(question = question, is_correct = True)
+    new_correct = answer_factory(question = question, is_correct = False)
+    attempts = []
+    for answer in (old_correct, new_correct, new_correct):
+        attempt = TakenQuiz.objects.create(user = user_factory(), quiz = quiz, score = 0)
+        save_attempt_answers(attempt, [{"question": question.id, "answer": answer.id}])
+        attempts.append(attempt)
+    legacy_attempt = TakenQuiz.objects.create(user = user_factory(), quiz = quiz, score = 1, percentage_score = 100)
+
+    old_correct.is_correct = False
+    old_correct.save()
+    new_correct.is_correct = True
+    new_correct.save()
+    assert regrade_quiz_attempts(quiz.id, batch_size = 2) == 3
+
+    scores = [TakenQuiz.objects.get(id = attempt.id).score for attempt in attempts]
+    assert scores == [0, 1, 1]
+    legacy_attempt.refresh_from_db()
+    assert legacy_attempt.score == 1
+
+
+def test_regrade_quiz_attempts_command(question_factory, answer_factory, quiz_factory, user_factory, capsys):
+    quiz = quiz_factory(created_by = user_factory())
+    question = question_factory(quiz = quiz)
+    answer = answer_factory(question = question, is_correct = True)
+    attempt = TakenQuiz.objects.create(user = user_factory(), quiz = quiz, score = 0)
+    save_attempt_answers(attempt, [{"question": question.id, "answer": answer.id}])
+    call_command("regrade_quiz_attempts", str(quiz.id))
+    attempt.refresh_from_db()
+    assert attempt.percentage_score == 100.0
+    assert "regraded 1 attempt(s)" in capsys.readouterr().out
+
+
+def test_dedupe_quiz_attempts_keeps_first_attempt(question_factory, answer_factory, quiz_factory, user_factory, capsys):
+    quiz = quiz_factory(created_by = user_factory())
+    question = question_factory(quiz = quiz)
+    answer = answer_factory(question = question, is_correct = True)
+    user, other_user = user_factory(), user_factory()
+    with connection.cursor() as cursor:
+        # databases created before the constraint may already hold repeated attempts
+        cursor.execute('ALTER TABLE "quiz_takenquiz" DROP CONSTRAINT "unique_quiz_attempt"')
+    first, repeat = [TakenQuiz.objects.create(user = user, quiz = quiz, score = 0) for _ in range(2)]
+    other = TakenQuiz.objects.create(user = other_user, quiz = quiz, score = 0)
+    for attempt in (first, repeat, other):
+        save_attempt_answers(attempt, [{"question": question.id, "answer": answer.id}])
+
+    call_command("dedupe_quiz_attempts")
+    assert set(TakenQuiz.objects.values_list("id", flat = True)) == {first.id, other.id}
+    assert not TakenQuizAnswer.objects.filter(taken_quiz_id = repeat.id).exists()
+    assert "Deleted 1 duplicate attempt(s) and 1 of their answer(s)" in capsys.readouterr().out
+
+
+def test_dedupe_quiz_attempts_runs_before_migrate(quiz_factory, user_factory, capsys):
+    quiz = quiz_factory(created_by = user_factory())
+    user = user_factory()
+    with connection.cursor() as cursor:
+        cursor.execute('ALTER TABLE "quiz_takenquiz" DROP CONSTRAINT "unique_quiz_attempt"')
+    first, repeat = [TakenQuiz.objects.create(user = user, quiz = quiz, score = 0) for _ in range(2)]
+    with connection.cursor() as cursor:
+        # tables referencing attempts that a pending migration will create
+        cursor.execute('DROP TABLE "quiz_takenquizanswer", "quiz_examsession"')
+
+    call_command("dedupe_quiz_attempts")
+    assert list(TakenQuiz.objects.values_list("id", flat = True)) == [first.id]
+    assert "Deleted 1 duplicate attempt(s) and 0 of their answer(s)" in capsys.readouterr().out
@@ -1,18 +1,86 @@
-from typing import Dict
-from .models import Question, Answer
+from typing import Dict, List, Set
+from django.core.cache import cache
+from rest_framework import serializers
+from .models import Question, TakenQuiz, TakenQuizAnswer
 
+ANSWER_KEY_CACHE_TTL = 60 * 60
 
-def score_test_attempt(questions_count:int, validated_data: Dict):
-    score = 0
-    submissions = validated_data.get('submissions')    
+AnswerKey = Dict[str, Dict[str, Set[str]]]
+
+
+def _answer_key_cache_key(quiz_id) -> str:
+    return f"quiz:{quiz_id}:answer-key"
+
+
+def _to_key(value) -> str:
+    '''Accepts model instances as well as raw primary keys'''
+    return str(getattr(value, "pk", value))
+
+
+def load_answer_key(quiz_id) -> AnswerKey:
+    """Returns {question id: {"answers": all answer ids, "correct": correct answer ids}}
+
+    The whole key is read with a single LEFT JOIN and cached per quiz, so grading
+    never goes back to the database per submission.
+    """
+    answer_key: AnswerKey = cache.get(_answer_key_cache_key(quiz_id))
+    if answer_key is not None:
+        return answer_key
+    answer_key = {}
+    rows = Question.objects.filter(quiz_id=quiz_id).order_by().values_list(
+        "id", "answers__id", "answers__is_correct")
+    for question_id, answer_id, is_correct in rows:
+        entry = answer_key.setdefault(
+            str(question_id), {"answers": set(), "correct": set()})
+        if answer_id is None:
+            continue
+        entry["answers"].add(str(answer_id))
+        if is_correct:
+            entry["correct"].add(str(answer_id))
+    cache.set(_answer_key_cache_key(quiz_id), answer_key, ANSWER_KEY_CACHE_TTL)
+    return answer_key
+
+
+def invalidate_answer_key(quiz_id) -> None:
+    cache.delete(_answer_key_cache_key(quiz_id))
+
+
+def validate_submissions(answer_key: AnswerKey, submissions: List[Dict]) -> None:
+    """Ensures every submitted question belongs to the quiz and every answer to its question"""
+    errors: Dict[int, str] = {}
+    for index, submission in enumerate(submissions):
+        question_id = _to_key(submission.get('question'))
+        if question_id not in answer_key:
+            errors[index] = "Question does not belong to this quiz."
+        elif _to_key(submission.get('answer')) not in answer_key[question_id]["answers"]:
+            errors[index] = "Answer does not belong to this question."
+    if errors:
+        raise serializers.ValidationError({"submissions": errors})
+
+
+def _group_by_question(submissions: List[Dict]) -> Dict[str, Set[str]]:
+    selected: Dict[str, Set[str]] = {}
     for submission in submissions:
-        question: Question = submission.get('question')
-        correct_answer: Answer = question.answers.filter(is_correct=True)
-        if correct_answer:
-            if correct_answer[0] == submission.get('answer'):
-                score += 1
-    
-    score_percent = (score/questions_count) * 100
+        selected.setdefault(_to_key(submission.get('question')), set()).add(
+            _to_key(submission.get('answer')))
+    return selected
+
+
+def grade_selection(answer_key: AnswerKey, selected: Dict[str, Set[str]]) -> Dict:
+    """Scores answers grouped by question against a preloaded answer key.
+
+    A question scores once when every answer submitted for it is correct, which
+    supports questions with more than one correct answer without letting
+    repeated submissions inflate the score.
+    """
+    score = 0
+    for question_id, answer_ids in selected.items():
+        correct_answers = answer_key.get(question_id, {}).get("correct", set())
+        if correct_answers and answer_ids <= correct_answers:
+            score += 1
+
+    questions_count = len(answer_key)
+    score_percent = (score/questions_count) * 100 if questions_count else 0
 
     data_dict = {"score": score, 
                 "score_percent": score_percent, 
@@ -21,3 +89,63 @@ def score_test_attempt(questions_count:int, validated_data: Dict):
     
     return data_dict
 
+
+def score_test_attempt(answer_key: AnswerKey, validated_data: Dict):
+    """Scores a submission in memory against a preloaded answer key"""
+    return grade_selection(answer_key, _group_by_question(validated_data.get('submissions')))
+
+
+def save_attempt_answers(taken_quiz: TakenQuiz, submissions: List[Dict]) -> List[TakenQuizAnswer]:
+    """Persists the individual responses of an attempt with a single insert"""
+    return TakenQuizAnswer.objects.bulk_create([
+        TakenQuizAnswer(taken_quiz=taken_quiz,
+                        question_id=_to_key(submission.get('question')),
+                        answer_id=_to_key(submission.get('answer')))
+        for submission in submissions
+    ])
+
+
+def _regrade_batch(answer_key: AnswerKey, attempts: List[TakenQuiz]) -> int:
+    responses: Dict[str, Dict[str, Set[str]]] = {}
+    rows = TakenQuizAnswer.objects.filter(
+        taken_quiz__in=[attempt.id for attempt in attempts]
+    ).values_list("taken_quiz_id", "question_id", "answer_id")
+    for taken_quiz_id, question_id, answer_id in rows:
+        responses.setdefault(str(taken_quiz_id), {}).setdefault(
+            str(question_id), set()).add(str(answer_id))
+
+    regraded: List[TakenQuiz] = []
+    for attempt in attempts:
+        selected = responses.get(str(attempt.id))
+        if selected is None:
+            continue
+        result = grade_selection(answer_key, selected)
+        attempt.score = result.get('score')
+        attempt.percentage_score = result.get('score_percent')
+        regraded.append(attempt)
+    TakenQuiz.objects.bulk_update(regraded, ["score", "percentage_score"])
+    return len(regraded)
+
+
+def regrade_quiz_attempts(quiz_id, batch_size: int = 1000) -> int:
+    """Recomputes every stored attempt of a quiz against its current answer key.
+
+    Attempts are streamed over a server-side cursor and regraded in batches, so
+    memory stays bounded by `batch_size` however many attempts exist. Attempts
+    recorded before responses were persisted are left untouched.
+    """
+    invalidate_answer_key(quiz_id)
+    answer_key = load_answer_key(quiz_id)
+    attempts = TakenQuiz.objects.filter(quiz_id=quiz_id).only(
+        "id", "score", "percentage_score").order_by().iterator(chunk_size=batch_size)
+
+    regraded_count = 0
+    batch: List[TakenQuiz] = []
+    for attempt in attempts:
+        batch.append(attempt)
+        if len(batch) == batch_size:
+            regraded_count += _regrade_batch(answer_key, batch)
+            batch = []
+    if batch:
+        regraded_count += _regrade_batch(answer_key, batch)
+    return regraded_count
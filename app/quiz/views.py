@@ -2,23 +2,29 @@ from rest_framework import viewsets, filters
 from rest_framework.permissions import IsAuthenticated
 from course.models import Module
 from user.models import User
-from django.db.models import Q
 from django.shortcuts import get_object_or_404
 from rest_framework.response import Response
 from rest_framework import serializers
 from django_filters.rest_framework import DjangoFilterBackend
-from drf_spectacular.utils import extend_schema, inline_serializer
+from drf_spectacular.utils import OpenApiParameter, extend_schema, inline_serializer
 from user.permissions import IsSchoolAdmin, IsSuperAdmin, IsTeacher, IsStudent
 from rest_framework.decorators import action
-from core.utils.validators import is_admin
+from core.exports import ExportMixin
+from core.idempotency import idempotent
+from core.utils.validators import is_admin, is_course_teacher
 from .serializers import (
     QuizCreateSerializer, QuizUpdateSerializer,AttemptQuizSerializer,
-    QuizSerializer, QuizDetailsSerializer,CreatModuleQuizQuestionSerializer)
-from .models import Quiz
+    QuizSerializer, QuizDetailsSerializer,CreatModuleQuizQuestionSerializer,
+    QuestionImportSerializer, ExamSessionSerializer, StartExamSessionSerializer,
+    ExamAnswerSerializer)
+from .exports import TakenQuizExport
+from .models import ExamSession, Quiz
+from .paper import TEACHER, render_paper, student_paper
+from .sessions import load_drafts, submit_session
 
 
-class QuizViewSets(viewsets.ModelViewSet):
-    queryset = Quiz.objects.all().select_related("module")
+class QuizViewSets(ExportMixin, viewsets.ModelViewSet):
+    queryset = Quiz.objects.all().select_related("module__course")
     serializer_class = QuizSerializer
     http_method_names = ["get", "post", "patch", "delete", "put"]
     filter_backends = [
@@ -26,8 +32,9 @@ class QuizViewSets(viewsets.ModelViewSet):
         filters.SearchFilter,
         filters.OrderingFilter,
     ]
-    search_fields = ["quiz_name", "module__name"]
+    search_fields = ["quiz_name", "module__module_name"]
     permission_classes = [IsAuthenticated]
+    export_class = TakenQuizExport
 
     def get_serializer_class(self):
         if self.action == "create":
@@ -40,6 +47,10 @@ class QuizViewSets(viewsets.ModelViewSet):
             return CreatModuleQuizQuestionSerializer
         elif self.action == "attempt_module_quiz":
             return AttemptQuizSerializer
+        elif self.action in ["start_exam_session", "get_exam_session", "submit_exam_session"]:
+            return ExamSessionSerializer
+        elif self.action == "save_exam_answer":
+            return ExamAnswerSerializer
         return self.serializer_class
 
     def get_permissions(self):
@@ -52,14 +63,25 @@ class QuizViewSets(viewsets.ModelViewSet):
 
     def get_queryset(self):
         user: User = self.request.user
+        queryset = self.queryset.all()
+        if self.action == "list":
+            queryset = queryset.with_question_counts()
         if is_admin(user):
-            return self.queryset.all()
-        return self.queryset.filter( Q(module__course__teachers=user) | Q(module__course__enrolled_students__user=user))
+            return queryset
+        return queryset.accessible_to(user)
     
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
 
+    def retrieve(self, request, *args, **kwargs):
+        '''Teachers and admins get the answer key; students get the cached paper without it'''
+        quiz: Quiz = self.get_object()
+        user: User = request.user
+        if is_admin(user) or (quiz.module and is_course_teacher(user, quiz.module.course_id)):
+            return Response(render_paper(quiz, TEACHER, self.get_serializer_context()))
+        return Response(student_paper(quiz, request))
+
     @extend_schema(
         responses={
             200: inline_serializer(
@@ -87,12 +109,43 @@ class QuizViewSets(viewsets.ModelViewSet):
         serializer.save()
         return Response({"success": True, "message": "Successfully set module questions"}, status=200)
 
+    @extend_schema(
+        responses={
+            200: inline_serializer(
+                name='QuestionImportResult',
+                fields={
+                    "success": serializers.BooleanField(default=True),
+                    "data": serializers.ListField(child=serializers.DictField()),
+                }
+            ),
+        },
+    )
+    @action(
+        detail=False,
+        methods=["POST"],
+        permission_classes=[IsTeacher | IsSuperAdmin | IsSchoolAdmin],
+        serializer_class=QuestionImportSerializer,
+        url_path=r"import-questions/(?P<module_id>[\w-]+)",
+    )
+    def import_module_quiz_questions(self, request, module_id, pk=None):
+        '''Imports questions from a JSON list or a CSV/JSON file, reporting a status per row'''
+        module: Module = get_object_or_404(Module, id=module_id)
+        serializer = QuestionImportSerializer(
+            data=request.data, context={"request": request, "module": module})
+        serializer.is_valid(raise_exception=True)
+        results = serializer.save()
+        return Response({"success": True, "data": results}, status=200)
+
+    @extend_schema(parameters=[OpenApiParameter(
+        "Idempotency-Key", str, OpenApiParameter.HEADER,
+        description="Retries with the same key return the original result")])
     @action(
         detail=False,
         methods=["POST"],
         permission_classes=[IsStudent],
         url_path=r"attempt-quiz/(?P<module_id>[\w-]+)",
     )
+    @idempotent
     def attempt_module_quiz(self, request, module_id, pk=None):
         '''Allows a student to participate in a quiz'''
         module: Module =  get_object_or_404(Module, id=module_id)
@@ -102,3 +155,74 @@ class QuizViewSets(viewsets.ModelViewSet):
         serializer.is_valid(raise_exception=True)
         serializer.save()
         return Response({"success": True, "data": serializer.data}, status=200)
+
+    def _exam_session(self, request, module_id) -> ExamSession:
+        return get_object_or_404(ExamSession, user=request.user, quiz__module_id=module_id)
+
+    @extend_schema(request=None, responses={201: ExamSessionSerializer})
+    @action(
+        detail=False,
+        methods=["POST"],
+        permission_classes=[IsStudent],
+        url_path=r"exam/(?P<module_id>[\w-]+)/start",
+    )
+    def start_exam_session(self, request, module_id, pk=None):
+        '''Starts a timed exam session, or resumes the running one with its drafted answers'''
+        module: Module = get_object_or_404(Module, id=module_id)
+        serializer = StartExamSessionSerializer(
+            data=request.data, context={"request": request, "module": module})
+        serializer.is_valid(raise_exception=True)
+        session: ExamSession = serializer.save()
+        answers = load_drafts([session.pk])[str(session.pk)]
+        data = ExamSessionSerializer(session, context={"answers": answers}).data
+        return Response({"success": True, "data": data}, status=201)
+
+    @extend_schema(responses={200: ExamSessionSerializer})
+    @action(
+        detail=False,
+        methods=["GET"],
+        permission_classes=[IsStudent],
+        url_path=r"exam/(?P<module_id>[\w-]+)",
+    )
+    def get_exam_session(self, request, module_id, pk=None):
+        '''Returns the student's exam session, its remaining time and drafted answers'''
+        session = self._exam_session(request, module_id)
+        answers = load_drafts([session.pk])[str(session.pk)] if session.submitted_at is None else {}
+        data = ExamSessionSerializer(session, context={"answers": answers}).data
+        return Response({"success": True, "data": data}, status=200)
+
+    @action(
+        detail=False,
+        methods=["PUT"],
+        permission_classes=[IsStudent],
+        url_path=r"exam/(?P<module_id>[\w-]+)/answers",
+    )
+    def save_exam_answer(self, request, module_id, pk=None):
+        '''Autosaves one answer of a running exam session'''
+        serializer = ExamAnswerSerializer(
+            data=request.data, context={"request": request, "session": self._exam_session(request, module_id)})
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response({"success": True, "data": serializer.data}, status=200)
+
+    @extend_schema(
+        request=None,
+        parameters=[OpenApiParameter(
+            "Idempotency-Key", str, OpenApiParameter.HEADER,
+            description="Retries with the same key return the original result")],
+    )
+    @action(
+        detail=False,
+        methods=["POST"],
+        permission_classes=[IsStudent],
+        url_path=r"exam/(?P<module_id>[\w-]+)/submit",
+    )
+    @idempotent
+    def submit_exam_session(self, request, module_id, pk=None):
+        '''Grades the drafted answers of an exam session and records the attempt'''
+        session = self._exam_session(request, module_id)
+        try:
+            result = submit_session(session)
+        except ValueError as error:
+            raise serializers.ValidationError({"session": str(error)})
+        return Response({"success": True, "data": {"result": result}}, status=200)
@@ -0,0 +1,12 @@
+from rest_framework import filters
+from .utils import SEARCHABLE_MODELS
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    '''SearchFilter that matches `search` against the model's indexed search_vector, best ranked first'''
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, "").strip()
+        if not text:
+            return queryset
+        return SEARCHABLE_MODELS[queryset.model].search(queryset, text)
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+from search.utils import SEARCHABLES, install_trigram_indexes, rebuild_search_vectors
+
+
+class Command(BaseCommand):
+    help = "Recompute the stored full-text search vectors and ensure the trigram indexes"
+
+    def add_arguments(self, parser):
+        parser.add_argument("kinds", nargs="*", help=f"Kinds to rebuild: {', '.join(SEARCHABLES)} (default: all)")
+
+    def handle(self, *args, **options):
+        unknown = set(options["kinds"]) - set(SEARCHABLES)
+        if unknown:
+            raise CommandError(f"Unknown kind(s): {', '.join(sorted(unknown))}")
+        for kind, updated_count in rebuild_search_vectors(options["kinds"] or None).items():
+            self.stdout.write(f"{kind}: reindexed {updated_count} row(s)")
+        if not install_trigram_indexes([searchable.model for searchable in SEARCHABLES.values()]):
+            self.stderr.write("pg_trgm is not available; typo-tolerant matching is disabled")
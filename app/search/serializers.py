@@ -0,0 +1,25 @@
+from rest_framework import serializers
+from .utils import SEARCHABLES
+
+
+class SearchQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=200, trim_whitespace=True)
+    types = serializers.MultipleChoiceField(choices=list(SEARCHABLES), required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=10)
+
+    def validate_types(self, types):
+        return [kind for kind in SEARCHABLES if kind in types]
+
+
+class SearchResultSerializer(serializers.Serializer):
+    id = serializers.UUIDField()
+    title = serializers.CharField()
+    headline = serializers.CharField()
+    rank = serializers.FloatField()
+    course = serializers.UUIDField(source="parent_course")
+
+
+class SearchResultsSerializer(serializers.Serializer):
+    courses = SearchResultSerializer(many=True, required=False)
+    modules = SearchResultSerializer(many=True, required=False)
+    quizzes = SearchResultSerializer(many=True, required=False)
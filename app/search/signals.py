@@ -0,0 +1,22 @@
+from django.db.models.signals import post_migrate, post_save
+from django.dispatch import receiver
+from course.models import Course, Module
+from quiz.models import Quiz
+from .utils import SEARCH_FIELDS, SEARCHABLE_MODELS, install_trigram_indexes, update_search_vector
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_save, sender=Module)
+@receiver(post_save, sender=Quiz)
+def refresh_search_vector(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not SEARCH_FIELDS[sender] & set(update_fields):
+        return
+    update_search_vector(instance)
+
+
+@receiver(post_migrate)
+def create_trigram_indexes(sender, using="default", **kwargs):
+    # migrations are generated per deploy, so the extension and its indexes are ensured here
+    models = [model for model in SEARCHABLE_MODELS if model._meta.app_label == sender.label]
+    if models:
+        install_trigram_indexes(models, using)
@@ -0,0 +1,94 @@
+import pytest
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from course.models import Course, Module
+from quiz.tests.factories import QuizFactory
+from search.utils import trigram_enabled
+from user.tests.conftest import api_client_with_credentials
+
+pytestmark = pytest.mark.django_db
+
+
+class TestSearch:
+    search_url = reverse("search:search-list")
+    course_list_url = reverse("course:course-list")
+
+    def test_search_vector_follows_saves(self, course_factory):
+        course = course_factory(course_name="Introduction to Gardening")
+        assert Course.objects.filter(search_vector="gardens").get() == course
+        course.course_name = "Woodwork basics"
+        course.save()
+        assert not Course.objects.filter(search_vector="gardens").exists()
+        assert Course.objects.filter(search_vector="basic").get() == course
+
+    def test_anonymous_search_ranks_courses_with_highlights(self, api_client, course_factory, module_factory):
+        best = course_factory(course_name="Python programming", long_description="Learn to program")
+        other = course_factory(course_name="Cooking", long_description="Includes a little Python scripting")
+        course_factory(course_name="Painting", long_description="Colours and brushes")
+        module_factory(course=best, module_name="Python basics")
+        response = api_client.get(self.search_url, {"q": "python"})
+        assert response.status_code == 200
+        data = response.json()['data']
+        assert [row['id'] for row in data['courses']] == [str(best.id), str(other.id)]
+        assert data['courses'][1]['course'] == str(other.id)
+        assert "<mark>Python</mark>" in data['courses'][1]['headline']
+        assert data['modules'] == [] and data['quizzes'] == []
+
+    def test_modules_and_quizzes_need_course_access(self, api_client, authenticate_user, course_factory, module_factory, enroll_student_factory):
+        user = authenticate_user(roles=["STUDENT"])
+        enrolled_course, other_course = course_factory.create_batch(2)
+        enroll_student_factory(user=user['user_instance'], course=enrolled_course)
+        visible = module_factory(course=enrolled_course, module_name="Photosynthesis", text_content="Leaves and light")
+        module_factory(course=other_course, module_name="Photosynthesis advanced")
+        quiz = QuizFactory(module=visible, quiz_name="Photosynthesis quiz", created_by=user['user_instance'])
+        api_client_with_credentials(user['token'], api_client)
+        trigram_enabled("default")
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.get(self.search_url, {"q": "photosynthesis", "types": ["modules", "quizzes"]})
+        assert response.status_code == 200
+        assert len(context) == 3  # auth user + one ranked query per kind
+        data = response.json()['data']
+        assert 'courses' not in data
+        assert [(row['id'], row['course']) for row in data['modules']] == [(str(visible.id), str(enrolled_course.id))]
+        assert [row['id'] for row in data['quizzes']] == [str(quiz.id)]
+
+    def test_admin_searches_every_module(self, api_client, authenticate_user, course_factory, module_factory):
+        user = authenticate_user(roles=["SUPER_ADMIN"])
+        module_factory.create_batch(2, course=course_factory(), topic="Thermodynamics")
+        api_client_with_credentials(user['token'], api_client)
+        response = api_client.get(self.search_url, {"q": "thermodynamic", "types": "modules"})
+        assert len(response.json()['data']['modules']) == 2
+
+    def test_websearch_syntax_and_validation(self, api_client, course_factory):
+        course_factory(course_name="Python for data")
+        course_factory(course_name="Python for the web")
+        response = api_client.get(self.search_url, {"q": "python -web", "types": "courses"})
+        assert [row['title'] for row in response.json()['data']['courses']] == ["Python for data"]
+        assert api_client.get(self.search_url).status_code == 400
+        assert api_client.get(self.search_url, {"q": "python", "types": "users"}).status_code == 400
+
+    def test_course_list_search_uses_full_text(self, api_client, course_factory):
+        match = course_factory(course_name="Statistics", short_description="Probability and distributions")
+        course_factory(course_name="Statics", short_description="Forces")
+        response = api_client.get(self.course_list_url, {"search": "distribution"})
+        assert response.status_code == 200
+        assert [row['id'] for row in response.json()['results']] == [str(match.id)]
+        assert 'search_vector' not in response.json()['results'][0]
+
+    def test_typo_matches_title_by_trigram(self, api_client, course_factory):
+        if not trigram_enabled("default"):
+            pytest.skip("pg_trgm is not installed")
+        course = course_factory(course_name="Photography")
+        response = api_client.get(self.search_url, {"q": "photografy", "types": "courses"})
+        assert [row['id'] for row in response.json()['data']['courses']] == [str(course.id)]
+
+    def test_rebuild_search_index_command(self, course_factory, module_factory):
+        module = module_factory(course=course_factory(), module_name="Orbital mechanics")
+        Module.objects.update(search_vector=None)
+        out = StringIO()
+        call_command("rebuild_search_index", "modules", stdout=out, stderr=StringIO())
+        assert "modules: reindexed 1 row(s)" in out.getvalue()
+        assert Module.objects.filter(search_vector="orbit").get() == module
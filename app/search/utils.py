@@ -0,0 +1,145 @@
+'''Full-text search over courses, modules and quizzes.
+
+Each searchable model stores a weighted `search_vector` behind a GIN index,
+refreshed by the search signals on save. Queries use websearch syntax
+("python -django", "\"exact phrase\"") and are ranked with ts_rank. When the
+pg_trgm extension is installed, titles also match by trigram similarity so a
+misspelled word still finds results.
+'''
+from dataclasses import dataclass
+from functools import lru_cache, reduce
+from operator import add
+from typing import Dict, Iterable, Optional, Tuple
+from django.contrib.postgres.search import (SearchHeadline, SearchQuery, SearchRank,
+                                            SearchVector, TrigramSimilarity)
+from django.db import DatabaseError, connections, transaction
+from django.db.models import F, Model, Q, QuerySet, TextField, Value
+from django.db.models.functions import Coalesce, Concat
+from course.models import Course, EnrollStudent, Module
+from quiz.models import Quiz
+from user.models import User
+from core.utils.validators import is_admin
+
+SEARCH_CONFIG = "english"
+HEADLINE_OPTIONS = {"start_sel": "<mark>", "stop_sel": "</mark>", "max_words": 35, "min_words": 15}
+
+
+@dataclass(frozen=True)
+class Searchable:
+    model: type
+    fields: Tuple[Tuple[str, str], ...]  # (field, weight)
+    title_field: str
+    body_fields: Tuple[str, ...]
+    course_field: str
+
+    def vector(self) -> SearchVector:
+        return reduce(add, (
+            SearchVector(field, weight=weight, config=SEARCH_CONFIG) for field, weight in self.fields))
+
+    def body(self) -> Concat:
+        parts = []
+        for field in self.body_fields:
+            parts += [Coalesce(F(field), Value("")), Value(" ")]
+        return Concat(*parts[:-1], output_field=TextField()) if len(parts) > 2 else parts[0]
+
+    def search(self, queryset: QuerySet, text: str) -> QuerySet:
+        '''Filters to rows matching `text`, best ranked first'''
+        query = SearchQuery(text, search_type="websearch", config=SEARCH_CONFIG)
+        rank = SearchRank(F("search_vector"), query)
+        condition = Q(search_vector=query)
+        if trigram_enabled(queryset.db):
+            rank = rank + TrigramSimilarity(self.title_field, text)
+            condition |= Q(**{f"{self.title_field}__trigram_similar": text})
+        return queryset.annotate(rank=rank).filter(condition).order_by("-rank", "pk")
+
+    def with_headline(self, queryset: QuerySet, text: str) -> QuerySet:
+        query = SearchQuery(text, search_type="websearch", config=SEARCH_CONFIG)
+        return queryset.annotate(headline=SearchHeadline(
+            self.body(), query, config=SEARCH_CONFIG, **HEADLINE_OPTIONS))
+
+
+SEARCHABLES: Dict[str, Searchable] = {
+    "courses": Searchable(
+        Course,
+        (("course_name", "A"), ("display_title", "A"), ("short_description", "B"), ("long_description", "C")),
+        title_field="course_name", body_fields=("short_description", "long_description"), course_field="id"),
+    "modules": Searchable(
+        Module, (("module_name", "A"), ("topic", "B"), ("text_content", "C")),
+        title_field="module_name", body_fields=("topic", "text_content"), course_field="course_id"),
+    "quizzes": Searchable(
+        Quiz, (("quiz_name", "A"),),
+        title_field="quiz_name", body_fields=("quiz_name",), course_field="module__course_id"),
+}
+SEARCHABLE_MODELS = {searchable.model: searchable for searchable in SEARCHABLES.values()}
+SEARCH_FIELDS = {
+    searchable.model: {field for field, _ in searchable.fields} for searchable in SEARCHABLES.values()}
+
+
+def update_search_vector(instance: Model) -> None:
+    searchable = SEARCHABLE_MODELS[type(instance)]
+    type(instance).objects.filter(pk=instance.pk).update(search_vector=searchable.vector())
+
+
+def rebuild_search_vectors(kinds: Optional[Iterable[str]] = None) -> Dict[str, int]:
+    '''Recomputes every stored vector, e.g. after bulk_create or a weight change'''
+    return {
+        kind: SEARCHABLES[kind].model.objects.update(search_vector=SEARCHABLES[kind].vector())
+        for kind in (kinds or SEARCHABLES)
+    }
+
+
+@lru_cache(maxsize=None)
+def trigram_enabled(alias: str = "default") -> bool:
+    with connections[alias].cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+def install_trigram_indexes(models: Iterable[type], using: str = "default") -> bool:
+    '''Creates pg_trgm and a trigram GIN index on each title; False when the extension is unavailable'''
+    connection = connections[using]
+    try:
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            for model in models:
+                title_field = SEARCHABLE_MODELS[model].title_field
+                table = model._meta.db_table
+                cursor.execute(
+                    f"CREATE INDEX IF NOT EXISTS {connection.ops.quote_name(f'{table}_{title_field}_trgm')} "
+                    f"ON {connection.ops.quote_name(table)} "
+                    f"USING gin ({connection.ops.quote_name(title_field)} gin_trgm_ops)")
+    except DatabaseError:
+        return False
+    finally:
+        trigram_enabled.cache_clear()
+    return True
+
+
+def accessible_course_filter(user: User, course_field: str) -> Optional[Q]:
+    '''Limits module/quiz results to courses the user teaches or is enrolled in; None for admins'''
+    if is_admin(user):
+        return None
+    return (
+        Q(**{f"{course_field}__in": Course.teachers.through.objects.filter(user_id=user.pk).values("course_id")})
+        | Q(**{f"{course_field}__in": EnrollStudent.objects.filter(user_id=user.pk).values("course_id")})
+    )
+
+
+def search_all(user: User, text: str, kinds: Iterable[str], limit: int) -> Dict[str, list]:
+    '''Searches each kind with one ranked query; modules and quizzes need course access'''
+    results = {}
+    for kind in kinds:
+        searchable = SEARCHABLES[kind]
+        queryset = searchable.model.objects.all()
+        if kind != "courses":
+            if not user.is_authenticated:
+                results[kind] = []
+                continue
+            course_filter = accessible_course_filter(user, searchable.course_field)
+            if course_filter is not None:
+                queryset = queryset.filter(course_filter)
+        queryset = searchable.with_headline(searchable.search(queryset, text), text).annotate(
+            title=F(searchable.title_field), parent_course=F(searchable.course_field))
+        results[kind] = list(
+            queryset.values("id", "title", "headline", "rank", "parent_course")[:limit])
+    return results
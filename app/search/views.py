@@ -0,0 +1,31 @@
+from drf_spectacular.utils import extend_schema, inline_serializer
+from rest_framework import serializers, status, viewsets
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from .serializers import SearchQuerySerializer, SearchResultsSerializer
+from .utils import SEARCHABLES, search_all
+
+
+class SearchViewSets(viewsets.ViewSet):
+    permission_classes = [AllowAny]
+
+    @extend_schema(
+        parameters=[SearchQuerySerializer],
+        responses={
+            200: inline_serializer(
+                name='SearchResponse',
+                fields={
+                    "success": serializers.BooleanField(default=True),
+                    "data": SearchResultsSerializer(),
+                }
+            ),
+        },
+    )
+    def list(self, request):
+        '''Searches courses, modules and quizzes; modules and quizzes only from courses you teach or take'''
+        serializer = SearchQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        kinds = serializer.validated_data.get("types") or list(SEARCHABLES)
+        results = search_all(
+            request.user, serializer.validated_data["q"], kinds, serializer.validated_data["limit"])
+        return Response({"success": True, "data": SearchResultsSerializer(results).data}, status.HTTP_200_OK)
@@ -4,3 +4,6 @@ from django.utils.translation import gettext_lazy as _
 class UserConfig(AppConfig):
     name = 'user'
     verbose_name = _('user')
+
+    def ready(self):
+        from . import signals  # noqa: F401
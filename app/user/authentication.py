@@ -0,0 +1,65 @@
+from django.contrib.auth import get_user_model
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from .denylist import is_token_denied
+
+
+class ClaimsUser(TokenUser):
+    """A user built from the access token claims set in CustomObtainTokenPairSerializer.get_token.
+
+    Claims are served without a query; any other attribute loads the full
+    `User` row once and is read from it.
+    """
+
+    @cached_property
+    def roles(self):
+        return self.token.get("roles", [])
+
+    @cached_property
+    def instance(self):
+        try:
+            return get_user_model().objects.get(
+                **{jwt_settings.USER_ID_FIELD: self.id})
+        except get_user_model().DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+    def __getattr__(self, attr):
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        if attr in self.token:
+            return self.token[attr]
+        return getattr(self.instance, attr)
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """JWT authentication with a deny-list check on every request.
+
+    Safe requests to views that set `stateless_authentication = True` get a
+    `ClaimsUser` instead of the `User` row; everything else loads the row.
+    """
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        user_id = validated_token.get(jwt_settings.USER_ID_CLAIM)
+        if user_id is None:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+        if is_token_denied(user_id, validated_token):
+            raise AuthenticationFailed(_("Token has been revoked"), code="token_revoked")
+        if self.is_stateless(request):
+            return ClaimsUser(validated_token), validated_token
+        return self.get_user(validated_token), validated_token
+
+    def is_stateless(self, request) -> bool:
+        view = getattr(request, "parser_context", {}).get("view")
+        return request.method in SAFE_METHODS and getattr(view, "stateless_authentication", False)
@@ -1,32 +1,63 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.backends import ModelBackend
-from django.db.models import Q
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+from django.db.models.functions import Lower
 from rest_framework import exceptions
 from decouple import config
+from .tasks import record_login_attempts
+
+MAX_LOGIN_ATTEMPTS = config('MAX_LOGIN_ATTEMPTS', cast=int)
+LOGIN_ATTEMPTS_KEY_PREFIX = "login-attempts"
+LOGIN_ATTEMPTS_TTL = 60 * 60 * 24
+
+
+def _attempts_key(email: str) -> str:
+    return f"{LOGIN_ATTEMPTS_KEY_PREFIX}:{email}"
+
+
+def incr_failed_attempts(email: str, stored_attempts: int) -> int:
+    '''Atomically counts a failed login, seeding a missing counter from the user row'''
+    key = _attempts_key(email)
+    cache.add(key, stored_attempts, timeout=LOGIN_ATTEMPTS_TTL)
+    return cache.incr(key)
+
+
+def reset_failed_attempts(email: str) -> None:
+    cache.delete(_attempts_key(email.lower()))
 
 
 class CustomBackend(ModelBackend):
-    '''Lock user account after max login attempts'''
+    '''Lock user account after max login attempts
+
+    Failed attempts are counted in Redis and written back to the user row by a
+    task. A failed or locked login raises PermissionDenied so the fallback
+    ModelBackend does not hash the password a second time.
+    '''
     def authenticate(self, request, **kwargs):
         UserModel = get_user_model()
-        try:
-            username = kwargs.get(UserModel.USERNAME_FIELD, None)
-            password = kwargs.get("password", None)
-            if username is None or password is None:
-                return None
-            if user := UserModel.objects.filter(Q(email__iexact=username)).first():
-                if user.failed_password_attempts > config('MAX_LOGIN_ATTEMPTS', cast=int):
-                    raise exceptions.ValidationError(
-                                {"email": "Account locked - Maximum number of login attempts reached."}
-                        )
-                if user.failed_password_attempts == config('MAX_LOGIN_ATTEMPTS', cast=int):
-                    user.is_active = False
-                if user.is_active and user.check_password(password):
-                    user.failed_password_attempts = 0
-                    user.save()
-                    return user
-                user.failed_password_attempts += 1
-                user.save()
-            return None
-        except UserModel.DoesNotExist:
+        username = kwargs.get(UserModel.USERNAME_FIELD, None)
+        password = kwargs.get("password", None)
+        if username is None or password is None:
             return None
+        email = username.lower()
+        user = UserModel.objects.alias(email_lower=Lower("email")).filter(email_lower=email).first()
+        if user is None:
+            # Hash anyway so unknown emails take as long as wrong passwords
+            UserModel().set_password(password)
+            raise PermissionDenied
+
+        attempts = max(cache.get(_attempts_key(email), 0), user.failed_password_attempts)
+        if attempts > MAX_LOGIN_ATTEMPTS:
+            raise exceptions.ValidationError(
+                        {"email": "Account locked - Maximum number of login attempts reached."}
+                )
+        lock = attempts == MAX_LOGIN_ATTEMPTS
+        if not lock and user.is_active and user.check_password(password):
+            if attempts:
+                cache.delete(_attempts_key(email))
+                record_login_attempts.delay(str(user.id), 0)
+            return user
+        attempts = incr_failed_attempts(email, user.failed_password_attempts)
+        record_login_attempts.delay(str(user.id), attempts, lock=lock)
+        raise PermissionDenied
@@ -0,0 +1,84 @@
+'''Request-scoped authorization context.
+
+`AuthContextMiddleware` attaches a lazy `AuthContext` to every request. For a
+bearer token it is built from the JWT claims set in
+`CustomObtainTokenPairSerializer.get_token`, so role checks never touch the
+database; otherwise it falls back to the authenticated user's `roles`.
+Claims stay trustworthy because changing a user's roles revokes every token
+issued before the change (see `user.signals`).
+The context is also pinned on the user instance so validators that only
+receive a user see the same object, including its course-membership memo.
+'''
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+ADMIN_ROLES: FrozenSet[str] = frozenset({"SUPER_ADMIN", "SCHOOL_ADMIN"})
+AUTH_CONTEXT_ATTR = "_auth_context"
+
+
+class AuthContext:
+    '''Roles as a frozenset plus lazily filled course memberships'''
+
+    def __init__(self, user_id: Optional[str] = None, roles: Iterable[str] = ()):
+        self.user_id = user_id
+        self.roles: FrozenSet[str] = frozenset(roles or ())
+        self.is_authenticated = user_id is not None
+        self.is_admin = bool(self.roles & ADMIN_ROLES)
+        # (membership kind, course id) -> bool, filled by course.membership
+        self.memberships: Dict[Tuple[str, str], bool] = {}
+
+    def has_role(self, role: str) -> bool:
+        return role in self.roles
+
+    @classmethod
+    def for_user(cls, user) -> "AuthContext":
+        if not user.is_authenticated:
+            return cls()
+        return cls(user_id=str(user.pk), roles=user.roles)
+
+    @classmethod
+    def from_token(cls, raw_token: str) -> Optional["AuthContext"]:
+        '''Builds the context from a valid access token, else returns None'''
+        try:
+            token = AccessToken(raw_token)
+        except TokenError:
+            return None
+        user_id = token.get(jwt_settings.USER_ID_CLAIM)
+        if user_id is None or "roles" not in token:
+            return None
+        return cls(user_id=str(user_id), roles=token["roles"])
+
+
+def get_auth_context(user) -> AuthContext:
+    '''Returns the context pinned on this user instance, building it from the model if needed'''
+    context = user.__dict__.get(AUTH_CONTEXT_ATTR)
+    if context is None:
+        context = AuthContext.for_user(user)
+        setattr(user, AUTH_CONTEXT_ATTR, context)
+    return context
+
+
+def bearer_token(request) -> Optional[str]:
+    header = request.META.get(jwt_settings.AUTH_HEADER_NAME, "").split()
+    if len(header) != 2 or header[0] not in jwt_settings.AUTH_HEADER_TYPES:
+        return None
+    return header[1]
+
+
+def build_request_auth_context(request) -> AuthContext:
+    raw_token = bearer_token(request)
+    context = AuthContext.from_token(raw_token) if raw_token else None
+    return context or get_auth_context(request.user)
+
+
+def get_request_auth_context(request) -> AuthContext:
+    '''The request's context, pinned on request.user once authentication has run'''
+    context = getattr(request, "auth_context", None)
+    if context is None:
+        return get_auth_context(request.user)
+    user = request.user
+    if user.is_authenticated and context.user_id == str(user.pk):
+        user.__dict__.setdefault(AUTH_CONTEXT_ATTR, context)
+    return context
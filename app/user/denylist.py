@@ -0,0 +1,70 @@
+'''Redis-backed deny-list consulted on every JWT-authenticated request.
+
+Each entry maps a user id to a cut-off: tokens issued at or before it are
+rejected. `iat` only has one-second resolution, so tokens also carry the
+issue time in milliseconds (`iat_ms`); a token issued in the same second as a
+revocation is then told apart by which came first. Deactivated or deleted users get an infinite cut-off, which is
+lifted when the account is reactivated.
+'''
+import math
+import time
+from datetime import timedelta
+from typing import Mapping, Optional
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+DENYLIST_KEY_PREFIX = "auth-denylist"
+ISSUED_AT_MS_CLAIM = "iat_ms"
+
+
+def _denylist_key(user_id) -> str:
+    return f"{DENYLIST_KEY_PREFIX}:{user_id}"
+
+
+def _token_ttl() -> int:
+    '''Entries only need to outlive the longest-lived token that could be presented'''
+    lifetimes = [
+        timedelta(hours=settings.TOKEN_LIFESPAN),
+        jwt_settings.ACCESS_TOKEN_LIFETIME,
+        jwt_settings.REFRESH_TOKEN_LIFETIME,
+    ]
+    return int(max(lifetimes).total_seconds())
+
+
+def revoke_user_tokens(user_id) -> None:
+    '''Rejects every token the user holds now; tokens issued afterwards stay valid'''
+    cutoff = cache.get(_denylist_key(user_id))
+    if cutoff != math.inf:
+        cache.set(_denylist_key(user_id), time.time(), timeout=_token_ttl())
+
+
+def deny_user(user_id) -> None:
+    '''Rejects all tokens of a deactivated or deleted user until allow_user is called'''
+    cache.set(_denylist_key(user_id), math.inf, timeout=None)
+
+
+def allow_user(user_id) -> None:
+    '''Lifts a deactivation; explicit revocations keep their cut-off'''
+    if cache.get(_denylist_key(user_id)) == math.inf:
+        cache.delete(_denylist_key(user_id))
+
+
+def stamp_issued_at(token) -> None:
+    '''Records when a new token was issued to the millisecond; access tokens copy it from their refresh token'''
+    token[ISSUED_AT_MS_CLAIM] = int(token.current_time.timestamp() * 1000)
+
+
+def _issued_at(token: Mapping) -> Optional[float]:
+    '''Issue time in seconds; tokens without `iat_ms` count from the start of their `iat` second'''
+    if token.get(ISSUED_AT_MS_CLAIM) is not None:
+        return token[ISSUED_AT_MS_CLAIM] / 1000
+    return token.get("iat")
+
+
+def is_token_denied(user_id, token: Mapping) -> bool:
+    cutoff = cache.get(_denylist_key(user_id))
+    if cutoff is None:
+        return False
+    issued_at = _issued_at(token)
+    return issued_at is None or issued_at <= cutoff
@@ -1,6 +1,8 @@
 import uuid
 from datetime import datetime
 from django.db import models
+from django.db.models.functions import Lower
+from django.utils.timezone import now as timezone_now
 from django.utils.translation import gettext_lazy as _
 from django.contrib.auth.models import AbstractBaseUser
 from datetime import datetime, timezone
@@ -8,6 +10,7 @@ from django.contrib.auth.models import PermissionsMixin
 from django.conf import settings
 from django.contrib.postgres.fields import ArrayField
 from .enums import USER_ROLE, TOKEN_TYPE
+from core.indexes import ConcurrentIndex
 from .managers import CustomUserManager
 from django.utils.crypto import get_random_string
 
@@ -44,6 +47,12 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     class Meta:
         ordering = ("-created_at",)
+        indexes = [
+            # login looks users up by LOWER(email)
+            ConcurrentIndex(Lower("email"), name="user_email_lower_idx"),
+            # keyset pagination pages on (created_at, id), newest first
+            ConcurrentIndex(fields=["-created_at", "-id"], name="user_created_idx"),
+        ]
 
     def __str__(self):
         if self.firstname and self.lastname:
@@ -52,8 +61,8 @@ class User(AbstractBaseUser, PermissionsMixin):
             return self.email
 
     def save_last_login(self):
-        self.last_login = datetime.now()
-        self.save()
+        self.last_login = timezone_now()
+        self.save(update_fields=["last_login"])
 
 class Token(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -63,6 +72,12 @@ class Token(models.Model):
     token_type = models.CharField(max_length=100, choices=TOKEN_TYPE)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # password reset and verification look tokens up by (token, token_type)
+            ConcurrentIndex(fields=["token", "token_type"], name="token_token_type_idx"),
+        ]
+
     def __str__(self):
         return f"{str(self.user)} {self.token}"
 
@@ -1,32 +1,33 @@
 from rest_framework import permissions
+from .context import get_request_auth_context
 
-class IsSuperAdmin(permissions.BasePermission):
+
+class HasRole(permissions.BasePermission):
+    """Grants access when the request's auth context holds `role`."""
+    role: str = ""
+
+    def has_permission(self, request, view):
+        context = get_request_auth_context(request)
+        return bool(context.is_authenticated and context.has_role(self.role))
+
+
+class IsSuperAdmin(HasRole):
     """Allows access only to super admin users."""
     message = "Only Super Admins are authorized to perform this action."
-    
-    def has_permission(self, request, view):
-        return bool(
-            request.user.is_authenticated and "SUPER_ADMIN" in request.user.roles
-        )
+    role = "SUPER_ADMIN"
 
-class IsStudent(permissions.BasePermission):
+class IsStudent(HasRole):
     """Allows access only to students."""
     message = "Only Students are authorized to perform this action."
+    role = "STUDENT"
 
-    def has_permission(self, request, view):
-        return bool(request.user.is_authenticated and "STUDENT" in request.user.roles)
-
-class IsTeacher(permissions.BasePermission):
+class IsTeacher(HasRole):
     """Allows access only to teachers"""
     message = "Only teachers are authorized to perform this action."
-    
-    def has_permission(self, request, view):
-        return bool(request.user.is_authenticated and "TEACHER" in request.user.roles)
+    role = "TEACHER"
 
 
-class IsSchoolAdmin(permissions.BasePermission):
+class IsSchoolAdmin(HasRole):
     """Allows access only to teachers"""
     message = "Only teachers are authorized to perform this action."
-    
-    def has_permission(self, request, view):
-        return bool(request.user.is_authenticated and "SCHOOL_ADMIN" in request.user.roles)
+    role = "SCHOOL_ADMIN"
@@ -3,9 +3,14 @@ from datetime import timedelta
 from django.utils.translation import gettext_lazy as _
 from django.contrib.auth import authenticate
 from django.contrib.auth.hashers import make_password
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework import serializers, exceptions
 from core.utils.validators import is_admin
+from .context import get_auth_context
+from .denylist import is_token_denied, stamp_issued_at
 from .models import User
 from django.conf import settings
 
@@ -29,6 +34,7 @@ class CustomObtainTokenPairSerializer(TokenObtainPairSerializer):
             raise exceptions.AuthenticationFailed(
                 _('Account not verified.'), code='authentication')
         token = super().get_token(user)
+        stamp_issued_at(token)
         token.id = user.id
         token['firstname'] = user.firstname
         token['lastname'] = user.lastname
@@ -39,6 +45,17 @@ class CustomObtainTokenPairSerializer(TokenObtainPairSerializer):
         return token
 
 
+class DenyListTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refuses refresh tokens issued before the user's tokens were revoked,
+    e.g. after a role change, since the new access token copies their claims"""
+
+    def validate(self, attrs):
+        refresh = RefreshToken(attrs["refresh"])
+        if is_token_denied(refresh.get(jwt_settings.USER_ID_CLAIM), refresh):
+            raise InvalidToken(_("Token has been revoked"))
+        return super().validate(attrs)
+
+
 class AuthTokenSerializer(serializers.Serializer):
     """Serializer for user authentication object"""
 
@@ -133,7 +150,7 @@ class UpdateUserSerializer(serializers.ModelSerializer):
     def validate(self, attrs):
         new_role = attrs.get('roles')
         auth_user: User = self.context['request'].user
-        if "SUPER_ADMIN" not in auth_user.roles and 'SCHOOL_ADMIN' in new_role or 'SUPER_ADMIN' in new_role:
+        if not get_auth_context(auth_user).has_role("SUPER_ADMIN") and 'SCHOOL_ADMIN' in new_role or 'SUPER_ADMIN' in new_role:
             raise serializers.ValidationError({"role":"Your selection should be TEACHER or STUDENT"})
         # elif "SUPER_ADMIN" not in auth_user.roles and 'SCHOOL_ADMIN' in new_role:
         #     raise serializers.ValidationError({"role":"Your selection should be TEACHER or STUDENT"})
@@ -0,0 +1,49 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from .backends import reset_failed_attempts
+from .denylist import allow_user, deny_user, revoke_user_tokens
+from .models import User
+
+# field values as loaded, so a save can tell what changed
+LOADED_STATE_ATTR = "_loaded_state"
+TRACKED_FIELDS = ("roles", "is_active", "failed_password_attempts")
+
+
+def _state(instance: User) -> dict:
+    # read from __dict__ so deferred fields are not fetched per instance
+    state = {field: instance.__dict__[field] for field in TRACKED_FIELDS if field in instance.__dict__}
+    if "roles" in state:
+        state["roles"] = sorted(state["roles"] or [])
+    return state
+
+
+@receiver(post_init, sender=User)
+def remember_user_state(sender, instance: User, **kwargs):
+    setattr(instance, LOADED_STATE_ATTR, _state(instance))
+
+
+@receiver(post_save, sender=User)
+def sync_user_denylist(sender, instance: User, created: bool, **kwargs):
+    loaded, current = getattr(instance, LOADED_STATE_ATTR, {}), _state(instance)
+    setattr(instance, LOADED_STATE_ATTR, current)
+    if not instance.is_active:
+        deny_user(instance.pk)
+    elif not created:
+        allow_user(instance.pk)
+    if created:
+        return
+    if "roles" in loaded and loaded["roles"] != current.get("roles", loaded["roles"]):
+        # tokens carry the roles claim, so tokens issued before the change must go
+        revoke_user_tokens(instance.pk)
+    reactivated = loaded.get("is_active") is False and instance.is_active
+    if reactivated or (loaded.get("failed_password_attempts") and current.get("failed_password_attempts") == 0):
+        # the Redis counter would otherwise keep the account locked until it expires
+        reset_failed_attempts(instance.email)
+    if reactivated and instance.failed_password_attempts:
+        User.objects.filter(pk=instance.pk).update(failed_password_attempts=0)
+        instance.failed_password_attempts = current["failed_password_attempts"] = 0
+
+
+@receiver(post_delete, sender=User)
+def deny_deleted_user(sender, instance: User, **kwargs):
+    deny_user(instance.pk)
@@ -2,6 +2,7 @@ from celery import shared_task
 from django.core.mail import EmailMultiAlternatives
 from django.conf import settings
 from django.template.loader import get_template
+from .models import User
 from .utils import send_email
 from core.celery import APP
 
@@ -21,3 +22,17 @@ def send_user_creation_email(email_data):
         "Email Confirmation", email_data["email"], html_alternative
     )
 
+
+
+@APP.task()
+def record_login_attempts(user_id, failed_password_attempts, lock=False):
+    '''Writes the Redis login counters back to the user row'''
+    user = User.objects.filter(id=user_id).first()
+    if user is None:
+        return
+    user.failed_password_attempts = failed_password_attempts
+    update_fields = ["failed_password_attempts"]
+    if lock:
+        user.is_active = False
+        update_fields.append("is_active")
+    user.save(update_fields=update_fields)
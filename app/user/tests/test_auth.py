@@ -1,14 +1,23 @@
 import pytest
 from django.urls import reverse
 from rest_framework import status
-from user.models import Token
+from user.context import AuthContext
+from user.models import Token, User
 from user.enums import TokenTypeClass
 from .conftest import api_client_with_credentials
 from datetime import datetime, timedelta
 import time_machine
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from user.denylist import revoke_user_tokens
+from user.backends import MAX_LOGIN_ATTEMPTS
+from user.tasks import record_login_attempts
 
 pytestmark = pytest.mark.django_db
 
+# Revocation tests run within one second, where `iat` alone cannot order tokens and revocations
+SAME_SECOND = datetime.now().replace(microsecond=100_000)
+
 
 class TestAuthEndpoints:
     initiate_password_reset_url = reverse(
@@ -173,13 +182,15 @@ class TestAuthSessionSecurity:
                                    'token': token}, format='json')
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
 
-    def test_account_locked_after_max_login_attempt(self, api_client, active_user):
+    def test_account_locked_after_max_login_attempt(self, api_client, active_user, mocker):
         url = reverse('auth:login')
         assert active_user.is_active
         data = {
             'email': active_user.email,
             'password': 'wrongpass'
         }
+        # run the write-back task inline
+        mocker.patch("user.backends.record_login_attempts.delay", side_effect=record_login_attempts)
 
         for _ in range(0, 6):
             api_client.post(url, data, format='json')
@@ -188,3 +199,151 @@ class TestAuthSessionSecurity:
 
         response = api_client.post(url, data, format='json')
         assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+class TestAuthContext:
+    course_list_url = reverse("course:course-list")
+
+    def test_context_built_from_token_claims(self, authenticate_user, django_assert_num_queries):
+        user = authenticate_user(roles=["TEACHER", "SCHOOL_ADMIN"])
+        with django_assert_num_queries(0):
+            context = AuthContext.from_token(user['token'])
+        assert context.roles == frozenset({"TEACHER", "SCHOOL_ADMIN"})
+        assert context.is_admin
+        assert context.user_id == str(user['user_instance'].id)
+
+    def test_invalid_token_has_no_context(self):
+        assert AuthContext.from_token("not-a-token") is None
+
+    def test_demoted_admin_token_loses_admin_role(self, api_client, authenticate_user):
+        '''Role checks read the token claims, so a role change revokes tokens carrying the old roles'''
+        with time_machine.travel(SAME_SECOND, tick=False) as traveller:
+            user = authenticate_user(roles=["SUPER_ADMIN"])
+            traveller.shift(timedelta(milliseconds=100))
+            user_instance = User.objects.get(id=user['user_instance'].id)
+            user_instance.roles = ["STUDENT"]
+            user_instance.save()
+            api_client_with_credentials(user['token'], api_client)
+            response = api_client.post(self.course_list_url, {"course_name": "Algebra"})
+            assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+            traveller.shift(timedelta(milliseconds=100))
+            login = api_client.post(
+                reverse("auth:login"), {'email': user_instance.email, 'password': 'my@pass@access'})
+            api_client_with_credentials(login.json()['access'], api_client)
+            response = api_client.post(self.course_list_url, {"course_name": "Algebra"})
+            assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+class TestStatelessAuthentication:
+    user_list_url = reverse("user:user-list")
+
+    def test_catalogue_reads_skip_user_row(self, api_client, authenticate_user, course_factory, enroll_student_factory, module_factory):
+        user = authenticate_user(roles=["STUDENT"])
+        course = course_factory()
+        module_factory(course=course)
+        enroll_student_factory(user=user['user_instance'], course=course)
+        api_client_with_credentials(user['token'], api_client)
+        url = reverse("course:course-get-course-modules", kwargs={"pk": course.id})
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert "video_link" in response.json()['data'][0]
+        assert not [query for query in context.captured_queries
+                    if 'FROM "user_user" WHERE "user_user"."id"' in query['sql']]
+
+    def test_deactivated_user_token_is_denied(self, api_client, authenticate_user):
+        user = authenticate_user(roles=["STUDENT"])
+        api_client_with_credentials(user['token'], api_client)
+        assert api_client.get(self.user_list_url).status_code == status.HTTP_200_OK
+
+        user_instance = user['user_instance']
+        user_instance.is_active = False
+        user_instance.save()
+        assert api_client.get(reverse("course:course-list")).status_code == status.HTTP_401_UNAUTHORIZED
+
+        user_instance.is_active = True
+        user_instance.save()
+        assert api_client.get(self.user_list_url).status_code == status.HTTP_200_OK
+
+    def test_revoked_tokens_are_denied(self, api_client, authenticate_user):
+        with time_machine.travel(SAME_SECOND, tick=False) as traveller:
+            user = authenticate_user(roles=["STUDENT"])
+            traveller.shift(timedelta(milliseconds=100))
+            revoke_user_tokens(user['user_instance'].id)
+            api_client_with_credentials(user['token'], api_client)
+            assert api_client.get(self.user_list_url).status_code == status.HTTP_401_UNAUTHORIZED
+
+            # a token issued later in the same second is not caught by the revocation
+            traveller.shift(timedelta(milliseconds=100))
+            login = api_client.post(
+                reverse("auth:login"), {'email': user['user_instance'].email, 'password': 'my@pass@access'})
+            api_client_with_credentials(login.json()['access'], api_client)
+            assert api_client.get(self.user_list_url).status_code == status.HTTP_200_OK
+
+
+
+    def test_role_change_revokes_issued_tokens(self, api_client, authenticate_user):
+        with time_machine.travel(SAME_SECOND, tick=False) as traveller:
+            active_user = authenticate_user(roles=["SUPER_ADMIN"])['user_instance']
+            tokens = api_client.post(
+                reverse("auth:login"), {'email': active_user.email, 'password': 'my@pass@access'}).json()
+            traveller.shift(timedelta(milliseconds=100))
+            user = User.objects.get(id=active_user.id)
+            user.roles = ["STUDENT"]
+            user.save()
+            api_client_with_credentials(tokens['access'], api_client)
+            assert api_client.get(self.user_list_url).status_code == status.HTTP_401_UNAUTHORIZED
+            api_client.credentials()
+            response = api_client.post(reverse("auth:refresh-token"), {'refresh': tokens['refresh']})
+            assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_unchanged_roles_keep_tokens_valid(self, api_client, authenticate_user):
+        user = authenticate_user(roles=["STUDENT"])
+        with time_machine.travel(datetime.now() + timedelta(minutes=1)):
+            user_instance = User.objects.get(id=user['user_instance'].id)
+            user_instance.firstname = "Renamed"
+            user_instance.save()
+            api_client_with_credentials(user['token'], api_client)
+            assert api_client.get(self.user_list_url).status_code == status.HTTP_200_OK
+
+
+class TestLoginAttempts:
+    login_url = reverse("auth:login")
+
+    def test_failed_attempts_counted_without_user_row_writes(self, api_client, active_user, mocker):
+        mock_record = mocker.patch("user.backends.record_login_attempts.delay")
+        data = {'email': active_user.email.upper(), 'password': 'wrongpass'}
+        for _ in range(2):
+            response = api_client.post(self.login_url, data)
+            assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        active_user.refresh_from_db()
+        assert active_user.failed_password_attempts == 0
+        assert mock_record.call_args.args == (str(active_user.id), 2)
+
+    def test_successful_login_resets_attempts(self, api_client, active_user, mocker):
+        mocker.patch("user.backends.record_login_attempts.delay", side_effect=record_login_attempts)
+        api_client.post(self.login_url, {'email': active_user.email, 'password': 'wrongpass'})
+        active_user.refresh_from_db()
+        assert active_user.failed_password_attempts == 1
+        response = api_client.post(
+            self.login_url, {'email': active_user.email.upper(), 'password': 'my@pass@access'})
+        assert response.status_code == status.HTTP_200_OK
+        active_user.refresh_from_db()
+        assert active_user.failed_password_attempts == 0
+        assert active_user.last_login is not None
+
+    def test_reactivated_account_is_unlocked(self, api_client, active_user, mocker):
+        mocker.patch("user.backends.record_login_attempts.delay", side_effect=record_login_attempts)
+        data = {'email': active_user.email, 'password': 'wrongpass'}
+        for _ in range(MAX_LOGIN_ATTEMPTS + 1):
+            api_client.post(self.login_url, data)
+        user = User.objects.get(id=active_user.id)
+        assert not user.is_active
+        assert api_client.post(self.login_url, data).status_code == status.HTTP_400_BAD_REQUEST
+
+        user.is_active = True
+        user.save()
+        response = api_client.post(self.login_url, {'email': active_user.email, 'password': 'my@pass@access'})
+        assert response.status_code == status.HTTP_200_OK
+        assert User.objects.get(id=active_user.id).failed_password_attempts == 0
@@ -1,3 +1,4 @@
+from base64 import b64encode
 import pytest
 from django.urls import reverse
 from rest_framework import status
@@ -124,7 +125,55 @@ class TestRetriveUsers:
         response = api_client.get(self.user_list_url)
         assert response.status_code == 200
         assert response.json()['total'] == 1
-        
+
+    def test_total_pages_uses_requested_page_size(self, api_client, user_factory, authenticate_user):
+        user_factory.create_batch(4)
+        user = authenticate_user(roles=["SUPER_ADMIN"])
+        api_client_with_credentials(user['token'], api_client)
+        response = api_client.get(self.user_list_url, {"page_size": 2})
+        assert response.status_code == 200
+        assert response.json()['page_size'] == 2
+        assert response.json()['total_pages'] == 3
+
+    def test_admin_pages_users_with_cursor(self, api_client, user_factory, authenticate_user):
+        """Keyset mode walks every user exactly once, forwards and backwards"""
+        user_factory.create_batch(4)
+        user = authenticate_user(roles=["SUPER_ADMIN"])
+        api_client_with_credentials(user['token'], api_client)
+
+        pages = []
+        response = api_client.get(self.user_list_url, {"cursor": "", "page_size": 2})
+        while True:
+            assert response.status_code == 200
+            data = response.json()
+            assert 'total_pages' not in data
+            pages.append([row['id'] for row in data['results']])
+            if not data['links']['next']:
+                break
+            response = api_client.get(data['links']['next'])
+
+        assert [len(page) for page in pages] == [2, 2, 1]
+        seen = [pk for page in pages for pk in page]
+        assert len(set(seen)) == 5
+        expected = [str(pk) for pk in User.objects.order_by("-created_at", "-id").values_list("id", flat=True)]
+        assert seen == expected
+
+        response = api_client.get(data['links']['previous'])
+        assert [row['id'] for row in response.json()['results']] == pages[1]
+
+    def test_invalid_cursor_is_rejected(self, api_client, authenticate_user):
+        user = authenticate_user(roles=["SUPER_ADMIN"])
+        api_client_with_credentials(user['token'], api_client)
+        response = api_client.get(self.user_list_url, {"cursor": "not-a-cursor"})
+        assert response.status_code == 404
+
+    def test_cursor_with_malformed_id_is_rejected(self, api_client, authenticate_user):
+        user = authenticate_user(roles=["SUPER_ADMIN"])
+        api_client_with_credentials(user['token'], api_client)
+        cursor = b64encode(b"n|2020-01-01T00:00:00+00:00|not-a-uuid").decode()
+        response = api_client.get(self.user_list_url, {"cursor": cursor})
+        assert response.status_code == 404
+
     def test_retrieve_user_details(self, api_client, user_factory, authenticate_user):
         user = user_factory()
         auth_user = authenticate_user(roles = ["SUPER_ADMIN"])
@@ -1,8 +1,8 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from rest_framework_simplejwt.views import TokenRefreshView, TokenVerifyView
+from rest_framework_simplejwt.views import TokenVerifyView
 
-from ..views import CustomObtainTokenPairView, AuthViewsets, PasswordChangeView,CreateTokenView
+from ..views import CustomObtainTokenPairView, DenyListTokenRefreshView, AuthViewsets, PasswordChangeView,CreateTokenView
 
 app_name = "auth"
 router = DefaultRouter()
@@ -11,7 +11,7 @@ router.register("change-password", PasswordChangeView, basename="password-change
 
 urlpatterns = [
     path("login/", CustomObtainTokenPairView.as_view(), name="login"),
-    path("token/refresh/", TokenRefreshView.as_view(), name="refresh-token"),
+    path("token/refresh/", DenyListTokenRefreshView.as_view(), name="refresh-token"),
     path("token/verify/", TokenVerifyView.as_view(), name="verify-token"),
     path("", include(router.urls)),
 ]
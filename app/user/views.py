@@ -2,7 +2,7 @@ from rest_framework import filters
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated,AllowAny
 from rest_framework.response import Response
-from rest_framework_simplejwt.views import TokenObtainPairView
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from rest_framework.settings import api_settings
 from django.contrib.auth import get_user_model
 from django.utils.crypto import get_random_string
@@ -12,10 +12,11 @@ from rest_framework.authtoken.views import ObtainAuthToken
 from drf_spectacular.utils import extend_schema, inline_serializer
 from rest_framework import viewsets, status,  serializers
 from django_filters.rest_framework import DjangoFilterBackend 
+from core.pagination import KeysetPagination
 from core.utils.validators import is_admin
 from .tasks import send_password_reset_email
 from .serializers import (
-    CustomObtainTokenPairSerializer, EmailSerializer,CreatePasswordFromTokenSerializer,UpdateUserSerializer,
+    CustomObtainTokenPairSerializer, DenyListTokenRefreshSerializer, EmailSerializer,CreatePasswordFromTokenSerializer,UpdateUserSerializer,
     PasswordChangeSerializer,AuthTokenSerializer,ListUserSerializer,CreateUserSerializer, TokenDecodeSerializer)
 from .permissions import IsStudent, IsSuperAdmin, IsTeacher, IsSchoolAdmin
 from .utils import create_token_and_send_user_email
@@ -25,6 +26,12 @@ class CustomObtainTokenPairView(TokenObtainPairView):
     """Authentice with email and password"""
 
     serializer_class = CustomObtainTokenPairSerializer
+
+
+class DenyListTokenRefreshView(TokenRefreshView):
+    """Refresh an access token unless the user's tokens have been revoked"""
+
+    serializer_class = DenyListTokenRefreshSerializer
     
 
 class AuthViewsets(viewsets.GenericViewSet):
@@ -154,6 +161,7 @@ class UserViewsets(viewsets.ModelViewSet):
     serializer_class = ListUserSerializer
     permission_classes = [IsAuthenticated]
     http_method_names = ["get", "post", "patch", "delete"]
+    pagination_class = KeysetPagination
     filter_backends = [
         DjangoFilterBackend,
         filters.SearchFilter,